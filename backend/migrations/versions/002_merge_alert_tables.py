@@ -0,0 +1,121 @@
+"""Merge price_alerts and alert_history into alerts and alert_matches
+
+Revision ID: 002_merge_alert_tables
+Revises: 001_initial
+Create Date: 2023-05-02 12:00:00.000000
+
+``001_initial`` creates ``price_alerts``, ``alert_history`` and
+``listing_alerts``; their rows are moved server-side (INSERT ... SELECT)
+and the old tables and the ``notification_methods`` enum dropped. Schemas
+that never had ``price_alerts`` are left as they are.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_merge_alert_tables'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+_EXTEND_ALERTS_SQL = """
+ALTER TABLE alerts
+    ADD COLUMN IF NOT EXISTS kind SMALLINT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS category VARCHAR(100),
+    ADD COLUMN IF NOT EXISTS notification_method SMALLINT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS notification_target VARCHAR(255),
+    ALTER COLUMN name DROP NOT NULL,
+    ALTER COLUMN search_query DROP NOT NULL,
+    ADD CONSTRAINT ck_alert_kind CHECK (kind >= 0 AND kind <= 1),
+    ADD CONSTRAINT ck_alert_notification_method CHECK (notification_method >= 0 AND notification_method <= 2),
+    ADD CONSTRAINT ck_alert_search_fields CHECK (kind <> 0 OR (name IS NOT NULL AND search_query IS NOT NULL));
+
+CREATE TABLE IF NOT EXISTS alert_matches (
+    listing_id INTEGER NOT NULL REFERENCES listings (id) ON DELETE CASCADE,
+    alert_id INTEGER NOT NULL REFERENCES alerts (id) ON DELETE CASCADE,
+    matched_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    notified_at TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (listing_id, alert_id)
+) WITH (fillfactor = 90);
+
+ALTER INDEX alert_matches_pkey SET (fillfactor = 90);
+
+CREATE INDEX IF NOT EXISTS idx_alert_matches_alert_matched
+    ON alert_matches (alert_id, matched_at DESC);
+"""
+
+# notification_method was the notification_methods enum; map its labels onto
+# the NotificationMethod values first. Already-numeric columns are left alone
+_NOTIFICATION_METHOD_TO_SMALLINT_SQL = """
+DO $$
+BEGIN
+    IF (
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'price_alerts' AND column_name = 'notification_method'
+    ) = 'USER-DEFINED' THEN
+        ALTER TABLE price_alerts ALTER COLUMN notification_method DROP DEFAULT;
+        ALTER TABLE price_alerts ALTER COLUMN notification_method TYPE SMALLINT
+            USING CASE notification_method::text
+                WHEN 'email' THEN 0
+                WHEN 'sms' THEN 1
+                WHEN 'push' THEN 2
+            END;
+    END IF;
+END
+$$;
+"""
+
+# price_alerts ids overlap with alerts ids, so reserve a new alerts id for
+# every price alert first and use the mapping for both copies below
+_COPY_PRICE_ALERTS_SQL = """
+CREATE TEMPORARY TABLE price_alert_ids ON COMMIT DROP AS
+SELECT id AS old_id, nextval(pg_get_serial_sequence('alerts', 'id'))::integer AS new_id
+FROM price_alerts;
+
+INSERT INTO alerts (
+    id, user_id, kind, name, search_query, category, min_price, max_price,
+    location, notification_method, notification_target, is_active,
+    created_at, updated_at, last_matched_at
+)
+SELECT m.new_id, p.user_id, 1, NULL, p.search_term, p.category, p.min_price, p.max_price,
+       p.location, coalesce(p.notification_method, 0), p.notification_target, p.is_active,
+       p.created_at, p.created_at, p.last_triggered
+FROM price_alerts p
+JOIN price_alert_ids m ON m.old_id = p.id;
+
+INSERT INTO alert_matches (listing_id, alert_id, matched_at, notified_at)
+SELECT h.listing_id, m.new_id, coalesce(h.triggered_at, now()),
+       CASE WHEN h.notification_sent THEN coalesce(h.notification_time, h.triggered_at) END
+FROM alert_history h
+JOIN price_alert_ids m ON m.old_id = h.alert_id
+ON CONFLICT (listing_id, alert_id) DO NOTHING;
+
+INSERT INTO alert_matches (listing_id, alert_id, matched_at, notified_at)
+SELECT listing_id, alert_id, coalesce(matched_at, now()),
+       CASE WHEN notified THEN coalesce(notified_at, matched_at) END
+FROM listing_alerts
+ON CONFLICT (listing_id, alert_id) DO NOTHING;
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('price_alerts'):
+        return
+
+    op.execute(_EXTEND_ALERTS_SQL)
+    op.execute(_NOTIFICATION_METHOD_TO_SMALLINT_SQL)
+    op.execute(_COPY_PRICE_ALERTS_SQL)
+
+    op.drop_table('alert_history')
+    op.drop_table('price_alerts')
+    op.drop_table('listing_alerts')
+    op.execute('DROP TYPE IF EXISTS notification_methods')
+
+
+def downgrade() -> None:
+    # Price alerts and their history cannot be told apart from the merged
+    # rows reliably enough to split them back out; 001_initial's downgrade
+    # drops whichever layout is present
+    pass
@@ -0,0 +1,61 @@
+"""Store listings.status as SMALLINT
+
+Revision ID: 003_listing_status_smallint
+Revises: 002_merge_alert_tables
+Create Date: 2023-05-06 12:00:00.000000
+
+``001_initial`` creates ``status`` as the ``listing_status`` enum. The model
+maps it to ``ListingStatus`` values (0=new 1=processed 2=matched
+3=archived 4=error) on a two-byte column with a CHECK constraint, which
+the partial indexes in 004 also rely on. The enum labels are mapped onto
+those values in place and the type is dropped.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003_listing_status_smallint'
+down_revision = '002_merge_alert_tables'
+branch_labels = None
+depends_on = None
+
+
+_TO_SMALLINT_SQL = """
+ALTER TABLE listings ALTER COLUMN status DROP DEFAULT;
+
+ALTER TABLE listings ALTER COLUMN status TYPE SMALLINT
+    USING CASE status::text
+        WHEN 'NEW' THEN 0
+        WHEN 'PROCESSED' THEN 1
+        WHEN 'MATCHED' THEN 2
+        WHEN 'ARCHIVED' THEN 3
+        WHEN 'ERROR' THEN 4
+        ELSE 0
+    END;
+
+ALTER TABLE listings
+    ALTER COLUMN status SET DEFAULT 0,
+    ALTER COLUMN status SET NOT NULL,
+    ADD CONSTRAINT ck_listing_status CHECK (status >= 0 AND status <= 4);
+
+DROP TYPE listing_status;
+"""
+
+_TO_ENUM_SQL = """
+CREATE TYPE listing_status AS ENUM ('NEW', 'PROCESSED', 'MATCHED', 'ARCHIVED', 'ERROR');
+
+ALTER TABLE listings
+    DROP CONSTRAINT ck_listing_status,
+    ALTER COLUMN status DROP NOT NULL,
+    ALTER COLUMN status DROP DEFAULT;
+
+ALTER TABLE listings ALTER COLUMN status TYPE listing_status
+    USING (ARRAY['NEW', 'PROCESSED', 'MATCHED', 'ARCHIVED', 'ERROR'])[status + 1]::listing_status;
+"""
+
+
+def upgrade() -> None:
+    op.execute(_TO_SMALLINT_SQL)
+
+
+def downgrade() -> None:
+    op.execute(_TO_ENUM_SQL)
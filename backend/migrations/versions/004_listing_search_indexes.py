@@ -0,0 +1,50 @@
+"""Composite indexes for the listing search path
+
+Revision ID: 004_listing_search_indexes
+Revises: 003_listing_status_smallint
+Create Date: 2023-05-10 12:00:00.000000
+
+GET /listings filters out archived rows and pages by (scraped_at, id)
+descending, optionally narrowed to one category. These indexes match that
+ORDER BY exactly so the planner can walk them instead of sorting.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_listing_search_indexes'
+down_revision = '003_listing_status_smallint'
+branch_labels = None
+depends_on = None
+
+# ListingStatus.ARCHIVED; search_listings never returns these rows
+_NOT_ARCHIVED = sa.text('status <> 3')
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        # Category pages; INCLUDE lets the common card columns come
+        # straight from the index
+        op.create_index(
+            'ix_listings_cat_scraped',
+            'listings',
+            ['category', sa.text('scraped_at DESC'), sa.text('id DESC')],
+            postgresql_include=['title', 'price', 'location'],
+            postgresql_where=_NOT_ARCHIVED,
+            postgresql_concurrently=True,
+        )
+        # Unfiltered pages and keyset cursors, (scraped_at, id) < (:ts, :id)
+        op.create_index(
+            'ix_listings_scraped_id_active',
+            'listings',
+            [sa.text('scraped_at DESC'), sa.text('id DESC')],
+            postgresql_where=_NOT_ARCHIVED,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_listings_scraped_id_active', table_name='listings', postgresql_concurrently=True)
+        op.drop_index('ix_listings_cat_scraped', table_name='listings', postgresql_concurrently=True)
@@ -0,0 +1,75 @@
+"""Fingerprint listings.listing_id for point lookups
+
+Revision ID: 005_listing_id_fingerprint
+Revises: 004_listing_search_indexes
+Create Date: 2023-05-13 12:00:00.000000
+
+Scrapers look listings up by their marketplace ID on every insert. An
+integer fingerprint of it, kept by a trigger, lets those point lookups
+hit a small hash index instead of comparing up to 255 bytes per btree
+probe. ``(listing_id_fp, listing_id)`` replaces the unique index on
+``listing_id`` as the uniqueness check and the ON CONFLICT target.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_listing_id_fingerprint'
+down_revision = '004_listing_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+# The trigger goes in before the backfill, so rows written while it runs
+# are fingerprinted too and SET NOT NULL cannot fail on them
+_ADD_FINGERPRINT_SQL = """
+ALTER TABLE listings ADD COLUMN listing_id_fp BIGINT;
+
+CREATE FUNCTION listings_set_listing_id_fp() RETURNS trigger AS $$
+BEGIN
+    NEW.listing_id_fp := hashtextextended(NEW.listing_id, 0);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_listings_listing_id_fp
+BEFORE INSERT OR UPDATE OF listing_id ON listings
+FOR EACH ROW EXECUTE FUNCTION listings_set_listing_id_fp();
+
+UPDATE listings SET listing_id_fp = hashtextextended(listing_id, 0);
+
+ALTER TABLE listings
+    ALTER COLUMN listing_id_fp SET NOT NULL,
+    ADD CONSTRAINT uq_listings_listing_id UNIQUE (listing_id_fp, listing_id);
+
+DROP INDEX ix_listings_listing_id;
+"""
+
+_DROP_FINGERPRINT_SQL = """
+CREATE UNIQUE INDEX ix_listings_listing_id ON listings (listing_id);
+
+ALTER TABLE listings DROP CONSTRAINT uq_listings_listing_id;
+DROP TRIGGER trg_listings_listing_id_fp ON listings;
+DROP FUNCTION listings_set_listing_id_fp();
+ALTER TABLE listings DROP COLUMN listing_id_fp;
+"""
+
+
+def upgrade() -> None:
+    op.execute(_ADD_FINGERPRINT_SQL)
+
+    # CONCURRENTLY cannot run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_listings_listing_id_fp',
+            'listings',
+            ['listing_id_fp'],
+            postgresql_using='hash',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_listings_listing_id_fp', table_name='listings', postgresql_concurrently=True)
+    op.execute(_DROP_FINGERPRINT_SQL)
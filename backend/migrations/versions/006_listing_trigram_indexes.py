@@ -0,0 +1,49 @@
+"""Trigram indexes for substring search on listings
+
+Revision ID: 006_listing_trigram_indexes
+Revises: 005_listing_id_fingerprint
+Create Date: 2023-05-31 12:00:00.000000
+
+Search and location filters match ``ILIKE '%term%'``, which a btree index
+cannot serve. pg_trgm GIN indexes can, as long as the term has at least
+three characters; the API rejects shorter search terms for that reason.
+The keywords index is on the same ``keywords::text`` expression that
+``ListingRepository._search_filters`` matches against.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_listing_trigram_indexes'
+down_revision = '005_listing_id_fingerprint'
+branch_labels = None
+depends_on = None
+
+_TRIGRAM_INDEXES = (
+    ('ix_listings_title_trgm', 'title'),
+    ('ix_listings_description_trgm', 'description'),
+    ('ix_listings_location_trgm', 'location'),
+    ('ix_listings_keywords_trgm', '(keywords::text)'),
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY cannot run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        for name, expression in _TRIGRAM_INDEXES:
+            op.create_index(
+                name,
+                'listings',
+                [sa.text(f'{expression} gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(_TRIGRAM_INDEXES):
+            op.drop_index(name, table_name='listings', postgresql_concurrently=True)
+    # pg_trgm may be used outside this schema, so the extension is left installed
@@ -0,0 +1,36 @@
+"""Materialized view of distinct listing categories
+
+Revision ID: 007_listing_categories_view
+Revises: 006_listing_trigram_indexes
+Create Date: 2023-06-07 12:00:00.000000
+
+GET /listings/categories read ``SELECT DISTINCT category FROM listings``
+on every cache miss. The set only grows when a listing brings a new
+category, so it is kept here and refreshed by the API when that happens.
+The unique index is what allows ``REFRESH MATERIALIZED VIEW CONCURRENTLY``.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '007_listing_categories_view'
+down_revision = '006_listing_trigram_indexes'
+branch_labels = None
+depends_on = None
+
+
+_CREATE_VIEW_SQL = """
+CREATE MATERIALIZED VIEW listing_categories AS
+SELECT DISTINCT category
+FROM listings
+WHERE category IS NOT NULL AND category <> '';
+
+CREATE UNIQUE INDEX ux_listing_categories_category ON listing_categories (category);
+"""
+
+
+def upgrade() -> None:
+    op.execute(_CREATE_VIEW_SQL)
+
+
+def downgrade() -> None:
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS listing_categories')
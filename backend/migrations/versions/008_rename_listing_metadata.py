@@ -0,0 +1,25 @@
+"""Rename listings.metadata to extra
+
+Revision ID: 008_rename_listing_metadata
+Revises: 007_listing_categories_view
+Create Date: 2023-06-14 12:00:00.000000
+
+``metadata`` is reserved on declarative models, so the ``Listing`` model
+maps the column as ``extra``. Renaming only touches the catalog; the data
+and its TOAST compression setting are kept.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008_rename_listing_metadata'
+down_revision = '007_listing_categories_view'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('listings', 'metadata', new_column_name='extra')
+
+
+def downgrade() -> None:
+    op.alter_column('listings', 'extra', new_column_name='metadata')
@@ -0,0 +1,44 @@
+"""Maintain updated_at on listings and alerts in the database
+
+Revision ID: 009_updated_at_triggers
+Revises: 008_rename_listing_metadata
+Create Date: 2023-06-21 12:00:00.000000
+
+``updated_at`` only had a server default, so it kept its insert time under
+any UPDATE that did not go through the ORM's ``onupdate``. A BEFORE UPDATE
+trigger sets it on every row change, whichever client makes it.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_updated_at_triggers'
+down_revision = '008_rename_listing_metadata'
+branch_labels = None
+depends_on = None
+
+_TABLES = ('listings', 'alerts')
+
+_CREATE_FUNCTION_SQL = """
+CREATE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute(_CREATE_FUNCTION_SQL)
+    for table in _TABLES:
+        op.execute(
+            f'CREATE TRIGGER trg_{table}_updated_at '
+            f'BEFORE UPDATE ON {table} '
+            f'FOR EACH ROW EXECUTE FUNCTION set_updated_at()'
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(_TABLES):
+        op.execute(f'DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS set_updated_at()')
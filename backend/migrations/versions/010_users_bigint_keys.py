@@ -0,0 +1,90 @@
+"""Key users by a BIGINT identity instead of a random UUID
+
+Revision ID: 010_users_bigint_keys
+Revises: 009_updated_at_triggers
+Create Date: 2023-06-28 12:00:00.000000
+
+Random UUID keys scatter inserts across the whole primary key index and
+make every foreign key to users 16 bytes wide. Users get a sequential
+BIGINT key; the old UUID is kept as ``public_id``, the identifier for
+anything exposed outside the service. Every ``user_id`` is rewritten to
+the new key, so existing rows and their relationships are preserved.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010_users_bigint_keys'
+down_revision = '009_updated_at_triggers'
+branch_labels = None
+depends_on = None
+
+# Tables with a user_id foreign key, and the indexes on it to rebuild
+_USER_INDEXES = {
+    'api_keys': ('CREATE INDEX idx_api_keys_user_id ON api_keys (user_id)',),
+    'user_auth': ('CREATE INDEX idx_user_auth_user_id ON user_auth (user_id)',),
+    'alerts': ('CREATE INDEX idx_alerts_user_id ON alerts (user_id)',),
+    'notifications': (
+        'CREATE INDEX idx_notifications_user_status_created '
+        'ON notifications (user_id, status, created_at DESC)',
+    ),
+}
+
+
+def _rekey_children(key_type: str, new_key: str) -> None:
+    """Point every user_id at ``users.<new_key>`` and drop the old column.
+
+    Dropping the old column also drops its foreign key and indexes; both
+    are recreated once users has its new primary key.
+    """
+    for table in _USER_INDEXES:
+        op.execute(f'ALTER TABLE {table} ADD COLUMN new_user_id {key_type}')
+        op.execute(
+            f'UPDATE {table} t SET new_user_id = u.{new_key} FROM users u WHERE u.id = t.user_id'
+        )
+        op.execute(f'ALTER TABLE {table} DROP COLUMN user_id')
+        op.execute(f'ALTER TABLE {table} RENAME COLUMN new_user_id TO user_id')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN user_id SET NOT NULL')
+
+
+def _restore_foreign_keys() -> None:
+    """Recreate the user_id foreign keys and indexes dropped by _rekey_children."""
+    for table, indexes in _USER_INDEXES.items():
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey '
+            f'FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE'
+        )
+        for index in indexes:
+            op.execute(index)
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE users ADD COLUMN public_id UUID')
+    op.execute('UPDATE users SET public_id = id')
+    op.execute(
+        'ALTER TABLE users '
+        'ALTER COLUMN public_id SET NOT NULL, '
+        'ALTER COLUMN public_id SET DEFAULT gen_random_uuid(), '
+        'ADD CONSTRAINT users_public_id_key UNIQUE (public_id)'
+    )
+    # Adding an identity column numbers the existing rows from its sequence
+    op.execute('ALTER TABLE users ADD COLUMN new_id BIGINT GENERATED BY DEFAULT AS IDENTITY')
+
+    _rekey_children('BIGINT', 'new_id')
+
+    op.execute('ALTER TABLE users DROP COLUMN id')
+    op.execute('ALTER TABLE users RENAME COLUMN new_id TO id')
+    op.execute('ALTER TABLE users ADD PRIMARY KEY (id)')
+
+    _restore_foreign_keys()
+
+
+def downgrade() -> None:
+    _rekey_children('UUID', 'public_id')
+
+    op.execute('ALTER TABLE users DROP COLUMN id')
+    op.execute('ALTER TABLE users DROP CONSTRAINT users_public_id_key')
+    op.execute('ALTER TABLE users ALTER COLUMN public_id DROP DEFAULT')
+    op.execute('ALTER TABLE users RENAME COLUMN public_id TO id')
+    op.execute('ALTER TABLE users ADD PRIMARY KEY (id)')
+
+    _restore_foreign_keys()
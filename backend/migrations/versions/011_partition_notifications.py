@@ -0,0 +1,171 @@
+"""Partition notifications by week on created_at
+
+Revision ID: 011_partition_notifications
+Revises: 010_users_bigint_keys
+Create Date: 2023-07-05 12:00:00.000000
+
+Expired notifications were removed with DELETE, leaving dead tuples for
+VACUUM. With weekly range partitions on ``created_at`` a week is removed
+by dropping its partition. The partition key has to be part of the
+primary key, which becomes ``(id, created_at)``.
+
+Existing rows are copied into the partitioned table. Partitions are
+created for every week that already holds rows plus the current and next
+week, all computed in SQL, so the result does not depend on the day the
+migration runs. ``ensure_notifications_partition`` creates further weeks
+and is scheduled through pg_cron when that extension is installed.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011_partition_notifications'
+down_revision = '010_users_bigint_keys'
+branch_labels = None
+depends_on = None
+
+# {created_at}, {pk} and {table_options} differ between the partitioned and the
+# plain layout; {compression} is set on PG14+ for the often-TOASTed data column.
+# The id sequence from 001 is reused, so ids keep counting from where
+# they were.
+_CREATE_TABLE_SQL = """
+CREATE TABLE notifications (
+    id INTEGER NOT NULL DEFAULT nextval('notifications_id_seq'),
+    type VARCHAR(50) NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    content TEXT NOT NULL,
+    data JSONB{compression},
+    created_at TIMESTAMP WITHOUT TIME ZONE {created_at},
+    sent_at TIMESTAMP WITHOUT TIME ZONE,
+    read_at TIMESTAMP WITHOUT TIME ZONE,
+    status VARCHAR(20),
+    user_id BIGINT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    PRIMARY KEY ({pk})
+){table_options}
+"""
+
+_COPY_COLUMNS = 'id, type, title, content, data, created_at, sent_at, read_at, status, user_id'
+
+# Storage parameters cannot be set on a partitioned parent, so the
+# fillfactor goes on each partition instead
+_PARTITION_SQL = """
+CREATE FUNCTION ensure_notifications_partition(week_start date) RETURNS void AS $$
+DECLARE
+    partition_name text := 'notifications_' || to_char(week_start, 'IYYY"w"IW');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF notifications '
+        'FOR VALUES FROM (%L) TO (%L) WITH (fillfactor = 90)',
+        partition_name, week_start, week_start + 7
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE notifications_default PARTITION OF notifications DEFAULT WITH (fillfactor = 90);
+
+-- Weeks that already hold notifications, then this week and the next
+SELECT ensure_notifications_partition(week_start)
+FROM (
+    SELECT DISTINCT date_trunc('week', created_at)::date AS week_start
+    FROM notifications_old
+    WHERE created_at IS NOT NULL
+    UNION
+    SELECT date_trunc('week', now())::date
+    UNION
+    SELECT (date_trunc('week', now()) + interval '1 week')::date
+) AS weeks;
+
+-- Keep a partition ready for next week when pg_cron is available
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'notifications-next-partition',
+            '0 0 * * 1',
+            $cron$SELECT ensure_notifications_partition((date_trunc('week', now()) + interval '1 week')::date)$cron$
+        );
+    END IF;
+END
+$$;
+"""
+
+_UNSCHEDULE_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.unschedule('notifications-next-partition');
+    END IF;
+END
+$$
+"""
+
+# Notifications are always read per user, filtered by status and newest
+# first. Built in-transaction: CONCURRENTLY is not supported on
+# partitioned tables.
+_CREATE_INDEX_SQL = (
+    'CREATE INDEX idx_notifications_user_status_created '
+    'ON notifications (user_id, status, created_at DESC)'
+)
+
+
+def _compression() -> str:
+    """Column option that switches ``data`` to lz4 TOAST compression on PG14+."""
+    bind = op.get_bind()
+    return ' COMPRESSION lz4' if bind.dialect.server_version_info >= (14,) else ''
+
+
+def _set_aside(table: str) -> None:
+    """Rename the current notifications table out of the way.
+
+    Its primary key and user index are renamed or dropped so the names are
+    free for the new table, which takes over the id sequence.
+    """
+    op.execute(f'ALTER TABLE notifications RENAME TO {table}')
+    op.execute(f'ALTER TABLE {table} RENAME CONSTRAINT notifications_pkey TO {table}_pkey')
+    op.execute('DROP INDEX idx_notifications_user_status_created')
+
+
+def _take_over_sequence(old_table: str) -> None:
+    """Move the id sequence to the new table and drop the old one."""
+    op.execute('ALTER SEQUENCE notifications_id_seq OWNED BY notifications.id')
+    op.execute(f'DROP TABLE {old_table}')
+
+
+def upgrade() -> None:
+    _set_aside('notifications_old')
+    op.execute(
+        _CREATE_TABLE_SQL.format(
+            compression=_compression(),
+            created_at='NOT NULL DEFAULT now()',
+            pk='id, created_at',
+            table_options=' PARTITION BY RANGE (created_at)',
+        )
+    )
+    op.execute(_PARTITION_SQL)
+    op.execute(
+        f'INSERT INTO notifications ({_COPY_COLUMNS}) '
+        f'SELECT id, type, title, content, data, coalesce(created_at, now()), '
+        f'sent_at, read_at, status, user_id FROM notifications_old'
+    )
+    _take_over_sequence('notifications_old')
+    op.execute(_CREATE_INDEX_SQL)
+
+
+def downgrade() -> None:
+    op.execute(_UNSCHEDULE_SQL)
+    _set_aside('notifications_partitioned')
+    op.execute(
+        _CREATE_TABLE_SQL.format(
+            compression=_compression(),
+            created_at='DEFAULT now()',
+            pk='id',
+            table_options=' WITH (fillfactor = 90)',
+        )
+    )
+    op.execute(
+        f'INSERT INTO notifications ({_COPY_COLUMNS}) '
+        f'SELECT {_COPY_COLUMNS} FROM notifications_partitioned'
+    )
+    _take_over_sequence('notifications_partitioned')
+    op.execute('DROP FUNCTION ensure_notifications_partition(date)')
+    op.execute('ALTER INDEX notifications_pkey SET (fillfactor = 90)')
+    op.execute(_CREATE_INDEX_SQL)
@@ -8,7 +8,7 @@ Create Date: 2023-04-14 20:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
-import uuid
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 # revision identifiers, used by Alembic.
 revision = '001_initial'
@@ -16,12 +16,39 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+# Enum types used by the tables below. They are created by _ddl_script,
+# since CreateTable only names them
+_LISTING_STATUS = postgresql.ENUM(
+    'NEW', 'PROCESSED', 'MATCHED', 'ARCHIVED', 'ERROR', name='listing_status', create_type=False
+)
+_NOTIFICATION_METHODS = postgresql.ENUM('email', 'sms', 'push', name='notification_methods', create_type=False)
+_ENUM_TYPES = (_LISTING_STATUS, _NOTIFICATION_METHODS)
 
-def upgrade() -> None:
-    # Create users table
-    op.create_table(
-        'users',
-        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+# JSONB columns that are TOASTed often enough to benefit from lz4 (PG14+)
+_LZ4_COLUMNS = (
+    ('users', 'preferences'),
+    ('user_auth', 'device_info'),
+    ('listings', 'metadata'),
+    ('listings', 'keywords'),
+    ('alerts', 'categories'),
+    ('alerts', 'keywords'),
+    ('notifications', 'data'),
+)
+
+
+def _schema() -> sa.MetaData:
+    """Declare the tables created by this revision.
+
+    The declarations live in the revision rather than being imported from
+    the models so that the migration keeps describing the schema as of
+    this revision.
+    """
+    metadata = sa.MetaData()
+
+    # Users table
+    sa.Table(
+        'users', metadata,
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column('username', sa.String(50), unique=True, nullable=False, index=True),
         sa.Column('email', sa.String(100), unique=True, nullable=False, index=True),
         sa.Column('password_hash', sa.String(255), nullable=False),
@@ -29,40 +56,40 @@ def upgrade() -> None:
         sa.Column('last_name', sa.String(50), nullable=True),
         sa.Column('is_active', sa.Boolean(), default=True),
         sa.Column('is_admin', sa.Boolean(), default=False),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('last_login', sa.DateTime(), nullable=True),
         sa.Column('preferences', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
     )
-    
-    # Create API Keys table
-    op.create_table(
-        'api_keys',
+
+    # API Keys table
+    sa.Table(
+        'api_keys', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
         sa.Column('key', sa.String(64), unique=True, nullable=False, index=True),
         sa.Column('name', sa.String(100), nullable=False),
         sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('last_used_at', sa.DateTime(), nullable=True),
         sa.Column('expires_at', sa.DateTime(), nullable=True),
     )
-    
-    # Create user_auth table for session tokens
-    op.create_table(
-        'user_auth',
+
+    # user_auth table for session tokens
+    sa.Table(
+        'user_auth', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
         sa.Column('token', sa.String(255), nullable=False, index=True),
         sa.Column('token_type', sa.String(20), nullable=False),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('expires_at', sa.DateTime(), nullable=False),
         sa.Column('device_info', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
         sa.Column('ip_address', sa.String(45), nullable=True),
     )
-    
-    # Create listings table
-    op.create_table(
-        'listings',
+
+    # Listings table
+    sa.Table(
+        'listings', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('listing_id', sa.String(255), unique=True, nullable=False, index=True),
         sa.Column('title', sa.String(512), nullable=False),
@@ -72,42 +99,45 @@ def upgrade() -> None:
         sa.Column('location', sa.String(255), nullable=True, index=True),
         sa.Column('category', sa.String(255), nullable=True, index=True),
         sa.Column('url', sa.String(1024), nullable=True),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
-        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
+        # Kept current on UPDATE by trg_*_updated_at (009_updated_at_triggers)
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('scraped_at', sa.DateTime(), nullable=False),
         sa.Column('search_term', sa.String(255), nullable=True),
-        sa.Column('status', sa.Enum('NEW', 'PROCESSED', 'MATCHED', 'ARCHIVED', 'ERROR', name='listing_status'), default='NEW'),
+        # Converted to SMALLINT by 003_listing_status_smallint
+        sa.Column('status', _LISTING_STATUS, default='NEW'),
         sa.Column('processed_at', sa.DateTime(), nullable=True),
         sa.Column('keywords', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        # Renamed to 'extra' by 008_rename_listing_metadata
         sa.Column('metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
     )
-    
-    # Create listing_images table
-    op.create_table(
-        'listing_images',
+
+    # listing_images table
+    sa.Table(
+        'listing_images', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('listing_id', sa.Integer(), sa.ForeignKey('listings.id', ondelete='CASCADE'), nullable=False),
         sa.Column('url', sa.String(1024), nullable=False),
         sa.Column('position', sa.Integer(), default=0),
         sa.Column('downloaded', sa.Boolean(), default=False),
         sa.Column('local_path', sa.String(1024), nullable=True),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
     )
-    
-    # Create search_terms table
-    op.create_table(
-        'search_terms',
+
+    # search_terms table
+    sa.Table(
+        'search_terms', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('term', sa.String(255), unique=True, nullable=False),
         sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('last_used_at', sa.DateTime(), nullable=True),
         sa.Column('total_listings_found', sa.Integer(), default=0),
     )
-    
-    # Create alerts table
-    op.create_table(
-        'alerts',
+
+    # Alerts table (saved searches)
+    sa.Table(
+        'alerts', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
         sa.Column('name', sa.String(255), nullable=False),
@@ -122,26 +152,27 @@ def upgrade() -> None:
         sa.Column('notification_sms', sa.String(50), nullable=True),
         sa.Column('notify_immediately', sa.Boolean(), default=True),
         sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
-        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
+        # Kept current on UPDATE by trg_*_updated_at (009_updated_at_triggers)
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('last_matched_at', sa.DateTime(), nullable=True),
     )
-    
-    # Create listing_alerts table (for many-to-many relationship)
-    op.create_table(
-        'listing_alerts',
+
+    # listing_alerts table (for many-to-many relationship)
+    sa.Table(
+        'listing_alerts', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('listing_id', sa.Integer(), sa.ForeignKey('listings.id', ondelete='CASCADE'), nullable=False),
         sa.Column('alert_id', sa.Integer(), sa.ForeignKey('alerts.id', ondelete='CASCADE'), nullable=False),
-        sa.Column('matched_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('matched_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('notified', sa.Boolean(), default=False),
         sa.Column('notified_at', sa.DateTime(), nullable=True),
         sa.UniqueConstraint('listing_id', 'alert_id', name='uq_listing_alert'),
     )
-    
-    # Create price_alerts table
-    op.create_table(
-        'price_alerts',
+
+    # price_alerts table; merged into alerts by 002_merge_alert_tables
+    price_alerts = sa.Table(
+        'price_alerts', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
         sa.Column('search_term', sa.String(255), nullable=True),
@@ -149,57 +180,129 @@ def upgrade() -> None:
         sa.Column('min_price', sa.Float(), nullable=True),
         sa.Column('max_price', sa.Float(), nullable=True),
         sa.Column('location', sa.String(255), nullable=True),
-        sa.Column('notification_method', sa.Enum('email', 'sms', 'push', name='notification_methods'), default='email'),
+        sa.Column('notification_method', _NOTIFICATION_METHODS, default='email'),
         sa.Column('notification_target', sa.String(255), nullable=False),
         sa.Column('is_active', sa.Boolean(), default=True),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('last_triggered', sa.DateTime(), nullable=True),
     )
-    
-    # Create alert_history table
-    op.create_table(
-        'alert_history',
+    sa.Index('idx_price_alerts_user_id', price_alerts.c.user_id)
+
+    # alert_history table
+    sa.Table(
+        'alert_history', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('alert_id', sa.Integer(), sa.ForeignKey('price_alerts.id', ondelete='CASCADE'), nullable=False),
         sa.Column('listing_id', sa.Integer(), sa.ForeignKey('listings.id', ondelete='CASCADE'), nullable=False),
-        sa.Column('triggered_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('triggered_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('notification_sent', sa.Boolean(), default=False),
         sa.Column('notification_time', sa.DateTime(), nullable=True),
     )
-    
-    # Create notifications table
-    op.create_table(
-        'notifications',
+
+    # Notifications table, partitioned by week in 011_partition_notifications
+    notifications = sa.Table(
+        'notifications', metadata,
         sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
         sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
         sa.Column('type', sa.String(50), nullable=False),
         sa.Column('title', sa.String(255), nullable=False),
         sa.Column('content', sa.Text(), nullable=False),
         sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
-        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()')),
         sa.Column('sent_at', sa.DateTime(), nullable=True),
         sa.Column('read_at', sa.DateTime(), nullable=True),
         sa.Column('status', sa.String(20), default='pending'),
     )
-    
-    # Create indexes
-    op.create_index('idx_listings_price', 'listings', ['price'])
-    op.create_index('idx_listings_scraped_at', 'listings', ['scraped_at'])
-    op.create_index('idx_alerts_user_id', 'alerts', ['user_id'])
-    op.create_index('idx_price_alerts_user_id', 'price_alerts', ['user_id'])
-    op.create_index('idx_notifications_user_id', 'notifications', ['user_id'])
-    op.create_index('idx_notifications_created_at', 'notifications', ['created_at'])
-    op.create_index('idx_notifications_status', 'notifications', ['status'])
-    op.create_index('idx_user_auth_user_id', 'user_auth', ['user_id'])
-    op.create_index('idx_api_keys_user_id', 'api_keys', ['user_id'])
-    
+
+    # Notifications are always read per user, filtered by status and
+    # newest first, so a single composite index serves all of them
+    sa.Index(
+        'idx_notifications_user_status_created',
+        notifications.c.user_id,
+        notifications.c.status,
+        notifications.c.created_at.desc(),
+    )
+
+    return metadata
+
+
+# Storage tweaks that have no Table-level equivalent
+_POST_CREATE_SQL = """
+-- Hot tables get updated in place (status flips, notified flags), so
+-- leave room in the heap and primary key pages for HOT updates. Set here
+-- rather than on the Table: SQLAlchemy 2.0 has no Table-level
+-- postgresql_with. The tables are still empty, so every page gets it.
+ALTER TABLE listings SET (fillfactor = 90);
+ALTER INDEX listings_pkey SET (fillfactor = 90);
+ALTER TABLE notifications SET (fillfactor = 90);
+ALTER INDEX notifications_pkey SET (fillfactor = 90);
+"""
+
+
+def _ddl_script(metadata: sa.MetaData, lz4: bool = False) -> str:
+    """Render the whole transactional part of the schema as one SQL script.
+
+    Args:
+        metadata: Tables to create, see ``_schema()``
+        lz4: Switch the large JSONB columns to lz4 TOAST compression
+
+    Returns:
+        Semicolon-separated CREATE TABLE / CREATE INDEX statements followed
+        by ``_POST_CREATE_SQL``
+    """
+    dialect = postgresql.dialect()
+    statements = [
+        'CREATE TYPE {} AS ENUM ({})'.format(enum.name, ', '.join(f"'{label}'" for label in enum.enums))
+        for enum in _ENUM_TYPES
+    ]
+    for table in metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)).strip())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(str(CreateIndex(index).compile(dialect=dialect)).strip())
+
+    if lz4:
+        statements.extend(
+            f'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4'
+            for table, column in _LZ4_COLUMNS
+        )
+
+    return ';\n\n'.join(statements) + ';\n' + _POST_CREATE_SQL
+
+
+def upgrade() -> None:
+    # Send every CREATE in a single round-trip so Postgres parses and
+    # commits the catalog changes as one batch
+    bind = op.get_bind()
+    op.execute(_ddl_script(_schema(), lz4=bind.dialect.server_version_info >= (14,)))
+
+    # Create indexes concurrently so deploys never hold an exclusive lock
+    # on tables the API is serving from. CONCURRENTLY cannot run inside a
+    # transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        op.create_index('idx_listings_price', 'listings', ['price'], postgresql_concurrently=True)
+        op.create_index('idx_listings_scraped_at', 'listings', ['scraped_at'], postgresql_concurrently=True)
+        # Containment lookups (keywords @> '["..."]') used by alert matching
+        op.create_index(
+            'idx_listings_keywords',
+            'listings',
+            ['keywords'],
+            postgresql_using='gin',
+            postgresql_ops={'keywords': 'jsonb_path_ops'},
+            postgresql_where=sa.text('keywords IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+        op.create_index('idx_alerts_user_id', 'alerts', ['user_id'], postgresql_concurrently=True)
+        op.create_index('idx_user_auth_user_id', 'user_auth', ['user_id'], postgresql_concurrently=True)
+        op.create_index('idx_api_keys_user_id', 'api_keys', ['user_id'], postgresql_concurrently=True)
+
 
 def downgrade() -> None:
     # Drop all tables in reverse order
     op.drop_table('notifications')
-    op.drop_table('alert_history')
-    op.drop_table('price_alerts')
-    op.drop_table('listing_alerts')
+    # 002_merge_alert_tables does not restore the pre-merge tables on
+    # downgrade, so either layout may be present here
+    for table in ('alert_matches', 'alert_history', 'price_alerts', 'listing_alerts'):
+        op.execute(f'DROP TABLE IF EXISTS {table}')
     op.drop_table('alerts')
     op.drop_table('search_terms')
     op.drop_table('listing_images')
@@ -207,7 +310,7 @@ def downgrade() -> None:
     op.drop_table('user_auth')
     op.drop_table('api_keys')
     op.drop_table('users')
-    
-    # Drop custom types
+    # IF EXISTS: 002 drops notification_methods and does not recreate it
+    op.execute('DROP TYPE IF EXISTS notification_methods')
     op.execute('DROP TYPE IF EXISTS listing_status')
-    op.execute('DROP TYPE IF EXISTS notification_methods') 
\ No newline at end of file
+ 
\ No newline at end of file
@@ -2,14 +2,15 @@
 
 from fastapi import FastAPI, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from starlette.middleware import Middleware
+from fastapi.responses import ORJSONResponse
 import time
 import logging
 from typing import Callable
 
 from backend.shared.config.settings import get_settings
 from backend.shared.config.logging_config import configure_logging, get_logger
-from backend.services.api.src.middleware.logging import LoggingMiddleware
+from backend.services.api.src.middleware.logging import RequestLoggingMiddleware
 from backend.services.api.src.middleware.metrics import MetricsMiddleware
 from backend.services.api.src.middleware.rate_limit import RateLimitMiddleware
 from backend.services.api.src.middleware.auth import AuthMiddleware
@@ -23,8 +24,47 @@ from backend.services.api.src.websocket import websocket_manager
 configure_logging(service_name="api-service")
 logger = get_logger("api")
 
-# Get settings
-settings = get_settings("api")
+
+async def global_exception_handler(request: Request, exc: Exception):
+    """Global exception handler for unhandled exceptions"""
+    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    return ORJSONResponse(
+        status_code=500,
+        content={
+            "error": "Internal Server Error",
+            "message": "An unexpected error occurred"
+        }
+    )
+
+
+async def startup_event():
+    """Startup event handler"""
+    logger.info("API service starting")
+    
+    # Any startup initialization can go here
+    # e.g., database connections, warm up caches, etc.
+
+
+async def shutdown_event():
+    """Shutdown event handler"""
+    logger.info("API service shutting down")
+    
+    # Close WebSocket connections
+    try:
+        await websocket_manager.close_all()
+        logger.info("Closed all WebSocket connections")
+    except Exception as e:
+        logger.error(f"Error closing WebSocket connections: {str(e)}")
+
+
+async def root():
+    """Root endpoint"""
+    return {
+        "name": "Facebook Marketplace Scraper API",
+        "version": "2.0.0",
+        "docs": "/docs",
+    }
+
 
 def create_app() -> FastAPI:
     """
@@ -33,6 +73,23 @@ def create_app() -> FastAPI:
     Returns:
         FastAPI: Configured application instance
     """
+    settings = get_settings("api")
+    
+    # Middleware runs in list order, outermost first
+    middleware = [
+        Middleware(
+            CORSMiddleware,
+            allow_origins=settings.cors_origins,
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        ),
+        Middleware(RequestLoggingMiddleware),
+        Middleware(MetricsMiddleware),
+        Middleware(RateLimitMiddleware),
+        Middleware(AuthMiddleware),
+    ]
+    
     # Create FastAPI app
     app = FastAPI(
         title="Facebook Marketplace Scraper API",
@@ -40,57 +97,14 @@ def create_app() -> FastAPI:
         version="2.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
+        middleware=middleware,
     )
     
-    # Setup CORS
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=settings.cors_origins,
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
-    
-    # Add custom middleware
-    app.add_middleware(LoggingMiddleware)
-    app.add_middleware(MetricsMiddleware)
-    app.add_middleware(RateLimitMiddleware)
-    app.add_middleware(AuthMiddleware)
-    
-    # Register exception handlers
-    @app.exception_handler(Exception)
-    async def global_exception_handler(request: Request, exc: Exception):
-        """Global exception handler for unhandled exceptions"""
-        logger.error(f"Unhandled exception: {exc}", exc_info=True)
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": "Internal Server Error",
-                "message": "An unexpected error occurred"
-            }
-        )
-    
-    # Register startup event handler
-    @app.on_event("startup")
-    async def startup_event():
-        """Startup event handler"""
-        logger.info("API service starting")
-        
-        # Any startup initialization can go here
-        # e.g., database connections, warm up caches, etc.
-    
-    # Register shutdown event handler
-    @app.on_event("shutdown")
-    async def shutdown_event():
-        """Shutdown event handler"""
-        logger.info("API service shutting down")
-        
-        # Close WebSocket connections
-        try:
-            await websocket_manager.close_all()
-            logger.info("Closed all WebSocket connections")
-        except Exception as e:
-            logger.error(f"Error closing WebSocket connections: {str(e)}")
+    # Register exception and lifecycle handlers
+    app.add_exception_handler(Exception, global_exception_handler)
+    app.add_event_handler("startup", startup_event)
+    app.add_event_handler("shutdown", shutdown_event)
     
     # Setup API routes
     
@@ -108,16 +122,9 @@ def create_app() -> FastAPI:
     app.include_router(websocket_routes.router)
     
     # Root endpoint
-    @app.get("/")
-    async def root():
-        """Root endpoint"""
-        return {
-            "name": "Facebook Marketplace Scraper API",
-            "version": "2.0.0",
-            "docs": "/docs",
-        }
+    app.add_api_route("/", root, methods=["GET"])
     
     return app
 
 # Create the FastAPI application instance
-app = create_app() 
\ No newline at end of file
+app = create_app()
@@ -1,59 +1,171 @@
 """Database session management for the API service."""
 
 import logging
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
 from shared.config.settings import get_settings
 
-# Get settings
-settings = get_settings("api")
-
 # Configure logging
 logger = logging.getLogger("api.database")
 
-# Create the SQLAlchemy engine
-engine = create_engine(
-    settings.database.url,
-    pool_size=settings.database.pool_size,
-    max_overflow=settings.database.max_overflow,
-    pool_timeout=settings.database.pool_timeout,
-    pool_recycle=settings.database.pool_recycle,
-    echo=settings.database.echo,
-)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# asyncpg prepares every statement it runs; SQLAlchemy keeps the prepared
+# handles per connection in an LRU of this size (default 100). Filtered
+# endpoints produce one statement per combination of filters, enough to
+# overflow the default and re-prepare on every miss
+_PREPARED_STATEMENT_CACHE_SIZE = "500"
+
+
+def _async_url(url: str) -> URL:
+    """Point a plain PostgreSQL URL at the asyncpg driver."""
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    parsed = make_url(url)
+    if parsed.get_driver_name() == "asyncpg" and "prepared_statement_cache_size" not in parsed.query:
+        parsed = parsed.update_query_dict({"prepared_statement_cache_size": _PREPARED_STATEMENT_CACHE_SIZE})
+    return parsed
+
+
+@lru_cache(maxsize=None)
+def get_engine() -> AsyncEngine:
+    """
+    Get the async engine used by request handlers.
+
+    Built on first use rather than at import so that importing this module
+    (e.g. from Alembic or tests) never opens a connection pool.
+    """
+    settings = get_settings("api")
+    return create_async_engine(
+        _async_url(settings.database.url),
+        pool_size=settings.database.pool_size,
+        max_overflow=settings.database.max_overflow,
+        pool_timeout=settings.database.pool_timeout,
+        pool_recycle=settings.database.pool_recycle,
+        # Validate connections on checkout and reuse the most recently returned
+        # one first, so a small hot set of backends keeps its statement caches
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        echo=settings.database.echo,
+        connect_args={"server_settings": {"application_name": "api-service"}},
+    )
+
+
+@lru_cache(maxsize=None)
+def get_sessionmaker() -> async_sessionmaker:
+    """Get the async session factory bound to ``get_engine()``."""
+    return async_sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+
+
+@lru_cache(maxsize=None)
+def get_sync_engine() -> Engine:
+    """Get the blocking engine for code paths that have not moved to AsyncSession yet."""
+    settings = get_settings("api")
+    return create_engine(
+        settings.database.url,
+        pool_size=settings.database.pool_size,
+        max_overflow=settings.database.max_overflow,
+        pool_timeout=settings.database.pool_timeout,
+        pool_recycle=settings.database.pool_recycle,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        echo=settings.database.echo,
+        connect_args={"application_name": "api-service"},
+        # Rewrite ORM executemany() batches into multi-row INSERT/UPDATE statements
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=1000,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_sync_sessionmaker() -> sessionmaker:
+    """Get the blocking session factory bound to ``get_sync_engine()``."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_sync_engine())
+
 
 # Create base class for models
 Base = declarative_base()
 
 
-def get_db():
+class LazySession:
+    """
+    Session proxy that only opens the real session on first use.
+
+    Requests that declare a database dependency but never touch it skip
+    session construction and teardown entirely.
+    """
+
+    __slots__ = ("_factory", "_db")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._db = None
+
+    def __getattr__(self, name):
+        if self._db is None:
+            self._db = self._factory()
+        return getattr(self._db, name)
+
+
+async def get_db():
     """
-    Get a database session.
-    
+    Get an async database session.
+
     This function is used as a dependency in FastAPI route functions.
-    It yields a database session and ensures it is closed after use.
+    It yields a lazily opened session and ensures it is closed after use.
     """
-    db = SessionLocal()
+    lazy = LazySession(get_sessionmaker())
     try:
-        yield db
+        yield lazy
     finally:
-        db.close()
+        if lazy._db is not None:
+            await lazy._db.close()
 
 
-@contextmanager
-def get_db_context():
+def get_sync_db():
+    """
+    Get a blocking database session.
+
+    Kept for routes that still use the synchronous ``Session`` API.
+    """
+    lazy = LazySession(get_sync_sessionmaker())
+    try:
+        yield lazy
+    finally:
+        if lazy._db is not None:
+            lazy._db.close()
+
+
+@asynccontextmanager
+async def get_db_context():
     """
-    Get a database session as a context manager.
-    
+    Get an async database session as a context manager.
+
     This function is used in non-FastAPI contexts where a dependency
     can't be used, such as background tasks or scripts.
     """
-    db = SessionLocal()
+    async with get_sessionmaker()() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Database error: {str(e)}")
+            raise
+
+
+@contextmanager
+def get_sync_db_context():
+    """
+    Get a blocking database session as a context manager.
+
+    Intended for scripts and worker threads that cannot await.
+    """
+    db = get_sync_sessionmaker()()
     try:
         yield db
     except Exception as e:
@@ -64,20 +176,21 @@ def get_db_context():
         db.close()
 
 
-def init_db():
+async def init_db():
     """
     Initialize the database.
-    
+
     This function creates all tables if they don't exist.
     It's meant to be called during application startup.
     """
     try:
         # Import all models to ensure they are registered with the Base
         from shared.models.marketplace import Listing, PriceAlert, User
-        
+
         # Create all tables
-        Base.metadata.create_all(bind=engine)
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
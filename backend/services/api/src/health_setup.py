@@ -4,9 +4,10 @@ import logging
 import os
 import time
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
-from fastapi import FastAPI, Depends, Response, status
+import orjson
+from fastapi import APIRouter, FastAPI, Depends, Response, status
 from pydantic import BaseModel
 
 # Import logging config
@@ -14,10 +15,19 @@ from shared.config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Resolved once per process; the environment does not change at runtime
+_VERSION = os.getenv("VERSION", "2.0.0")
+
+# How long a rendered /health payload may be served from cache
+HEALTH_CACHE_TTL_SECONDS = 1.0
+
+# Components that must be healthy for the service to accept traffic
+_CORE = frozenset(("service", "database", "auth-provider"))
+
 class HealthStatus(BaseModel):
     """Model representing the health status of the service"""
     status: str = "ok"
-    version: str = os.getenv("VERSION", "2.0.0")
+    version: str = _VERSION
     service: str = "api-service"
     checks: Dict[str, bool] = {}
     details: Dict[str, str] = {}
@@ -32,6 +42,8 @@ class HealthCheck:
             service_name: The name of the service
         """
         self.service_name = service_name
+        # Fields of the /health payload that never change
+        self._envelope = {"service": service_name, "version": _VERSION}
         self.checks = {
             "service": True,
             "database": False,
@@ -48,7 +60,12 @@ class HealthCheck:
             "processor-service": "Not connected",
             "scraper-service": "Not connected"
         }
+        # Running tallies of failing components so probes never rescan checks
+        self._unhealthy_count = sum(1 for ok in self.checks.values() if not ok)
+        self._core_unhealthy_count = sum(1 for comp in _CORE if not self.checks.get(comp, False))
         self.start_time = time.time()
+        # (rendered_at, payload) for the last /health response
+        self._cached: Tuple[float, bytes] = (0.0, b"")
         logger.info(f"Health check initialized for {service_name}")
     
     def set_component_status(self, component: str, status: bool, details: str) -> None:
@@ -59,51 +76,90 @@ class HealthCheck:
             status: Whether the component is healthy
             details: Details about the component status
         """
+        status = bool(status)
         if component in self.checks:
             old_status = self.checks[component]
             self.checks[component] = status
             self.details[component] = details
             
             if old_status != status:
+                delta = -1 if status else 1
+                self._unhealthy_count += delta
+                if component in _CORE:
+                    self._core_unhealthy_count += delta
+                self._cached = (0.0, b"")
                 log_level = logging.INFO if status else logging.ERROR
                 logger.log(log_level, f"Component {component} health changed to {status}: {details}")
         else:
             self.checks[component] = status
             self.details[component] = details
+            if not status:
+                self._unhealthy_count += 1
+            if component in _CORE:
+                # Missing core components were already counted as failing
+                if status:
+                    self._core_unhealthy_count -= 1
+            self._cached = (0.0, b"")
             logger.info(f"Added new component {component} with health {status}: {details}")
     
+    def _status(self) -> str:
+        """Get the overall status string
+        
+        Returns:
+            "ok", "degraded" or "error"
+        """
+        # Any failing component degrades the service; a failing core
+        # component puts it in error state
+        if self._unhealthy_count == 0:
+            return "ok"
+        if self._core_unhealthy_count:
+            return "error"
+        return "degraded"
+    
     def get_health(self) -> HealthStatus:
         """Get the overall health status
         
         Returns:
             The health status object
         """
-        status = "ok"
-        
-        # Check if any component is unhealthy
-        if not all(self.checks.values()):
-            status = "degraded"
-            
-        # If the core components are down, the service is in error state
-        core_components = ["service", "database", "auth-provider"]
-        if not all(self.checks.get(comp, False) for comp in core_components):
-            status = "error"
-            
         return HealthStatus(
-            status=status,
-            version=os.getenv("VERSION", "2.0.0"),
+            status=self._status(),
+            version=_VERSION,
             service=self.service_name,
             checks=self.checks,
             details=self.details
         )
     
+    def get_health_json(self) -> bytes:
+        """Get the overall health status rendered as JSON
+        
+        The payload is cached for ``HEALTH_CACHE_TTL_SECONDS`` and dropped
+        as soon as a component changes state.
+        
+        Returns:
+            The JSON-encoded health status
+        """
+        now = time.monotonic()
+        rendered_at, payload = self._cached
+        if payload and now - rendered_at < HEALTH_CACHE_TTL_SECONDS:
+            return payload
+        
+        payload = orjson.dumps({
+            "status": self._status(),
+            **self._envelope,
+            "checks": self.checks,
+            "details": self.details,
+        })
+        self._cached = (now, payload)
+        return payload
+    
     def is_healthy(self) -> bool:
         """Check if the service is healthy
         
         Returns:
             True if all components are healthy, False otherwise
         """
-        return all(self.checks.values())
+        return self._unhealthy_count == 0
     
     def is_ready(self) -> bool:
         """Check if the service is ready
@@ -111,8 +167,7 @@ class HealthCheck:
         Returns:
             True if the service and core components are healthy, False otherwise
         """
-        required_components = ["service", "database", "auth-provider"]
-        return all(self.checks.get(component, False) for component in required_components)
+        return self._core_unhealthy_count == 0
     
     def is_alive(self) -> bool:
         """Check if the service is alive
@@ -152,63 +207,92 @@ def create_health_check(service_name: str = "api-service") -> HealthCheck:
     """
     return HealthCheck(service_name)
 
-def setup_health_checks(app: FastAPI, health_check: HealthCheck) -> None:
-    """Set up health check endpoints for the FastAPI app
+_default_health_check: Optional[HealthCheck] = None
+
+def get_health_check() -> HealthCheck:
+    """Get the process-wide health check manager
     
-    Args:
-        app: The FastAPI application
-        health_check: The health check manager
+    Created on first use so that ``start_time`` and component state are
+    shared by every caller.
+    
+    Returns:
+        The health check manager
     """
-    @app.get("/health", tags=["Health"])
-    async def health():
-        """Get the health status of the service"""
-        health_status = health_check.get_health()
-        return health_status
-    
-    @app.get("/health/ready", tags=["Health"])
-    async def ready(response: Response):
-        """Check if the service is ready to handle requests"""
-        is_ready = health_check.is_ready()
-        if not is_ready:
-            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    global _default_health_check
+    if _default_health_check is None:
+        _default_health_check = create_health_check()
+    return _default_health_check
+
+router = APIRouter(tags=["Health"])
+
+@router.get("/health")
+async def health(health_check: HealthCheck = Depends(get_health_check)):
+    """Get the health status of the service"""
+    return Response(content=health_check.get_health_json(), media_type="application/json")
+
+@router.get("/health/ready")
+async def ready(response: Response, health_check: HealthCheck = Depends(get_health_check)):
+    """Check if the service is ready to handle requests"""
+    is_ready = health_check.is_ready()
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    return {
+        "ready": is_ready,
+        "uptime": health_check.uptime()
+    }
+
+@router.get("/health/live")
+async def live(response: Response, health_check: HealthCheck = Depends(get_health_check)):
+    """Check if the service is alive"""
+    is_alive = health_check.is_alive()
+    if not is_alive:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
         
+    return {
+        "alive": is_alive,
+        "uptime": health_check.uptime()
+    }
+
+@router.get("/health/component/{component}")
+async def component_status(component: str, health_check: HealthCheck = Depends(get_health_check)):
+    """Get the status of a specific component"""
+    if component in health_check.checks:
         return {
-            "ready": is_ready,
-            "uptime": health_check.uptime()
+            "component": component,
+            "healthy": health_check.checks[component],
+            "details": health_check.details[component]
         }
-    
-    @app.get("/health/live", tags=["Health"])
-    async def live(response: Response):
-        """Check if the service is alive"""
-        is_alive = health_check.is_alive()
-        if not is_alive:
-            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
-            
-        return {
-            "alive": is_alive,
-            "uptime": health_check.uptime()
+    return {"error": f"Component {component} not found"}
+
+@router.get("/health/dependencies")
+async def dependencies(health_check: HealthCheck = Depends(get_health_check)):
+    """Get the status of dependent services"""
+    return {
+        "dependencies": health_check.dependent_services_status(),
+        "details": {
+            k: health_check.details.get(f"{k}-service", "Unknown") 
+            for k in ["processor", "scraper"]
         }
+    }
+
+def setup_health_checks(app: FastAPI, health_check: Optional[HealthCheck] = None) -> HealthCheck:
+    """Set up health check endpoints for the FastAPI app
     
-    @app.get("/health/component/{component}", tags=["Health"])
-    async def component_status(component: str):
-        """Get the status of a specific component"""
-        if component in health_check.checks:
-            return {
-                "component": component,
-                "healthy": health_check.checks[component],
-                "details": health_check.details[component]
-            }
-        return {"error": f"Component {component} not found"}
-    
-    @app.get("/health/dependencies", tags=["Health"])
-    async def dependencies():
-        """Get the status of dependent services"""
-        return {
-            "dependencies": health_check.dependent_services_status(),
-            "details": {
-                k: health_check.details.get(f"{k}-service", "Unknown") 
-                for k in ["processor", "scraper"]
-            }
-        }
+    Args:
+        app: The FastAPI application
+        health_check: Optional health check manager, defaults to the
+            shared instance from ``get_health_check()``
+        
+    Returns:
+        The health check manager serving the endpoints
+    """
+    if health_check is not None:
+        app.dependency_overrides[get_health_check] = lambda: health_check
+    else:
+        health_check = get_health_check()
+    
+    app.include_router(router)
     
-    logger.info("Health check endpoints configured") 
\ No newline at end of file
+    logger.info("Health check endpoints configured")
+    return health_check
@@ -3,20 +3,9 @@
 import argparse
 import uvicorn
 import os
-import sys
 from dotenv import load_dotenv
 
-# Add the root directory to the Python path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-sys.path.append(parent_dir)
-
-# Load environment variables from .env file
-load_dotenv()
-
-from backend.shared.config.settings import get_settings
 from backend.shared.config.logging_config import configure_logging, get_logger
-from backend.services.api.src.app import app  # Import the FastAPI app instance
 
 def parse_args():
     """Parse command line arguments"""
@@ -44,6 +33,12 @@ def parse_args():
         default=os.getenv("LOG_LEVEL", "info"),
         choices=["debug", "info", "warning", "error", "critical"]
     )
+    parser.add_argument(
+        "--workers", 
+        help="Number of worker processes (ignored with --reload)", 
+        type=int, 
+        default=int(os.getenv("API_WORKERS", os.cpu_count() or 2))
+    )
     return parser.parse_args()
 
 def main():
@@ -63,15 +58,35 @@ def main():
     logger.info(f"Environment: {os.getenv('ENVIRONMENT', 'development')}")
     logger.info(f"Debug mode: {args.reload}")
     
-    # Start the server
+    # Reload and multiple workers are mutually exclusive in uvicorn
+    workers = 1 if args.reload else args.workers
+    logger.info(f"Workers: {workers}")
+    
+    # Start the server on uvloop + httptools; one process per core keeps
+    # the CPU-bound middleware stack (auth, rate limiting) off a single GIL.
+    # Every worker runs its own WebSocket Kafka consumer in a group of its
+    # own; without Redis, rate limits are enforced per worker
     uvicorn.run(
         "backend.services.api.src.app:app",
         host=args.host,
         port=args.port,
         reload=args.reload,
         log_level=args.log_level.lower(),
-        access_log=True
+        access_log=True,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        # Broadcast frames are compressed once by the WebSocket manager for
+        # clients that ask for it; per-connection deflate would redo that
+        # work and keep a compressor per socket
+        ws_per_message_deflate=False,
+        limit_concurrency=1024,
+        timeout_keep_alive=30,
+        backlog=2048
     )
 
 if __name__ == "__main__":
+    # Load environment variables from .env file. Only the CLI entry needs
+    # this; uvicorn workers inherit the environment when they re-import the app.
+    load_dotenv()
     main() 
\ No newline at end of file
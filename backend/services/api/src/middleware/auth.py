@@ -1,12 +1,18 @@
 """Authentication middleware for the API service."""
 
+import asyncio
+import os
 import time
 import jwt
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+from cachetools import TTLCache
 from fastapi import Request, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
-from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Receive, Scope, Send
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.config.settings import get_settings
 from shared.models.marketplace import User
@@ -17,117 +23,202 @@ settings = get_settings("api")
 JWT_SECRET = settings.auth.jwt_secret
 JWT_ALGORITHM = settings.auth.jwt_algorithm
 
+
+def _prepare_keys(secret: str, algorithm: str) -> Tuple[Any, Any]:
+    """
+    Parse the configured JWT secret once into key objects.
+    
+    For asymmetric algorithms the secret is a PEM private key; parsing it
+    on every encode/decode would dominate the cost of each call.
+    
+    Args:
+        secret: HMAC secret or PEM-encoded private key
+        algorithm: JWT algorithm name, e.g. HS256 or RS256
+        
+    Returns:
+        Tuple of (signing key, verification key)
+    """
+    signing_key = jwt.get_algorithm_by_name(algorithm).prepare_key(secret)
+    verification_key = signing_key.public_key() if hasattr(signing_key, "public_key") else signing_key
+    return signing_key, verification_key
+
+
+_SIGNING_KEY, _VERIFICATION_KEY = _prepare_keys(JWT_SECRET, JWT_ALGORITHM)
+_ALGORITHMS = (JWT_ALGORITHM,)
+
 # Setup security bearer
 security = HTTPBearer()
 
-class AuthMiddleware(BaseHTTPMiddleware):
+_BEARER_HEADERS = {"WWW-Authenticate": "Bearer"}
+
+
+def _unauthorized(detail: str) -> ORJSONResponse:
+    """
+    Build a 401 response for middleware.
+    
+    Middleware runs outside FastAPI's exception handlers, so an exception
+    raised there would surface as a 500 instead of reaching the client.
+    """
+    return ORJSONResponse({"detail": detail}, status_code=401, headers=_BEARER_HEADERS)
+
+
+# Canonical middleware 401s, built once. A response holds no per-request
+# state, so the same instance can be sent to every client
+_MISSING_AUTH_HEADER = _unauthorized("Missing Authorization header")
+_INVALID_SCHEME = _unauthorized("Invalid authentication scheme")
+_INVALID_CREDENTIALS = _unauthorized("Invalid authentication credentials")
+_TOKEN_EXPIRED = _unauthorized("Token has expired")
+
+
+# Verified token payloads keyed by the raw token. Polling clients reuse the
+# same bearer token for many requests, so most requests skip signature
+# verification. Expiry is re-checked on every cache hit.
+_token_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+
+# Signature verification is CPU-bound; run cache misses off the event loop
+_AUTH_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="jwt-decode")
+
+
+def _sync_decode(token: str, key: Any, algorithms: Sequence[str]) -> Dict[str, Any]:
+    """Verify and decode a JWT on the calling thread, including its exp claim."""
+    return jwt.decode(token, key, algorithms=algorithms, options={"require": ["exp", "sub"]})
+
+
+async def _decode_cached(
+    token: str,
+    key: Any = _VERIFICATION_KEY,
+    algorithms: Sequence[str] = _ALGORITHMS,
+) -> Dict[str, Any]:
+    """
+    Decode and verify a JWT, reusing the payload of a recently verified token.
+    
+    Only cache misses are sent to the auth thread pool.
+    
+    Args:
+        token: Raw bearer token
+        key: Prepared verification key
+        algorithms: Accepted JWT algorithms
+        
+    Returns:
+        The decoded token payload
+        
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired
+        jwt.PyJWTError: If the token is invalid (never cached)
+    """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        # PyJWT checked exp when the payload was cached; it may have passed since
+        if payload["exp"] < time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
+    else:
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(_AUTH_EXECUTOR, _sync_decode, token, key, algorithms)
+        _token_cache[token] = payload
+    return payload
+
+
+class AuthMiddleware:
     """
     Authentication middleware that verifies JWT tokens.
     
-    Excludes health check endpoints and OPTIONS requests.
+    Excludes health check endpoints and OPTIONS requests. Implemented as a
+    plain ASGI app rather than ``BaseHTTPMiddleware`` so requests are not
+    routed through an extra task group and response stream.
     """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        """Initialize the middleware with settings from configuration."""
+        self.app = app
+        # Read settings once here rather than through pydantic models per request
+        self._public_endpoints = frozenset(settings.auth.public_endpoints.split(","))
+        self._verification_key = _VERIFICATION_KEY
+        self._algorithms = _ALGORITHMS
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and handle authentication."""
-        # Skip authentication for health check endpoints and OPTIONS requests
-        if request.url.path.startswith("/health") or request.method == "OPTIONS":
-            return await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Skip authentication for public endpoints if configured
-        if request.url.path in settings.auth.public_endpoints.split(","):
-            return await call_next(request)
-            
-        auth_header = request.headers.get("Authorization")
+        # Skip authentication for health check endpoints, OPTIONS requests
+        # and public endpoints if configured
+        path = scope["path"]
+        if path.startswith("/health") or scope["method"] == "OPTIONS" or path in self._public_endpoints:
+            await self.app(scope, receive, send)
+            return
+        
+        auth_header = None
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                auth_header = value
+                break
         
         # Check if Authorization header exists
         if not auth_header:
-            return HTTPException(
-                status_code=401,
-                detail="Missing Authorization header",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            await _MISSING_AUTH_HEADER(scope, receive, send)
+            return
+        
+        # Compare the scheme on the raw bytes; only decode the token itself
+        if auth_header[:7].lower() != b"bearer ":
+            await _INVALID_SCHEME(scope, receive, send)
+            return
         
         # Verify JWT token
         try:
-            scheme, token = auth_header.split()
-            if scheme.lower() != "bearer":
-                raise HTTPException(
-                    status_code=401,
-                    detail="Invalid authentication scheme",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
+            token = auth_header[7:].strip().decode("ascii")
             
             # Verify and decode the token
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            
-            # Check token expiration
-            if payload.get("exp") < time.time():
-                raise HTTPException(
-                    status_code=401,
-                    detail="Token has expired",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
+            payload = await _decode_cached(token, self._verification_key, self._algorithms)
             
-            # Add user ID to request state
-            request.state.user_id = payload.get("sub")
-            
-        except jwt.PyJWTError:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=401,
-                detail=f"Authentication error: {str(e)}",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        except jwt.ExpiredSignatureError:
+            await _TOKEN_EXPIRED(scope, receive, send)
+            return
+        except (jwt.PyJWTError, ValueError):
+            # Malformed header, bad signature or missing exp/sub claim
+            await _INVALID_CREDENTIALS(scope, receive, send)
+            return
+        
+        # Add user ID to request state
+        scope.setdefault("state", {})["user_id"] = payload.get("sub")
         
         # Continue processing the request
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Get the current authenticated user.
     
     This is a dependency to be used in API endpoints where user information is needed.
+    The user is pinned on ``request.state`` so that other dependencies and
+    handlers in the same request reuse it instead of querying again.
     """
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    
     try:
         # Decode the JWT token
-        payload = jwt.decode(
-            credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM]
-        )
-        
-        # Check token expiration
-        if payload.get("exp") < time.time():
-            raise HTTPException(
-                status_code=401,
-                detail="Token has expired",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        payload = await _decode_cached(credentials.credentials)
         
         # Get user from database
-        user_id = payload.get("sub")
-        user = db.query(User).filter(User.id == user_id).first()
+        user_id = int(payload["sub"])
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
         
         if not user:
-            raise HTTPException(
-                status_code=401,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise HTTPException(status_code=401, detail="User not found", headers=_BEARER_HEADERS)
         
+        request.state.user = user
         return user
-    except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=401,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired", headers=_BEARER_HEADERS)
+    except (jwt.PyJWTError, TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token", headers=_BEARER_HEADERS)
 
 def create_access_token(user_id: str) -> str:
     """
@@ -151,4 +242,4 @@ def create_access_token(user_id: str) -> str:
     }
     
     # Encode and return the token
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM) 
\ No newline at end of file
+    return jwt.encode(payload, _SIGNING_KEY, algorithm=JWT_ALGORITHM) 
\ No newline at end of file
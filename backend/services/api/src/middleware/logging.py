@@ -1,90 +1,104 @@
 """
 Middleware for request/response logging in the API service.
 """
+import logging
+import os
 import time
-import uuid
-from typing import Callable
 
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi import FastAPI
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from shared.config.logging_config import get_logger
 
 logger = get_logger("api.middleware.logging")
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """
     Middleware for logging HTTP requests and responses.
     Adds request IDs, timing information, and structured logging.
     """
     
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Generate unique request ID
-        request_id = str(uuid.uuid4())
+        request_id = os.urandom(16).hex()
         
-        # Start timer
-        start_time = time.time()
+        # Start timer (monotonic, integer nanoseconds)
+        start_ns = time.perf_counter_ns()
         
         # Add request ID to request state
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
         
-        # Log the incoming request
-        logger.info(
-            f"Request started: {request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params),
-                "client_host": request.client.host if request.client else None,
-                "user_agent": request.headers.get("user-agent"),
-            }
-        )
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
         
-        try:
-            # Process the request
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            
-            # Log the response
+        # Log the incoming request; skip building the extras entirely when
+        # INFO is disabled
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
             logger.info(
-                f"Request completed: {request.method} {request.url.path}",
+                "Request started: %s %s", method, path,
                 extra={
                     "request_id": request_id,
-                    "status_code": response.status_code,
-                    "process_time_ms": round(process_time * 1000, 2),
+                    "method": method,
+                    "path": path,
+                    "query_params": scope["query_string"].decode("latin-1"),
+                    "client_host": client[0] if client else None,
+                    "user_agent": Headers(scope=scope).get("user-agent"),
                 }
             )
-            
-            return response
+        
+        status_code = None
+        
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add request ID to response headers
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+        
+        try:
+            # Process the request
+            await self.app(scope, receive, send_with_request_id)
             
         except Exception as e:
             # Calculate processing time
-            process_time = time.time() - start_time
+            process_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             # Log the exception
             logger.error(
-                f"Request failed: {request.method} {request.url.path}",
+                "Request failed: %s %s", method, path,
                 extra={
                     "request_id": request_id,
                     "error": str(e),
-                    "process_time_ms": round(process_time * 1000, 2),
+                    "process_time_ms": process_ms,
                 },
                 exc_info=True
             )
             
             # Re-raise the exception to let it be handled by exception handlers
             raise
+        
+        # Log the response
+        if log_info:
+            logger.info(
+                "Request completed: %s %s", method, path,
+                extra={
+                    "request_id": request_id,
+                    "status_code": status_code,
+                    "process_time_ms": (time.perf_counter_ns() - start_ns) // 1_000_000,
+                }
+            )
 
 
 def setup_request_logging(app: FastAPI) -> None:
@@ -2,12 +2,12 @@
 Middleware for collecting and exposing API metrics using Prometheus.
 """
 import time
-from typing import Callable
+from functools import lru_cache
+from typing import Dict, Tuple
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Response
 from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from shared.config.logging_config import get_logger
 
@@ -27,59 +27,102 @@ REQUEST_LATENCY = Histogram(
     buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
 )
 
+# Label for paths that match no route (404s), so scanners cannot mint new
+# label values
+_UNMATCHED_ENDPOINT = "unmatched"
 
-class MetricsMiddleware(BaseHTTPMiddleware):
+# Methods reported by name; anything else is counted as "OTHER"
+_KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+# (method, endpoint, status) -> bound (counter, histogram) children. Bounded
+# by routes x methods x status codes since endpoints are route patterns,
+# unmatched paths share one label and unknown methods are folded together.
+_CHILD_CACHE: Dict[Tuple[str, str, int], Tuple[Counter, Histogram]] = {}
+
+
+def _metric_children(key: Tuple[str, str, int]) -> Tuple[Counter, Histogram]:
+    """Resolve and remember the labelled metric children for a request key."""
+    method, endpoint, status = key
+    children = (
+        REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=status),
+        REQUEST_LATENCY.labels(method=method, endpoint=endpoint, status=status),
+    )
+    _CHILD_CACHE[key] = children
+    return children
+
+
+@lru_cache(maxsize=4096)
+def _normalize_endpoint(app: FastAPI, path: str) -> str:
+    """
+    Map a request path to the route pattern used as the metrics label.
+    
+    Cached per (app, path) so the route table is only scanned the first
+    time a path is seen. Routes are not added at runtime, so the cache
+    never needs invalidating.
+    
+    Args:
+        app: Application whose routes are matched
+        path: Raw request path
+        
+    Returns:
+        The matching route pattern, or ``_UNMATCHED_ENDPOINT`` if nothing matches
+    """
+    for route in app.routes:
+        if not hasattr(route, "path"):
+            continue
+        if route.path == path:
+            return path
+        if route.path.endswith("/{path:path}"):
+            # Handle catch-all routes
+            prefix = route.path.replace("/{path:path}", "")
+            if path.startswith(prefix + "/"):
+                return route.path
+        if route.path_regex.match(path):
+            return route.path
+    return _UNMATCHED_ENDPOINT
+
+
+class MetricsMiddleware:
     """
     Middleware for collecting request metrics.
     Tracks request counts and latency by method, endpoint, and status code.
     """
     
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Skip metrics collection for /metrics endpoint to avoid recursion
-        if request.url.path == "/metrics":
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
         # Start timer
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Process the request
-        response = await call_next(request)
+        await self.app(scope, receive, send_with_status)
         
         # Calculate processing time
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         
         # Get a normalized path (replace path params with {param})
-        endpoint = request.url.path
-        for route in request.app.routes:
-            if hasattr(route, "path") and route.path != endpoint:
-                path_format = route.path
-                if path_format.endswith("/{path:path}"):
-                    # Handle catch-all routes
-                    prefix = path_format.replace("/{path:path}", "")
-                    if endpoint.startswith(prefix + "/"):
-                        endpoint = path_format
-                        break
-                if route.path_regex.match(endpoint):
-                    endpoint = route.path
-                    break
+        endpoint = _normalize_endpoint(scope["app"], scope["path"])
         
         # Record metrics
-        REQUEST_COUNT.labels(
-            method=request.method,
-            endpoint=endpoint,
-            status=response.status_code
-        ).inc()
-        
-        REQUEST_LATENCY.labels(
-            method=request.method,
-            endpoint=endpoint,
-            status=response.status_code
-        ).observe(duration)
-        
-        return response
+        method = scope["method"]
+        key = (method if method in _KNOWN_METHODS else "OTHER", endpoint, status_code)
+        count, latency = _CHILD_CACHE.get(key) or _metric_children(key)
+        count.inc()
+        latency.observe(duration)
 
 
 async def metrics_endpoint():
@@ -1,22 +1,63 @@
 """Rate limiting middleware for the API service."""
 
 import time
-from typing import Dict, Tuple, Optional
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from array import array
+from typing import Optional, Tuple
+import redis.asyncio as redis
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from shared.config.settings import get_settings
+from shared.config.logging_config import get_logger
 
 # Get settings
 settings = get_settings("api")
 
+logger = get_logger("api.middleware.rate_limit")
+
+# Token bucket refill + take in one atomic step.
+# KEYS[1] = bucket key; ARGV = rate, per, burst, now.
+# Returns {allowed (0/1), retry_after seconds as a string}.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local per = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / per)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) * per / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+-- Idle buckets are full again after burst * per / rate seconds
+redis.call('EXPIRE', KEYS[1], math.ceil(per + burst * per / rate))
+return {allowed, tostring(retry_after)}
+"""
+
 class RateLimiter:
     """
     Simple in-memory rate limiter using the token bucket algorithm.
     
-    For production use, this should be replaced with a Redis-based implementation.
+    Bucket state is kept in two flat arrays (last update time and token
+    count) indexed by a hash of the client ID, rather than a dict of tuples,
+    so a check allocates nothing and memory is fixed up front. Clients that
+    hash to the same slot share a bucket, which can only ever throttle a
+    little early.
+    
+    Limits are per worker process; ``RedisRateLimiter`` is used instead
+    when ``api.redis_url`` is configured.
     """
     
-    def __init__(self, rate: int, per: int, burst: int = 1):
+    def __init__(self, rate: int, per: int, burst: int = 1, slots: int = 1 << 16):
         """
         Initialize the rate limiter.
         
@@ -24,11 +65,16 @@ class RateLimiter:
             rate: Number of requests allowed per time period
             per: Time period in seconds
             burst: Maximum burst size (additional tokens allowed)
+            slots: Number of buckets, rounded up to a power of two
         """
         self.rate = rate  # Tokens per second
         self.per = per    # Time window in seconds
         self.burst = burst
-        self.tokens: Dict[str, Tuple[float, int]] = {}  # client_id -> (last_updated, tokens)
+        self._refill_rate = rate / per
+        self._mask = (1 << max(slots - 1, 1).bit_length()) - 1
+        size = self._mask + 1
+        self._last = array("d", bytes(8 * size))        # slot -> last_updated
+        self._tokens = array("d", [float(burst)]) * size  # slot -> tokens
     
     def is_allowed(self, client_id: str) -> bool:
         """
@@ -41,31 +87,17 @@ class RateLimiter:
             True if the request is allowed, False otherwise
         """
         now = time.time()
+        slot = hash(client_id) & self._mask
         
-        # Get current token state for client, or initialize if new
-        if client_id not in self.tokens:
-            self.tokens[client_id] = (now, self.burst)
-            return True
-        
-        # Get last update time and token count
-        last_updated, tokens = self.tokens[client_id]
-        
-        # Calculate token refill based on time passed
-        time_passed = now - last_updated
-        token_refill = time_passed * (self.rate / self.per)
-        
-        # Update token count, but don't exceed burst limit
-        new_tokens = min(self.burst, tokens + token_refill)
-        
-        # Check if request can be allowed
-        if new_tokens >= 1:
-            # Deduct one token for this request
-            self.tokens[client_id] = (now, new_tokens - 1)
-            return True
-        else:
-            # Not enough tokens, request is denied
-            self.tokens[client_id] = (now, new_tokens)
-            return False
+        # Refill based on time passed, but don't exceed burst limit. Unused
+        # slots start full with a zero timestamp, so new clients get a full burst.
+        tokens = min(self.burst, self._tokens[slot] + (now - self._last[slot]) * self._refill_rate)
+        allowed = tokens >= 1
+        
+        # Deduct one token if the request is allowed
+        self._last[slot] = now
+        self._tokens[slot] = tokens - allowed
+        return allowed
     
     def get_retry_after(self, client_id: str) -> float:
         """
@@ -77,76 +109,150 @@ class RateLimiter:
         Returns:
             Seconds to wait before retrying
         """
-        if client_id not in self.tokens:
-            return 0
-        
-        last_updated, tokens = self.tokens[client_id]
+        tokens = self._tokens[hash(client_id) & self._mask]
         
         # Calculate how many tokens are needed
-        tokens_needed = 1 - tokens
+        tokens_needed = max(0.0, 1 - tokens)
         
         # Calculate time needed to refill those tokens
         return tokens_needed * self.per / self.rate
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RedisRateLimiter:
+    """
+    Token bucket rate limiter shared by all workers through Redis.
+    
+    Each check is a single EVALSHA of ``_TOKEN_BUCKET_LUA``, so the refill
+    and the take happen atomically and idle buckets expire on their own.
+    """
+    
+    def __init__(self, client: redis.Redis, rate: int, per: int, burst: int = 1, key_prefix: str = "rl"):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            client: Async Redis client
+            rate: Number of requests allowed per time period
+            per: Time period in seconds
+            burst: Maximum burst size (additional tokens allowed)
+            key_prefix: Prefix for Redis keys
+        """
+        self.rate = rate
+        self.per = per
+        self.burst = burst
+        self.key_prefix = key_prefix
+        # register_script sends EVALSHA and loads the script on NOSCRIPT
+        self._take = client.register_script(_TOKEN_BUCKET_LUA)
+    
+    async def check(self, client_id: str) -> Tuple[bool, float]:
+        """
+        Take a token for the client if one is available.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            Whether the request is allowed, and seconds to wait if it is not
+        """
+        allowed, retry_after = await self._take(
+            keys=[f"{self.key_prefix}:{client_id}"],
+            args=[self.rate, self.per, self.burst, time.time()],
+        )
+        return bool(allowed), float(retry_after)
+
+
+class RateLimitMiddleware:
     """
     Middleware for rate limiting API requests.
     
     Uses a token bucket algorithm to limit requests per client.
     """
     
-    def __init__(self, app):
+    def __init__(self, app: ASGIApp):
         """Initialize the middleware with settings from configuration."""
-        super().__init__(app)
+        self.app = app
         self.rate_limit_enabled = settings.api.rate_limit.enabled
         self.rate = settings.api.rate_limit.rate
         self.per = settings.api.rate_limit.per
         self.burst = settings.api.rate_limit.burst
         self.rate_limiter = RateLimiter(self.rate, self.per, self.burst)
-        self.exclude_paths = settings.api.rate_limit.exclude_paths.split(",")
+        self.redis_limiter: Optional[RedisRateLimiter] = None
+        if settings.api.redis_url:
+            self.redis_limiter = RedisRateLimiter(
+                redis.from_url(settings.api.redis_url), self.rate, self.per, self.burst
+            )
+        self.exclude_paths = frozenset(settings.api.rate_limit.exclude_paths.split(","))
     
-    def get_client_id(self, request: Request) -> str:
+    def get_client_id(self, scope: Scope) -> str:
         """
         Get a unique identifier for the client.
         
         Uses X-Forwarded-For header if available, otherwise client host.
         
         Args:
-            request: The incoming request
+            scope: ASGI scope of the incoming request
             
         Returns:
             Unique identifier for the client
         """
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            # Get the first IP in the list (client IP)
-            return forwarded_for.split(",")[0].strip()
-        else:
-            # Fall back to the client's host
-            return request.client.host if request.client else "unknown"
+        for key, value in scope["headers"]:
+            if key == b"x-forwarded-for":
+                # Get the first IP in the list (client IP)
+                return value.decode("latin-1").split(",", 1)[0].strip()
+        
+        # Fall back to the client's host
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+    
+    async def check(self, client_id: str) -> Tuple[bool, float]:
+        """
+        Check the client's bucket, preferring the shared Redis limiter.
+        
+        Falls back to this worker's in-memory limiter if Redis is not
+        configured or unreachable. That limiter is per process, so with
+        several API workers a client gets up to one bucket per worker.
+        
+        Args:
+            client_id: Unique identifier for the client
+            
+        Returns:
+            Whether the request is allowed, and seconds to wait if it is not
+        """
+        if self.redis_limiter is not None:
+            try:
+                return await self.redis_limiter.check(client_id)
+            except redis.RedisError as e:
+                logger.warning(f"Redis rate limiter unavailable, using in-memory limiter: {str(e)}")
+        
+        if self.rate_limiter.is_allowed(client_id):
+            return True, 0.0
+        return False, self.rate_limiter.get_retry_after(client_id)
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and apply rate limiting."""
-        # Skip rate limiting for excluded paths
-        if not self.rate_limit_enabled or request.url.path in self.exclude_paths:
-            return await call_next(request)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Skip rate limiting for health check endpoints
-        if request.url.path.startswith("/health"):
-            return await call_next(request)
+        # Skip rate limiting for excluded paths and health check endpoints
+        path = scope["path"]
+        if not self.rate_limit_enabled or path in self.exclude_paths or path.startswith("/health"):
+            await self.app(scope, receive, send)
+            return
         
         # Get client identifier
-        client_id = self.get_client_id(request)
+        client_id = self.get_client_id(scope)
         
         # Check rate limit
-        if not self.rate_limiter.is_allowed(client_id):
-            retry_after = int(self.rate_limiter.get_retry_after(client_id))
-            raise HTTPException(
+        allowed, retry_after = await self.check(client_id)
+        if not allowed:
+            response = ORJSONResponse(
+                {"detail": "Too many requests"},
                 status_code=429,
-                detail="Too many requests",
-                headers={"Retry-After": str(retry_after)}
+                headers={"Retry-After": str(int(retry_after))}
             )
+            await response(scope, receive, send)
+            return
         
         # Request is allowed, proceed
-        return await call_next(request) 
\ No newline at end of file
+        await self.app(scope, receive, send)
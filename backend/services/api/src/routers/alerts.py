@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -11,6 +12,9 @@ from src.schemas.alert import AlertResponse, AlertCreate, AlertUpdate, Paginated
 router = APIRouter()
 logger = get_logger(__name__)
 
+# Validator for whole pages of ORM rows, built once
+_ALERTS_ADAPTER = TypeAdapter(List[AlertResponse])
+
 @router.get("/", response_model=PaginatedAlertResponse, summary="Get all alerts")
 async def get_alerts(
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
@@ -24,17 +28,16 @@ async def get_alerts(
     try:
         # If user_id is provided, get alerts for that user
         if user_id is not None:
-            items = alert_repository.get_by_user_id(user_id, active_only)
-            total = len(items)
-            # Manual pagination
-            paginated_items = items[skip:skip+limit]
+            items, total = alert_repository.get_page_by_user_id(
+                user_id, active_only, skip=skip, limit=limit
+            )
         else:
             # Otherwise, get all alerts
             items = alert_repository.get_all(skip=skip, limit=limit)
             total = alert_repository.count()
         
         # Convert to response models
-        alert_responses = [AlertResponse.from_orm(alert) for alert in items]
+        alert_responses = _ALERTS_ADAPTER.validate_python(items, from_attributes=True)
         
         return PaginatedAlertResponse(
             items=alert_responses,
@@ -58,7 +61,7 @@ async def get_alert(
         alert = alert_repository.get_by_id(alert_id)
         if not alert:
             raise HTTPException(status_code=404, detail=f"Alert with ID {alert_id} not found")
-        return AlertResponse.from_orm(alert)
+        return AlertResponse.model_validate(alert)
     except HTTPException:
         raise
     except Exception as e:
@@ -76,7 +79,7 @@ async def create_alert(
         # Create alert
         alert_dict = alert_data.dict()
         alert = alert_repository.create(alert_dict)
-        return AlertResponse.from_orm(alert)
+        return AlertResponse.model_validate(alert)
     except Exception as e:
         logger.error(f"Error creating alert: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -90,15 +93,12 @@ async def update_alert(
     Update an existing alert.
     """
     try:
-        # Check if alert exists
-        existing_alert = alert_repository.get_by_id(alert_id)
-        if not existing_alert:
-            raise HTTPException(status_code=404, detail=f"Alert with ID {alert_id} not found")
-        
-        # Update alert
+        # Update alert; no row back means it doesn't exist
         alert_dict = alert_data.dict(exclude_unset=True)
-        updated_alert = alert_repository.update(alert_id, alert_dict)
-        return AlertResponse.from_orm(updated_alert)
+        updated_alert = alert_repository.update_returning(alert_id, alert_dict)
+        if not updated_alert:
+            raise HTTPException(status_code=404, detail=f"Alert with ID {alert_id} not found")
+        return AlertResponse.model_validate(updated_alert)
     except HTTPException:
         raise
     except Exception as e:
@@ -113,13 +113,9 @@ async def delete_alert(
     Delete an alert by its ID.
     """
     try:
-        # Check if alert exists
-        existing_alert = alert_repository.get_by_id(alert_id)
-        if not existing_alert:
+        # Delete alert; no row back means it doesn't exist
+        if not alert_repository.delete_returning(alert_id):
             raise HTTPException(status_code=404, detail=f"Alert with ID {alert_id} not found")
-        
-        # Delete alert
-        alert_repository.delete(alert_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -134,14 +130,11 @@ async def activate_alert(
     Activate an alert.
     """
     try:
-        # Check if alert exists
-        existing_alert = alert_repository.get_by_id(alert_id)
-        if not existing_alert:
+        # Update alert; no row back means it doesn't exist
+        updated_alert = alert_repository.update_returning(alert_id, {"is_active": True})
+        if not updated_alert:
             raise HTTPException(status_code=404, detail=f"Alert with ID {alert_id} not found")
-        
-        # Update alert
-        updated_alert = alert_repository.update(alert_id, {"is_active": True})
-        return AlertResponse.from_orm(updated_alert)
+        return AlertResponse.model_validate(updated_alert)
     except HTTPException:
         raise
     except Exception as e:
@@ -156,14 +149,11 @@ async def deactivate_alert(
     Deactivate an alert.
     """
     try:
-        # Check if alert exists
-        existing_alert = alert_repository.get_by_id(alert_id)
-        if not existing_alert:
+        # Update alert; no row back means it doesn't exist
+        updated_alert = alert_repository.update_returning(alert_id, {"is_active": False})
+        if not updated_alert:
             raise HTTPException(status_code=404, detail=f"Alert with ID {alert_id} not found")
-        
-        # Update alert
-        updated_alert = alert_repository.update(alert_id, {"is_active": False})
-        return AlertResponse.from_orm(updated_alert)
+        return AlertResponse.model_validate(updated_alert)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path
+import asyncio
+import hashlib
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Path, Request, Response
+from fastapi.responses import ORJSONResponse
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
+from shared.config.settings import get_settings
 from shared.database.session import get_db_session
 from shared.models.marketplace import Listing, ListingStatus
 from shared.repositories.listing_repository import listing_repository
@@ -18,24 +23,169 @@ from src.schemas.listing import (
 router = APIRouter()
 logger = get_logger(__name__)
 
-@router.get("/", response_model=PaginatedListingResponse, summary="Get all listings")
+T = TypeVar("T")
+
+_UTC = timezone.utc
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Normalize a datetime to the naive UTC the listings timestamp columns hold.
+    
+    Aware values (e.g. ``...+02:00`` in a query string or request body)
+    are converted to UTC first instead of being stored or compared as
+    local wall-clock time.
+    """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(_UTC).replace(tzinfo=None)
+    return value
+
+# listing_repository is synchronous. Run it in worker threads so the event
+# loop keeps serving, and never have more calls in flight than the pool has
+# connections, so excess requests queue here instead of in QueuePool
+_db_settings = get_settings("api").database
+_DB_SLOTS = asyncio.Semaphore(_db_settings.pool_size + _db_settings.max_overflow)
+
+
+async def _run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking repository call in a worker thread."""
+    async with _DB_SLOTS:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+# Categories change rarely; serve the listing_categories view from memory.
+# A write that introduces a new category refreshes the view and drops this
+# entry; categories that lose their last listing linger until that happens
+_CATEGORIES_KEY = "listing:categories"
+_categories_cache: TTLCache = TTLCache(maxsize=1, ttl=300)
+
+
+async def _known_categories() -> List[str]:
+    """Get the category list, from memory when possible."""
+    categories = _categories_cache.get(_CATEGORIES_KEY)
+    if categories is None:
+        categories = await _run_db(listing_repository.get_categories)
+        _categories_cache[_CATEGORIES_KEY] = categories
+    return categories
+
+
+async def _refresh_categories() -> None:
+    """Rebuild the listing_categories view, then drop the cached copy."""
+    try:
+        await _run_db(listing_repository.refresh_categories)
+    except Exception as e:
+        logger.error(f"Error refreshing listing categories: {str(e)}", exc_info=True)
+    _categories_cache.pop(_CATEGORIES_KEY, None)
+
+# Listing totals per filter combination; a page only needs a fresh COUNT
+# when the client asks for one
+_totals_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+
+# Cache-Control for the conditional GET endpoints. Listings rarely change
+# once posted and the category list changes over hours. These routes sit
+# behind AuthMiddleware, so only the client's own cache may store them
+_LISTING_CACHE_CONTROL = "private, max-age=30, stale-while-revalidate=60"
+_CATEGORIES_CACHE_CONTROL = "private, max-age=60"
+
+
+def _etag(*parts: Any) -> str:
+    """Build a strong ETag from the values that identify a representation."""
+    digest = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+def _conditional_response(request: Request, content: Any, etag: str, cache_control: str) -> Response:
+    """
+    Answer 304 when the client already holds ``etag``, else send ``content``.
+    
+    Args:
+        request: The incoming request, for its If-None-Match header
+        content: JSON-serializable body for a 200
+        etag: Current ETag of the resource
+        cache_control: Cache-Control header value
+        
+    Returns:
+        An empty 304 or an ORJSONResponse, both carrying the caching headers
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content, headers=headers)
+
+
+async def _listing_total(filters: Tuple[Any, ...]) -> int:
+    """
+    Get the total for a listing search, cached briefly per filter tuple.
+    
+    Unfiltered searches use the planner's row estimate instead of a
+    COUNT(*) over the whole table.
+    
+    Args:
+        filters: ``count_listings`` arguments in positional order
+        
+    Returns:
+        Number of matching listings (approximate when unfiltered)
+    """
+    total = _totals_cache.get(filters)
+    if total is None:
+        if any(value is not None for value in filters):
+            total = await _run_db(listing_repository.count_listings, *filters)
+        else:
+            total = await _run_db(listing_repository.estimate_count)
+        _totals_cache[filters] = total
+    return total
+
+@router.get(
+    "/",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": PaginatedListingResponse}},
+    summary="Get all listings",
+)
 async def get_listings(
-    search: Optional[str] = Query(None, description="Search term for title and description"),
+    search: Optional[str] = Query(None, min_length=3, description="Search term for title and description"),
     min_price: Optional[float] = Query(None, description="Minimum price filter"),
     max_price: Optional[float] = Query(None, description="Maximum price filter"),
     location: Optional[str] = Query(None, description="Location filter"),
     category: Optional[str] = Query(None, description="Category filter"),
     start_date: Optional[datetime] = Query(None, description="Start date for scraped_at"),
     end_date: Optional[datetime] = Query(None, description="End date for scraped_at"),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return")
-) -> PaginatedListingResponse:
+    skip: int = Query(0, ge=0, description="Number of records to skip (ignored when a cursor is given)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    after_scraped_at: Optional[datetime] = Query(None, description="scraped_at of next_cursor from the previous page"),
+    after_id: Optional[int] = Query(None, description="id of next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also compute total/pages on pages after the first")
+) -> ORJSONResponse:
     """
     Get all listings with pagination and optional filters.
+    
+    Rows come back from the repository as plain dicts and are encoded by
+    orjson directly; the payload matches ``PaginatedListingResponse``
+    without building a Pydantic model per row.
+    
+    Deep pages should follow ``next_cursor`` rather than raise ``skip``:
+    the cursor resumes from an index position, OFFSET re-reads every
+    skipped row.
+    
+    ``total`` and ``pages`` are only filled on the first page or with
+    ``include_total``, from a count cached for a minute; without filters
+    ``total`` is the planner's estimate.
     """
+    if (after_scraped_at is None) != (after_id is None):
+        raise HTTPException(status_code=400, detail="after_scraped_at and after_id must be given together")
+    start_date = _as_naive_utc(start_date)
+    end_date = _as_naive_utc(end_date)
+    after = (_as_naive_utc(after_scraped_at), after_id) if after_id is not None else None
+    
     try:
-        # Search listings with filters
-        listings, total_count = listing_repository.search_listings(
+        # Search listings with filters; one extra row tells us whether
+        # there is a next page
+        rows = await _run_db(
+            listing_repository.search_listings_rows,
             search_term=search,
             min_price=min_price,
             max_price=max_price,
@@ -44,61 +194,103 @@ async def get_listings(
             start_date=start_date,
             end_date=end_date,
             skip=skip,
-            limit=limit
+            limit=limit + 1,
+            after=after
         )
         
-        # Convert to response models
-        listing_responses = [ListingResponse.from_orm(listing) for listing in listings]
+        next_cursor = None
+        if len(rows) > limit:
+            del rows[limit:]
+            last = rows[-1]
+            next_cursor = {"after_scraped_at": last["scraped_at"], "after_id": last["id"]}
         
-        return PaginatedListingResponse(
-            items=listing_responses,
-            total=total_count,
-            page=skip // limit + 1 if limit > 0 else 1,
-            pages=(total_count + limit - 1) // limit if limit > 0 else 1,
-            size=len(listing_responses)
-        )
+        total_count = pages = None
+        if include_total or (skip == 0 and after is None):
+            total_count = await _listing_total(
+                (search, min_price, max_price, location, category, start_date, end_date)
+            )
+            pages = (total_count + limit - 1) // limit if limit > 0 else 1
+        
+        return ORJSONResponse({
+            "items": rows,
+            "total": total_count,
+            "page": skip // limit + 1 if limit > 0 else 1,
+            "pages": pages,
+            "size": len(rows),
+            "next_cursor": next_cursor,
+        })
     except Exception as e:
         logger.error(f"Error getting listings: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-@router.get("/recent", response_model=List[ListingResponse], summary="Get recent listings")
+@router.get(
+    "/recent",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[ListingResponse]}},
+    summary="Get recent listings",
+)
 async def get_recent_listings(
     hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
     limit: int = Query(50, ge=1, le=100, description="Number of listings to return")
-) -> List[ListingResponse]:
+) -> ORJSONResponse:
     """
     Get recent listings from the last N hours.
     """
     try:
-        listings = listing_repository.get_recent_listings(hours=hours, limit=limit)
-        return [ListingResponse.from_orm(listing) for listing in listings]
+        rows = await _run_db(listing_repository.get_recent_listings_rows, hours=hours, limit=limit)
+        return ORJSONResponse(rows)
     except Exception as e:
         logger.error(f"Error getting recent listings: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-@router.get("/categories", response_model=List[str], summary="Get all unique categories")
-async def get_categories() -> List[str]:
+@router.get(
+    "/categories",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[str]}, 304: {"description": "Not modified"}},
+    summary="Get all unique categories",
+)
+async def get_categories(request: Request) -> Response:
     """
     Get all unique listing categories.
+    
+    Supports conditional requests through ETag/If-None-Match.
     """
     try:
-        return listing_repository.get_categories()
+        categories = await _known_categories()
+        return _conditional_response(
+            request, categories, _etag(*categories), _CATEGORIES_CACHE_CONTROL
+        )
     except Exception as e:
         logger.error(f"Error getting categories: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-@router.get("/{listing_id}", response_model=ListingResponse, summary="Get listing by ID")
+@router.get(
+    "/{listing_id}",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": ListingResponse}, 304: {"description": "Not modified"}},
+    summary="Get listing by ID",
+)
 async def get_listing(
+    request: Request,
     listing_id: int = Path(..., description="ID of the listing to retrieve")
-) -> ListingResponse:
+) -> Response:
     """
     Get a specific listing by its ID.
+    
+    Supports conditional requests through ETag/If-None-Match; the ETag
+    changes whenever the listing's ``updated_at`` does.
     """
     try:
-        listing = listing_repository.get_by_id(listing_id)
+        listing = await _run_db(listing_repository.get_by_id, listing_id)
         if not listing:
             raise HTTPException(status_code=404, detail=f"Listing with ID {listing_id} not found")
-        return ListingResponse.from_orm(listing)
+        etag = _etag(listing.id, listing.updated_at.timestamp())
+        return _conditional_response(
+            request, ListingResponse.from_orm(listing).model_dump(), etag, _LISTING_CACHE_CONTROL
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -113,7 +305,7 @@ async def get_listing_by_external_id(
     Get a specific listing by its external marketplace ID.
     """
     try:
-        listing = listing_repository.get_by_listing_id(external_id)
+        listing = await _run_db(listing_repository.get_by_listing_id, external_id)
         if not listing:
             raise HTTPException(status_code=404, detail=f"Listing with external ID {external_id} not found")
         return ListingResponse.from_orm(listing)
@@ -125,20 +317,13 @@ async def get_listing_by_external_id(
 
 @router.post("/", response_model=ListingResponse, status_code=201, summary="Create a new listing")
 async def create_listing(
+    background_tasks: BackgroundTasks,
     listing_data: ListingCreate
 ) -> ListingResponse:
     """
     Create a new listing.
     """
     try:
-        # Check if listing already exists
-        existing_listing = listing_repository.get_by_listing_id(listing_data.listing_id)
-        if existing_listing:
-            raise HTTPException(
-                status_code=409, 
-                detail=f"Listing with external ID {listing_data.listing_id} already exists"
-            )
-        
         # Create listing
         listing_dict = listing_data.dict()
         
@@ -147,10 +332,17 @@ async def create_listing(
         
         # Set default values
         listing_dict["status"] = ListingStatus.NEW
-        listing_dict["scraped_at"] = listing_dict.get("scraped_at") or datetime.utcnow()
+        listing_dict["scraped_at"] = _as_naive_utc(listing_dict.get("scraped_at") or datetime.now(_UTC))
         
-        # Create with images
-        listing = listing_repository.create_with_images(listing_dict, image_urls)
+        # Create with images; None means the external ID is already taken
+        listing = await _run_db(listing_repository.create_with_images, listing_dict, image_urls)
+        if listing is None:
+            raise HTTPException(
+                status_code=409, 
+                detail=f"Listing with external ID {listing_data.listing_id} already exists"
+            )
+        if listing.category and listing.category not in await _known_categories():
+            background_tasks.add_task(_refresh_categories)
         return ListingResponse.from_orm(listing)
     except HTTPException:
         raise
@@ -160,6 +352,7 @@ async def create_listing(
 
 @router.put("/{listing_id}", response_model=ListingResponse, summary="Update a listing")
 async def update_listing(
+    background_tasks: BackgroundTasks,
     listing_id: int,
     listing_data: ListingUpdate
 ) -> ListingResponse:
@@ -167,14 +360,12 @@ async def update_listing(
     Update an existing listing.
     """
     try:
-        # Check if listing exists
-        existing_listing = listing_repository.get_by_id(listing_id)
-        if not existing_listing:
-            raise HTTPException(status_code=404, detail=f"Listing with ID {listing_id} not found")
-        
-        # Update listing
         listing_dict = listing_data.dict(exclude_unset=True)
-        updated_listing = listing_repository.update(listing_id, listing_dict)
+        updated_listing = await _run_db(listing_repository.update_returning, listing_id, listing_dict)
+        if not updated_listing:
+            raise HTTPException(status_code=404, detail=f"Listing with ID {listing_id} not found")
+        if updated_listing.category and updated_listing.category not in await _known_categories():
+            background_tasks.add_task(_refresh_categories)
         return ListingResponse.from_orm(updated_listing)
     except HTTPException:
         raise
@@ -190,13 +381,8 @@ async def delete_listing(
     Delete a listing by its ID.
     """
     try:
-        # Check if listing exists
-        existing_listing = listing_repository.get_by_id(listing_id)
-        if not existing_listing:
+        if not await _run_db(listing_repository.delete_returning, listing_id):
             raise HTTPException(status_code=404, detail=f"Listing with ID {listing_id} not found")
-        
-        # Delete listing
-        listing_repository.delete(listing_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -211,18 +397,14 @@ async def archive_listing(
     Archive a listing (mark as no longer active).
     """
     try:
-        # Check if listing exists
-        existing_listing = listing_repository.get_by_id(listing_id)
-        if not existing_listing:
-            raise HTTPException(status_code=404, detail=f"Listing with ID {listing_id} not found")
-        
-        # Update listing status
-        success = listing_repository.update_status(listing_id, ListingStatus.ARCHIVED)
-        if not success:
+        # Same values update_status writes, in one UPDATE ... RETURNING
+        updated_listing = await _run_db(
+            listing_repository.update_returning,
+            listing_id,
+            {"status": ListingStatus.ARCHIVED, "updated_at": _as_naive_utc(datetime.now(_UTC)), "processed_at": None}
+        )
+        if not updated_listing:
             raise HTTPException(status_code=404, detail=f"Listing with ID {listing_id} not found")
-            
-        # Return updated listing
-        updated_listing = listing_repository.get_by_id(listing_id)
         return ListingResponse.from_orm(updated_listing)
     except HTTPException:
         raise
@@ -1,6 +1,10 @@
 """User management endpoints"""
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import bindparam, delete, lambda_stmt, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, EmailStr, Field, validator
@@ -8,13 +12,47 @@ from datetime import datetime
 
 from backend.shared.auth.dependencies import get_current_user, get_current_admin_user
 from backend.shared.models.user import User
-from backend.shared.auth.auth_service import AuthService
+from backend.shared.auth.auth_service import auth_service
 from backend.services.api.src.dependencies import get_db
 from backend.shared.config.logging_config import get_logger
 
 router = APIRouter(prefix="/users", tags=["users"])
 logger = get_logger(__name__)
 
+
+# Unique indexes on users and the error each one means
+_UNIQUE_VIOLATIONS = {
+    "ix_users_email": "Email already registered",
+    "ix_users_username": "Username already taken",
+}
+
+
+async def _commit_unique(db: AsyncSession) -> None:
+    """
+    Commit, turning a users.username/users.email unique violation into a 400.
+    
+    The unique indexes are the uniqueness check; probing with a SELECT
+    first costs a round trip and still races with concurrent writers. The
+    violated index is read from the driver error rather than its message,
+    which also contains the conflicting value.
+    
+    Args:
+        db: Session with the pending user write
+        
+    Raises:
+        HTTPException: 400 if the username or email is already in use
+    """
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # asyncpg's UniqueViolationError is chained behind the DBAPI adapter
+        constraint = getattr(e.orig.__cause__, "constraint_name", None)
+        detail = _UNIQUE_VIOLATIONS.get(constraint)
+        if detail is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+        raise
+
 # Pydantic models for request/response validation
 class UserResponse(BaseModel):
     id: str
@@ -31,6 +69,24 @@ class UserResponse(BaseModel):
         orm_mode = True
 
 
+# Columns served by get_users; mirrors UserResponse
+_USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.first_name,
+    User.last_name,
+    User.is_active,
+    User.is_admin,
+    User.created_at,
+    User.last_login,
+)
+
+
+# Cached by lambda_stmt so the per-ID lookups skip rebuilding the select
+_GET_USER_BY_ID = lambda_stmt(lambda: select(User).where(User.id == bindparam("user_id")))
+
+
 class UserProfileUpdate(BaseModel):
     first_name: Optional[str] = Field(None, min_length=1, max_length=50)
     last_name: Optional[str] = Field(None, min_length=1, max_length=50)
@@ -51,13 +107,24 @@ class PasswordUpdate(BaseModel):
     def password_strength(cls, v):
         if len(v) < 8:
             raise ValueError('Password must be at least 8 characters')
-        if not any(c.isupper() for c in v):
+        # One pass over the string, stopping once every class has been seen
+        has_upper = has_lower = has_digit = False
+        for c in v:
+            if c.isupper():
+                has_upper = True
+            elif c.islower():
+                has_lower = True
+            elif c.isdigit():
+                has_digit = True
+            else:
+                continue
+            if has_upper and has_lower and has_digit:
+                return v
+        if not has_upper:
             raise ValueError('Password must contain at least one uppercase letter')
-        if not any(c.islower() for c in v):
+        if not has_lower:
             raise ValueError('Password must contain at least one lowercase letter')
-        if not any(c.isdigit() for c in v):
-            raise ValueError('Password must contain at least one number')
-        return v
+        raise ValueError('Password must contain at least one number')
 
 
 class UserCreate(BaseModel):
@@ -93,16 +160,7 @@ async def update_current_user_profile(
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Update the current user's profile"""
-    if update_data.email is not None and update_data.email != current_user.email:
-        # Check if the email is already in use
-        existing_user = await db.execute(
-            select(User).where(User.email == update_data.email)
-        )
-        if existing_user.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+    if update_data.email is not None:
         current_user.email = update_data.email
         
     if update_data.first_name is not None:
@@ -113,7 +171,7 @@ async def update_current_user_profile(
     
     # Update user in database
     db.add(current_user)
-    await db.commit()
+    await _commit_unique(db)
     await db.refresh(current_user)
     
     return current_user
@@ -126,40 +184,55 @@ async def update_current_user_password(
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """Update the current user's password"""
-    auth_service = AuthService(db)
-    
-    # Verify current password
-    if not auth_service.verify_password(password_data.current_password, current_user.password_hash):
+    # bcrypt is deliberately slow; keep it off the event loop
+    if not await asyncio.to_thread(
+        auth_service.verify_password, password_data.current_password, current_user.password_hash
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect password"
         )
     
     # Update password
-    current_user.password_hash = auth_service.get_password_hash(password_data.new_password)
+    current_user.password_hash = await asyncio.to_thread(
+        auth_service.get_password_hash, password_data.new_password
+    )
     db.add(current_user)
     await db.commit()
     
     return {"message": "Password updated successfully"}
 
 
-@router.get("", response_model=List[UserResponse])
+@router.get(
+    "",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[UserResponse]}},
+)
 async def get_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
-) -> Any:
+) -> ORJSONResponse:
     """
     Get all users (admin only)
+    
+    Selects only the ``UserResponse`` columns and encodes the rows
+    directly, without hydrating User objects or validating each one.
     """
-    users = await db.execute(
-        select(User)
+    result = await db.execute(
+        select(*_USER_RESPONSE_COLUMNS)
         .offset(skip)
         .limit(limit)
         .order_by(User.created_at.desc())
     )
-    return users.scalars().all()
+    users = []
+    for row in result.mappings():
+        user = dict(row)
+        user["id"] = str(user["id"])
+        users.append(user)
+    return ORJSONResponse(users)
 
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -171,27 +244,8 @@ async def create_user(
     """
     Create a new user (admin only)
     """
-    # Check if username or email already exists
-    existing_user = await db.execute(
-        select(User).where(
-            (User.username == user_data.username) | (User.email == user_data.email)
-        )
-    )
-    if existing_user.scalar_one_or_none():
-        if existing_user.username == user_data.username:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
     # Create new user
-    auth_service = AuthService(db)
-    password_hash = auth_service.get_password_hash(user_data.password)
+    password_hash = await asyncio.to_thread(auth_service.get_password_hash, user_data.password)
     
     new_user = User(
         username=user_data.username,
@@ -204,8 +258,9 @@ async def create_user(
         created_at=datetime.utcnow()
     )
     
+    # Taken usernames and emails surface as unique violations on commit
     db.add(new_user)
-    await db.commit()
+    await _commit_unique(db)
     await db.refresh(new_user)
     
     logger.info(f"User created: {new_user.username}")
@@ -214,16 +269,14 @@ async def create_user(
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
-    user_id: str = Path(..., description="The UUID of the user"),
+    user_id: int = Path(..., description="The ID of the user"),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Get a specific user by ID (admin only)
     """
-    user = await db.execute(
-        select(User).where(User.id == user_id)
-    )
+    user = await db.execute(_GET_USER_BY_ID, {"user_id": user_id})
     user = user.scalar_one_or_none()
     
     if not user:
@@ -238,7 +291,7 @@ async def get_user(
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(
     update_data: UserUpdate,
-    user_id: str = Path(..., description="The UUID of the user"),
+    user_id: int = Path(..., description="The ID of the user"),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
@@ -246,9 +299,7 @@ async def update_user(
     Update a user (admin only)
     """
     # Get the user to update
-    user = await db.execute(
-        select(User).where(User.id == user_id)
-    )
+    user = await db.execute(_GET_USER_BY_ID, {"user_id": user_id})
     user = user.scalar_one_or_none()
     
     if not user:
@@ -257,16 +308,8 @@ async def update_user(
             detail="User not found"
         )
     
-    # Check if email is being updated and is unique
-    if update_data.email is not None and update_data.email != user.email:
-        existing_user = await db.execute(
-            select(User).where(User.email == update_data.email)
-        )
-        if existing_user.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+    # A taken email surfaces as a unique violation on commit
+    if update_data.email is not None:
         user.email = update_data.email
     
     # Update other fields if provided
@@ -283,7 +326,7 @@ async def update_user(
         user.last_name = update_data.last_name
     
     db.add(user)
-    await db.commit()
+    await _commit_unique(db)
     await db.refresh(user)
     
     logger.info(f"User updated: {user.username}")
@@ -292,7 +335,7 @@ async def update_user(
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
-    user_id: str = Path(..., description="The UUID of the user"),
+    user_id: int = Path(..., description="The ID of the user"),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ) -> None:
@@ -300,27 +343,26 @@ async def delete_user(
     Delete a user (admin only)
     """
     # Make sure we're not deleting the current admin user
-    if user_id == str(current_user.id):
+    if user_id == current_user.id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete your own user account"
         )
     
-    # Get the user to delete
-    user = await db.execute(
-        select(User).where(User.id == user_id)
+    # Delete in one statement; the users FKs cascade in the database, so
+    # there is nothing for the ORM to load first
+    result = await db.execute(
+        delete(User).where(User.id == user_id).returning(User.username)
     )
-    user = user.scalar_one_or_none()
+    username = result.scalar_one_or_none()
     
-    if not user:
+    if username is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    # Delete the user
-    await db.delete(user)
     await db.commit()
     
-    logger.info(f"User deleted: {user.username}")
+    logger.info(f"User deleted: {username}")
     return None 
\ No newline at end of file
@@ -1,29 +1,58 @@
 """API endpoints for price and availability alerts."""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Path, Body
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Body
+from sqlalchemy import bindparam, delete, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.models.schema import PriceAlertSchema, AlertResponseSchema
 from shared.models.marketplace import PriceAlert, User
 from src.database.session import get_db
+from shared.utils.kafka import get_kafka_client
+from shared.utils.logging_config import get_logger
 from src.middleware.auth import get_current_user
 
 router = APIRouter()
+logger = get_logger(__name__)
+
+# Cached by lambda_stmt so each request skips rebuilding the select
+_USER_ALERTS = lambda_stmt(
+    lambda: select(PriceAlert).where(PriceAlert.user_id == bindparam("user_id"))
+)
+_USER_ALERT = lambda_stmt(
+    lambda: select(PriceAlert).where(
+        PriceAlert.id == bindparam("alert_id"),
+        PriceAlert.user_id == bindparam("user_id")
+    )
+)
+
+
+def _publish_alert_event(topic: str, key: str, value: Dict[str, Any]) -> None:
+    """
+    Publish an alert event after the response has been sent.
+    
+    Runs as a background task, so a Kafka failure is logged rather than
+    turning an already committed write into a 500.
+    """
+    try:
+        get_kafka_client("api").publish_event(topic=topic, key=key, value=value)
+    except Exception as e:
+        logger.error(f"Failed to publish {topic} for alert {key}: {str(e)}")
 
 @router.get("/", response_model=List[AlertResponseSchema])
 async def get_user_alerts(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all alerts for the current user."""
-    alerts = db.query(PriceAlert).filter(PriceAlert.user_id == current_user.id).all()
-    return alerts
+    result = await db.execute(_USER_ALERTS, {"user_id": current_user.id})
+    return result.scalars().all()
 
 @router.post("/", response_model=AlertResponseSchema, status_code=201)
 async def create_alert(
+    background_tasks: BackgroundTasks,
     alert_data: PriceAlertSchema = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new price alert for the current user."""
@@ -41,13 +70,12 @@ async def create_alert(
     )
     
     db.add(new_alert)
-    db.commit()
-    db.refresh(new_alert)
+    await db.commit()
+    await db.refresh(new_alert)
     
     # Publish event to Kafka
-    from shared.utils.kafka import get_kafka_client
-    kafka_client = get_kafka_client("api")
-    kafka_client.publish_event(
+    background_tasks.add_task(
+        _publish_alert_event,
         topic="marketplace.alert.created",
         key=str(new_alert.id),
         value={
@@ -64,16 +92,15 @@ async def create_alert(
 
 @router.put("/{alert_id}", response_model=AlertResponseSchema)
 async def update_alert(
+    background_tasks: BackgroundTasks,
     alert_id: int = Path(..., description="The ID of the alert to update"),
     alert_data: PriceAlertSchema = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an existing price alert."""
-    alert = db.query(PriceAlert).filter(
-        PriceAlert.id == alert_id,
-        PriceAlert.user_id == current_user.id
-    ).first()
+    result = await db.execute(_USER_ALERT, {"alert_id": alert_id, "user_id": current_user.id})
+    alert = result.scalars().first()
     
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -82,13 +109,12 @@ async def update_alert(
     for field, value in alert_data.dict(exclude_unset=True).items():
         setattr(alert, field, value)
     
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    await db.refresh(alert)
     
     # Publish update event
-    from shared.utils.kafka import get_kafka_client
-    kafka_client = get_kafka_client("api")
-    kafka_client.publish_event(
+    background_tasks.add_task(
+        _publish_alert_event,
         topic="marketplace.alert.updated",
         key=str(alert.id),
         value={
@@ -105,27 +131,27 @@ async def update_alert(
 
 @router.delete("/{alert_id}", status_code=204)
 async def delete_alert(
+    background_tasks: BackgroundTasks,
     alert_id: int = Path(..., description="The ID of the alert to delete"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a price alert."""
-    alert = db.query(PriceAlert).filter(
-        PriceAlert.id == alert_id,
-        PriceAlert.user_id == current_user.id
-    ).first()
-    
-    if not alert:
+    # One DELETE; no matching row means not found (or not this user's)
+    result = await db.execute(
+        delete(PriceAlert).where(
+            PriceAlert.id == alert_id,
+            PriceAlert.user_id == current_user.id
+        )
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Alert not found")
     
-    # Delete from database
-    db.delete(alert)
-    db.commit()
+    await db.commit()
     
     # Publish delete event
-    from shared.utils.kafka import get_kafka_client
-    kafka_client = get_kafka_client("api")
-    kafka_client.publish_event(
+    background_tasks.add_task(
+        _publish_alert_event,
         topic="marketplace.alert.deleted",
         key=str(alert_id),
         value={
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import TTLCache
+
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Header
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from typing import Any, Dict, Optional
+from typing import Any, Optional
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime, timedelta
 
-from backend.shared.auth.auth_service import AuthService
+from backend.shared.auth.auth_service import AuthService, auth_service
+from backend.shared.auth.dependencies import token_digest
 from backend.shared.models.user import User
 from backend.shared.config.settings import get_settings
 from backend.shared.config.logging_config import get_logger
@@ -13,9 +23,17 @@ from backend.services.api.src.dependencies import get_db
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 logger = get_logger("auth_routes")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 settings = get_settings()
 
+# bcrypt hashing and verification are deliberately slow and release the GIL;
+# run them here so a registration or login never stalls the event loop
+_BCRYPT_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+
+# Recently verified tokens, keyed by token digest, holding the token's exp
+# claim and user id. Only the signature check is cached; the user row is read
+# on every call, so deactivation and role changes apply at once in every worker
+_verified_tokens: TTLCache = TTLCache(maxsize=4096, ttl=60)
+
 # Pydantic models for request validation
 class UserCreate(BaseModel):
     username: str = Field(..., min_length=3, max_length=50)
@@ -43,45 +61,82 @@ class TokenResponse(BaseModel):
 class MessageResponse(BaseModel):
     message: str
 
+class VerifyTokenResponse(BaseModel):
+    user_id: int
+    username: str
+    role: str
+    email: str
+    is_active: bool
+
+
+def _bearer_token(authorization: Optional[str] = Header(None)) -> str:
+    """Extract the token from an ``Authorization: Bearer <token>`` header."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token
 
-@router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "/register",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={201: {"model": TokenResponse}},
+    status_code=status.HTTP_201_CREATED,
+)
 async def register_user(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
     """Register a new user and return access token"""
-    auth_service = AuthService(db)
+    password_hash = await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_EXECUTOR, auth_service.get_password_hash, user_data.password
+    )
     
-    # Check if username or email already exists
-    existing_user = db.query(User).filter(
-        (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
+    # Insert and detect a duplicate username or email in one statement; the
+    # unique indexes on both columns are the conflict arbiters
+    try:
+        new_user = db.execute(
+            pg_insert(User)
+            .values(
+                username=user_data.username,
+                email=user_data.email,
+                password_hash=password_hash,
+                role="user",
+                is_active=True,
+                created_at=datetime.utcnow()
+            )
+            .on_conflict_do_nothing()
+            .returning(User.id, User.username, User.role)
+        ).first()
+    except Exception as e:
+        logger.error(f"Error registering user: {e}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error registering user"
+        )
     
-    if existing_user:
-        if existing_user.username == user_data.username:
+    if new_user is None:
+        db.rollback()
+        taken = db.execute(
+            select(User.username)
+            .where((User.username == user_data.username) | (User.email == user_data.email))
+            .limit(1)
+        ).scalar()
+        if taken == user_data.username:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
-    # Create new user
     try:
-        password_hash = auth_service.get_password_hash(user_data.password)
-        
-        new_user = User(
-            username=user_data.username,
-            email=user_data.email,
-            password_hash=password_hash,
-            role="user",
-            is_active=True,
-            created_at=datetime.utcnow()
-        )
-        
-        db.add(new_user)
         db.commit()
-        db.refresh(new_user)
         
         # Generate access token
         access_token = auth_service.create_access_token(
@@ -90,13 +145,13 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)) ->
             role=new_user.role
         )
         
-        return {
+        return ORJSONResponse({
             "access_token": access_token,
             "token_type": "bearer",
             "user_id": new_user.id,
             "username": new_user.username,
             "role": new_user.role
-        }
+        }, status_code=status.HTTP_201_CREATED)
     
     except Exception as e:
         logger.error(f"Error registering user: {e}")
@@ -107,11 +162,21 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)) ->
         )
 
 
-@router.post("/login", response_model=TokenResponse)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> Any:
+@router.post(
+    "/login",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": TokenResponse}},
+)
+async def login(
+    username: str = Form(...),
+    password: str = Form(...),
+    db: Session = Depends(get_db)
+) -> Any:
     """Authenticate a user and return an access token"""
-    auth_service = AuthService(db)
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    user = await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_EXECUTOR, AuthService(db).authenticate_user, username, password
+    )
     
     if not user:
         raise HTTPException(
@@ -137,43 +202,50 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         role=user.role
     )
     
-    return {
+    return ORJSONResponse({
         "access_token": access_token,
         "token_type": "bearer",
         "user_id": user.id,
         "username": user.username,
         "role": user.role
-    }
+    })
 
 
-@router.post("/reset-password-request", response_model=MessageResponse)
+@router.post(
+    "/reset-password-request",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": MessageResponse}},
+)
 async def request_password_reset(request_data: PasswordResetRequest, db: Session = Depends(get_db)) -> Any:
     """Request a password reset token"""
-    auth_service = AuthService(db)
     user = db.query(User).filter(User.email == request_data.email).first()
     
     # Always return success even if user doesn't exist (security best practice)
     if not user:
         logger.warning(f"Password reset requested for non-existent email: {request_data.email}")
-        return {"message": "If your email is registered, you will receive a password reset link"}
+        return ORJSONResponse({"message": "If your email is registered, you will receive a password reset link"})
     
     # Generate reset token
-    reset_token = auth_service.generate_reset_token(user.id)
+    reset_token = AuthService(db).generate_reset_token(user.id)
     
     # In a real application, you would send this token via email
     # For this demo, we'll just log it
     logger.info(f"Password reset token for {user.email}: {reset_token}")
     
-    return {"message": "If your email is registered, you will receive a password reset link"}
+    return ORJSONResponse({"message": "If your email is registered, you will receive a password reset link"})
 
 
-@router.post("/reset-password", response_model=MessageResponse)
+@router.post(
+    "/reset-password",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": MessageResponse}},
+)
 async def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db)) -> Any:
     """Reset a user's password using a valid reset token"""
-    auth_service = AuthService(db)
-    
     # Validate token and get user
-    user_id = auth_service.validate_reset_token(reset_data.token)
+    user_id = AuthService(db).validate_reset_token(reset_data.token)
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -189,29 +261,44 @@ async def reset_password(reset_data: PasswordReset, db: Session = Depends(get_db
         )
     
     # Update password
-    user.password_hash = auth_service.get_password_hash(reset_data.new_password)
+    user.password_hash = await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_EXECUTOR, auth_service.get_password_hash, reset_data.new_password
+    )
     user.reset_token = None
     user.reset_token_expires = None
     db.commit()
     
-    return {"message": "Password has been reset successfully"}
+    return ORJSONResponse({"message": "Password has been reset successfully"})
 
 
-@router.get("/verify-token", response_model=Dict[str, Any])
-async def verify_token(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Any:
+@router.get(
+    "/verify-token",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": VerifyTokenResponse}},
+)
+async def verify_token(token: str = Depends(_bearer_token), db: Session = Depends(get_db)) -> Any:
     """Verify a token and return user information"""
-    auth_service = AuthService(db)
-    payload = auth_service.validate_token(token)
-    
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    cache_key = token_digest(token)
+    cached = _verified_tokens.get(cache_key)
+    if cached is not None and cached[0] > time.time():
+        user_id = cached[1]
+    else:
+        payload = auth_service.validate_token(token)
+        
+        if not payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        user_id = payload.get("user_id")
+        if payload.get("exp") is not None:
+            _verified_tokens[cache_key] = (payload["exp"], user_id)
     
     # Get user from database to ensure they still exist and are active
-    user = db.query(User).filter(User.id == payload.get("user_id")).first()
+    user = db.query(User).filter(User.id == user_id).first()
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -220,10 +307,12 @@ async def verify_token(token: str = Depends(oauth2_scheme), db: Session = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return {
+    body = {
         "user_id": user.id,
         "username": user.username,
         "role": user.role,
         "email": user.email,
         "is_active": user.is_active
-    } 
\ No newline at end of file
+    }
+    
+    return ORJSONResponse(body) 
\ No newline at end of file
@@ -1,18 +1,70 @@
 """Health check endpoints for the API service."""
 
-from fastapi import APIRouter, Depends, Response, status
-from sqlalchemy.orm import Session
+import asyncio
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Response, status
 from sqlalchemy import text
 
-from src.database.session import get_db
+from src.database.session import get_engine
 from shared.utils.kafka import get_kafka_client
 from shared.config.settings import get_settings
 
 router = APIRouter()
 
+# The orchestrator probes /ready every few seconds per pod. Each dependency
+# is actually contacted at most once per TTL; probes in between reuse the
+# last outcome as (expires_at, error or None)
+_PROBE_TTL_SECONDS = 5.0
+_probe_results: Dict[str, Tuple[float, Optional[str]]] = {}
+
+
+async def _check_database() -> None:
+    """Round-trip ``SELECT 1`` on a pooled connection."""
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _check_kafka() -> None:
+    """Fetch cluster metadata off the event loop; it blocks for up to 5s."""
+    if not await asyncio.to_thread(get_kafka_client("api").check_connection):
+        raise ConnectionError("Kafka metadata request failed")
+
+
+async def _probe(name: str, check) -> Optional[str]:
+    """
+    Run a dependency check, reusing its outcome for ``_PROBE_TTL_SECONDS``.
+    
+    Args:
+        name: Dependency name, used as the cache key
+        check: Coroutine function that raises if the dependency is down
+        
+    Returns:
+        The error message, or None if the dependency is up
+    """
+    now = time.monotonic()
+    cached = _probe_results.get(name)
+    if cached is not None and now < cached[0]:
+        return cached[1]
+    
+    try:
+        await check()
+        error = None
+    except Exception as e:
+        error = str(e)
+    _probe_results[name] = (now + _PROBE_TTL_SECONDS, error)
+    return error
+
+
+def _pool_status() -> Dict[str, Any]:
+    """Read connection pool occupancy without touching the database."""
+    pool = get_engine().pool
+    return {"size": pool.size(), "checked_out": pool.checkedout(), "overflow": pool.overflow()}
+
+
 @router.get("/ready")
 async def readiness_check(
-    db: Session = Depends(get_db),
     response: Response = None
 ):
     """
@@ -28,26 +80,26 @@ async def readiness_check(
         "database": "ok",
         "kafka": "ok",
         "version": settings.version,
-        "service": "api"
+        "service": "api",
+        "pool": _pool_status()
     }
     
-    # Check database connection
-    try:
-        # Simple query to check DB connection
-        db.execute(text("SELECT 1"))
-    except Exception as e:
+    # Check both connections concurrently; _probe never raises, so one
+    # failing dependency cannot cancel the other's check
+    database_error, kafka_error = await asyncio.gather(
+        _probe("database", _check_database),
+        _probe("kafka", _check_kafka)
+    )
+    
+    if database_error is not None:
         health_status["database"] = "error"
-        health_status["database_error"] = str(e)
+        health_status["database_error"] = database_error
         health_status["status"] = "error"
         response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
     
-    # Check Kafka connection
-    try:
-        kafka_client = get_kafka_client("api")
-        kafka_client.check_connection()
-    except Exception as e:
+    if kafka_error is not None:
         health_status["kafka"] = "error"
-        health_status["kafka_error"] = str(e)
+        health_status["kafka_error"] = kafka_error
         health_status["status"] = "error"
         response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
     
@@ -60,4 +112,4 @@ async def liveness_check():
     
     A simple check that returns 200 if the service is running.
     """
-    return {"status": "alive", "service": "api"} 
\ No newline at end of file
+    return {"status": "alive", "service": "api"}
@@ -1,22 +1,58 @@
 """API endpoints for marketplace listings."""
 
-from typing import List, Optional
+import base64
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session, selectinload
 
-from shared.models.schema import ListingSchema, PaginatedResponse
-from shared.models.marketplace import Listing
-from src.validation.listings import ListingFilterParams
-from src.database.session import get_db
+from shared.models.schema import PaginatedResponse
+from shared.models.marketplace import Listing, listing_categories
+from src.validation.listings import ListingFilters, get_listing_filters
+from src.database.session import get_sync_db
+from src.schemas.listing import ListingResponse
 
 router = APIRouter()
 
-@router.get("/", response_model=PaginatedResponse[ListingSchema])
+# Validate rows once here and return them through ORJSONResponse with no
+# response_model, so FastAPI does not encode and validate them a second time
+_LISTINGS_ADAPTER = TypeAdapter(List[ListingResponse])
+
+
+def _encode_cursor(listing: Listing) -> str:
+    """Encode the (scraped_at, id) position of a listing as an opaque cursor."""
+    raw = f"{listing.scraped_at.isoformat()}|{listing.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by ``_encode_cursor``.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        scraped_at, listing_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(scraped_at), int(listing_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get(
+    "/",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": PaginatedResponse[ListingResponse]}},
+)
 async def get_listings(
-    filters: ListingFilterParams = Depends(),
+    filters: ListingFilters = Depends(get_listing_filters),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="next_cursor from the previous page; replaces page"),
+    db: Session = Depends(get_sync_db)
 ):
     """
     Get marketplace listings with optional filters.
@@ -27,52 +63,100 @@ async def get_listings(
     - Location
     - Keyword search
     - Date posted
+    
+    Deep pages should follow ``next_cursor`` rather than raise ``page``:
+    the cursor resumes from an index position and skips the total count,
+    while OFFSET reads and discards every earlier row.
     """
+    position = _decode_cursor(after) if after is not None else None
+    
     # Calculate offset for pagination
-    offset = (page - 1) * limit
+    offset = (page - 1) * limit if position is None else 0
     
-    # Build query with filters
-    query = db.query(Listing)
+    # Build query with filters; the window count returns the total of the
+    # filtered set on every row, so one statement serves both
+    if position is None:
+        query = select(Listing, func.count().over().label("total"))
+    else:
+        query = select(Listing).where(tuple_(Listing.scraped_at, Listing.id) < position)
     
     # Apply filters if provided
     if filters.category:
-        query = query.filter(Listing.category == filters.category)
+        query = query.where(Listing.category == filters.category)
     
     if filters.min_price is not None:
-        query = query.filter(Listing.price >= filters.min_price)
+        query = query.where(Listing.price >= filters.min_price)
     
     if filters.max_price is not None:
-        query = query.filter(Listing.price <= filters.max_price)
+        query = query.where(Listing.price <= filters.max_price)
         
     if filters.location:
-        query = query.filter(Listing.location.ilike(f"%{filters.location}%"))
+        query = query.where(Listing.location.ilike(f"%{filters.location}%"))
     
     if filters.search:
-        query = query.filter(Listing.title.ilike(f"%{filters.search}%") | 
-                             Listing.description.ilike(f"%{filters.search}%"))
+        # Served by the trigram indexes from migration 006
+        query = query.where(
+            Listing.title.ilike(f"%{filters.search}%") | Listing.description.ilike(f"%{filters.search}%")
+        )
     
     if filters.days_old is not None:
-        from datetime import datetime, timedelta
         date_threshold = datetime.utcnow() - timedelta(days=filters.days_old)
-        query = query.filter(Listing.listed_date >= date_threshold)
+        query = query.where(Listing.scraped_at >= date_threshold)
     
-    # Execute count query
-    total = query.count()
+    # ListingResponse includes the images; load them for the page in one query
+    rows = db.execute(
+        query.order_by(Listing.scraped_at.desc(), Listing.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .options(selectinload(Listing.images))
+    ).all()
+    items = [row.Listing for row in rows]
+    next_cursor = _encode_cursor(items[-1]) if len(items) == limit else None
     
-    # Apply pagination
-    items = query.order_by(Listing.listed_date.desc()).offset(offset).limit(limit).all()
+    if position is not None:
+        total = None
+    elif rows:
+        total = rows[0].total
+    elif offset:
+        # Past the last page there is no row to carry the window count
+        total = db.scalar(query.with_only_columns(func.count(), maintain_column_froms=True))
+    else:
+        total = 0
     
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=page,
-        limit=limit
-    )
+    return ORJSONResponse({
+        "items": _LISTINGS_ADAPTER.dump_python(
+            _LISTINGS_ADAPTER.validate_python(items, from_attributes=True)
+        ),
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
 
-@router.get("/{listing_id}", response_model=ListingSchema)
+# Declared before /{listing_id}, which would otherwise match "categories"
+@router.get(
+    "/categories",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[str]}},
+)
+async def get_categories(db: Session = Depends(get_sync_db)):
+    """Get all available marketplace listing categories."""
+    # Served from the listing_categories materialized view (migration 007)
+    categories = db.scalars(
+        select(listing_categories.c.category).order_by(listing_categories.c.category)
+    ).all()
+    return ORJSONResponse(categories)
+
+@router.get(
+    "/{listing_id}",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": ListingResponse}},
+)
 async def get_listing(
     listing_id: str = Path(..., description="The ID of the listing to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_sync_db)
 ):
     """Get a specific marketplace listing by ID."""
     listing = db.query(Listing).filter(Listing.id == listing_id).first()
@@ -80,10 +164,4 @@ async def get_listing(
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
     
-    return listing
-
-@router.get("/categories", response_model=List[str])
-async def get_categories(db: Session = Depends(get_db)):
-    """Get all available marketplace listing categories."""
-    categories = db.query(Listing.category).distinct().all()
-    return [category[0] for category in categories if category[0]] 
\ No newline at end of file
+    return ORJSONResponse(ListingResponse.model_validate(listing, from_attributes=True).model_dump())
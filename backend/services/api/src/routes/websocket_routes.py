@@ -1,7 +1,7 @@
 """WebSocket routes for real-time marketplace listing updates."""
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 
 from backend.shared.config.logging_config import get_logger
@@ -15,16 +15,18 @@ router = APIRouter(tags=["websocket"])
 @router.websocket("/ws/listings/{category}")
 async def listings_websocket(
     websocket: WebSocket, 
-    category: str
+    category: str,
+    compress: bool = False
 ):
     """WebSocket endpoint for real-time listing updates.
     
     Args:
         websocket: The WebSocket connection
         category: The category to subscribe to (e.g., 'furniture', 'electronics', 'all')
+        compress: Receive updates as zlib-compressed binary frames
     """
     try:
-        await websocket_manager.handle_connection(websocket, category)
+        await websocket_manager.handle_connection(websocket, category, compress=compress)
     except WebSocketDisconnect:
         logger.info(f"WebSocket client disconnected from category {category}")
     except Exception as e:
@@ -34,7 +36,8 @@ async def listings_websocket(
 async def secure_listings_websocket(
     websocket: WebSocket, 
     category: str,
-    user = Depends(get_current_user_ws)
+    user = Depends(get_current_user_ws),
+    compress: bool = False
 ):
     """Authenticated WebSocket endpoint for real-time listing updates.
     
@@ -42,13 +45,14 @@ async def secure_listings_websocket(
         websocket: The WebSocket connection
         category: The category to subscribe to (e.g., 'furniture', 'electronics', 'all')
         user: The authenticated user
+        compress: Receive updates as zlib-compressed binary frames
     """
     try:
         # Add user info to the connection context
         websocket.state.user = user
         logger.info(f"Authenticated WebSocket connection from user {user.username}")
         
-        await websocket_manager.handle_connection(websocket, category)
+        await websocket_manager.handle_connection(websocket, category, compress=compress)
     except WebSocketDisconnect:
         logger.info(f"Authenticated WebSocket client disconnected from category {category}")
     except Exception as e:
@@ -85,7 +89,7 @@ async def websocket_status():
     """
     connection_count = websocket_manager._count_connections()
     
-    return JSONResponse({
+    return ORJSONResponse({
         "connections": connection_count,
         "categories": list(websocket_manager.active_connections.keys()),
         "status": "active" if websocket_manager.running else "inactive"
@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
 
 class AlertBase(BaseModel):
     """Base model for alerts with common fields."""
@@ -18,29 +18,18 @@ class AlertBase(BaseModel):
     notify_immediately: bool = Field(True, description="Whether to notify immediately")
 
 class AlertCreate(AlertBase):
-    """Model for creating a new alert."""
-    is_active: bool = Field(True, description="Whether the alert is active")
-    
-    @validator('name')
-    def validate_name(cls, v):
-        """Validate alert name."""
-        if len(v) < 3:
-            raise ValueError("Alert name must be at least 3 characters")
-        return v
-    
-    @validator('search_query')
-    def validate_search_query(cls, v):
-        """Validate search query."""
-        if len(v) < 2:
-            raise ValueError("Search query must be at least 2 characters")
-        return v
+    """
+    Model for creating a new alert.
     
-    @validator('notification_email')
-    def validate_email(cls, v):
-        """Validate email format."""
-        if v is not None and "@" not in v:
-            raise ValueError("Invalid email format")
-        return v
+    The checks are field constraints rather than validator methods, so
+    pydantic-core enforces them without calling back into Python.
+    """
+    name: str = Field(..., min_length=3, description="Name of the alert")
+    search_query: str = Field(..., min_length=2, description="Search query for matching listings")
+    notification_email: Optional[str] = Field(
+        None, pattern=r"^[^@]*@", description="Email for notifications"
+    )
+    is_active: bool = Field(True, description="Whether the alert is active")
 
 class AlertUpdate(BaseModel):
     """Model for updating an existing alert."""
@@ -68,8 +57,7 @@ class AlertResponse(AlertBase):
     updated_at: datetime
     last_matched_at: Optional[datetime] = None
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PaginatedAlertResponse(BaseModel):
     """Paginated response for alerts."""
@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from pydantic import BaseModel, Field, validator, root_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 class ListingBase(BaseModel):
     """Base model for listings with common fields."""
@@ -16,16 +16,9 @@ class ListingBase(BaseModel):
 class ListingCreate(ListingBase):
     """Model for creating a new listing."""
     scraped_at: Optional[datetime] = Field(None, description="When the listing was scraped")
-    images: List[str] = Field(default_factory=list, description="List of image URLs")
-    metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
+    images: List[str] = Field(default_factory=list, max_length=20, description="List of image URLs (at most 20)")
+    extra: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
     search_term: Optional[str] = Field(None, description="Search term used to find this listing")
-    
-    @validator('images')
-    def validate_images(cls, v):
-        """Validate image URLs."""
-        if len(v) > 20:
-            raise ValueError("Maximum of 20 images allowed")
-        return v
 
 class ListingUpdate(BaseModel):
     """Model for updating an existing listing."""
@@ -36,10 +29,9 @@ class ListingUpdate(BaseModel):
     location: Optional[str] = None
     category: Optional[str] = None
     url: Optional[str] = None
-    metadata: Optional[Dict[str, Any]] = None
+    extra: Optional[Dict[str, Any]] = None
     
-    class Config:
-        extra = "ignore"
+    model_config = ConfigDict(extra="ignore")
 
 class ListingImageResponse(BaseModel):
     """Response model for listing images."""
@@ -50,8 +42,7 @@ class ListingImageResponse(BaseModel):
     local_path: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ListingResponse(ListingBase):
     """Response model for listings."""
@@ -63,11 +54,16 @@ class ListingResponse(ListingBase):
     processed_at: Optional[datetime] = None
     search_term: Optional[str] = None
     keywords: Optional[List[str]] = None
-    metadata: Optional[Dict[str, Any]] = None
+    extra: Optional[Dict[str, Any]] = None
     images: List[ListingImageResponse] = Field(default_factory=list)
     
-    class Config:
-        orm_mode = True
+    @field_validator('status', mode='before')
+    @classmethod
+    def status_label(cls, v):
+        """Render ``ListingStatus`` members by name."""
+        return getattr(v, 'label', v)
+    
+    model_config = ConfigDict(from_attributes=True)
 
 class ListingSearchParams(BaseModel):
     """Search parameters for listings."""
@@ -81,10 +77,16 @@ class ListingSearchParams(BaseModel):
     skip: int = 0
     limit: int = 100
 
+class ListingCursor(BaseModel):
+    """Keyset position to pass back as ``after_scraped_at``/``after_id``."""
+    after_scraped_at: datetime
+    after_id: int
+
 class PaginatedListingResponse(BaseModel):
     """Paginated response for listings."""
     items: List[ListingResponse]
-    total: int
+    total: Optional[int] = None  # Only on the first page or with include_total
     page: int
-    pages: int
-    size: int 
\ No newline at end of file
+    pages: Optional[int] = None
+    size: int
+    next_cursor: Optional[ListingCursor] = None 
\ No newline at end of file
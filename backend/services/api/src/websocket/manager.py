@@ -1,9 +1,14 @@
 """WebSocket manager for real-time marketplace listing updates."""
 
-import json
 import logging
 import asyncio
-from typing import Dict, Set, Optional, Any, List
+import os
+import socket
+import zlib
+from collections import Counter, defaultdict
+
+import orjson
+from typing import Dict, Set, Optional, Any, List, Tuple, Union
 from fastapi import WebSocket, WebSocketDisconnect
 
 from shared.utils.kafka import KafkaConsumer
@@ -12,36 +17,91 @@ from shared.utils.monitoring import WEBSOCKET_CONNECTIONS, WEBSOCKET_MESSAGES_SE
 
 logger = get_logger("api.websocket")
 
+# A client that cannot take a frame within this many seconds is dropped
+_SEND_TIMEOUT_SECONDS = 5.0
+# Frames buffered per client; a client this far behind is dropped rather
+# than holding up the broadcast or growing memory without bound
+_OUTBOUND_QUEUE_SIZE = 256
+# Fastest zlib level; broadcast frames are small JSON documents that
+# compress well even at level 1
+_COMPRESSION_LEVEL = 1
+
+# An outbound frame: JSON text, and its zlib-compressed bytes when any
+# recipient asked for compression
+Frame = Tuple[str, Optional[bytes]]
+
+# Pong replies only differ in their timestamp, so they are built from a
+# pre-encoded prefix instead of encoding a fresh dict per ping
+_PONG_PREFIX = '{"type":"pong","timestamp":'
+
+# Kafka records fetched per poll, and how long a poll waits for the first one
+_KAFKA_BATCH_SIZE = 500
+_KAFKA_BATCH_TIMEOUT_SECONDS = 0.2
+
+def _batch_frame(items: List[Tuple[str, bytes]]) -> str:
+    """Join encoded updates into a ``batch`` frame.
+    
+    Args:
+        items: Pairs of Kafka topic and the update's JSON encoding
+        
+    Returns:
+        The JSON text of the frame
+    """
+    topic_counts = orjson.dumps(Counter(topic for topic, _ in items))
+    frame = b'{"type":"batch","topic_counts":%s,"items":[%s]}' % (
+        topic_counts, b",".join(item for _, item in items)
+    )
+    return frame.decode()
+
 class WebSocketManager:
     """
     Manager for WebSocket connections.
     
     Handles:
     - Connection management
-    - Broadcasting messages to clients
+    - Broadcasting messages to clients through a bounded outbound queue
+      and writer task per connection
     - Subscribing to Kafka topics for real-time updates
     """
     
     def __init__(self):
         """Initialize the WebSocket manager."""
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # Connections are keyed by id(websocket); category -> id -> outbound queue
+        self.active_connections: Dict[str, Dict[int, asyncio.Queue]] = {}
         self.kafka_consumer: Optional[KafkaConsumer] = None
         self.kafka_consumer_task: Optional[asyncio.Task] = None
         self.running = False
+        self._sockets: Dict[int, WebSocket] = {}
+        self._writers: Dict[int, asyncio.Task] = {}
+        self._compressed: Set[int] = set()
+        # Kept in step with active_connections so counting is O(1)
+        self._total_connections = 0
         
-    async def connect(self, websocket: WebSocket, category: str):
+    async def connect(self, websocket: WebSocket, category: str, use_compression: bool = False):
         """Accept a new WebSocket connection and add it to the active connections.
         
         Args:
             websocket: The WebSocket connection
             category: The category to subscribe to (e.g., 'furniture', 'electronics', 'all')
+            use_compression: Send zlib-compressed binary frames instead of JSON text
         """
         await websocket.accept()
         
+        # Re-subscribing replaces the old queue and writer rather than leaking them
+        key = id(websocket)
+        self._discard(key, category)
         if category not in self.active_connections:
-            self.active_connections[category] = set()
+            self.active_connections[category] = {}
         
-        self.active_connections[category].add(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_OUTBOUND_QUEUE_SIZE)
+        self.active_connections[category][key] = queue
+        self._sockets[key] = websocket
+        self._total_connections += 1
+        if use_compression:
+            self._compressed.add(key)
+        self._writers[key] = asyncio.create_task(
+            self._writer_loop(websocket, queue, category, use_compression)
+        )
         
         # Update metrics
         WEBSOCKET_CONNECTIONS.set(self._count_connections())
@@ -59,12 +119,7 @@ class WebSocketManager:
             websocket: The WebSocket connection
             category: The category the connection was subscribed to
         """
-        if category in self.active_connections:
-            self.active_connections[category].discard(websocket)
-            
-            # Remove the category if no connections
-            if not self.active_connections[category]:
-                del self.active_connections[category]
+        self._discard(id(websocket), category)
         
         # Update metrics
         WEBSOCKET_CONNECTIONS.set(self._count_connections())
@@ -75,37 +130,54 @@ class WebSocketManager:
         if self._count_connections() == 0:
             await self._stop_kafka_consumer()
     
-    async def broadcast(self, message: Dict[str, Any], category: str):
+    async def broadcast(self, message: Union[Dict[str, Any], str], category: str):
         """Broadcast a message to all clients in a specific category.
         
+        The message is encoded once (or passed in already encoded), and
+        compressed once if any subscriber asked for compression; the same
+        frame is queued for every subscriber. Each connection's writer task
+        does the actual send, so a slow client never holds up the others. A
+        client whose queue is full is dropped and closed.
+        
         Args:
-            message: The message to broadcast
+            message: The message to broadcast, or its JSON text
             category: The category of clients to broadcast to
         """
-        if category not in self.active_connections:
+        connections = self.active_connections.get(category)
+        if not connections:
             return
-            
-        disconnected_websockets = set()
-        message_count = 0
         
-        for websocket in self.active_connections[category]:
-            try:
-                await websocket.send_json(message)
-                message_count += 1
-            except Exception as e:
-                logger.error(f"Error sending message to WebSocket: {str(e)}")
-                disconnected_websockets.add(websocket)
+        payload = message if isinstance(message, str) else orjson.dumps(message).decode()
+        compressed = None
+        if self._compressed and not self._compressed.isdisjoint(connections):
+            compressed = zlib.compress(payload.encode(), _COMPRESSION_LEVEL)
+        frame: Frame = (payload, compressed)
         
-        # Remove any disconnected websockets
-        for websocket in disconnected_websockets:
-            self.active_connections[category].discard(websocket)
+        disconnected_keys = []
+        for key, queue in connections.items():
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                disconnected_keys.append(key)
         
         # Update metrics
-        WEBSOCKET_MESSAGES_SENT.inc(message_count)
+        WEBSOCKET_MESSAGES_SENT.inc(len(connections) - len(disconnected_keys))
         
-        if disconnected_websockets:
-            # Update connection count metric after removing disconnected sockets
+        if disconnected_keys:
+            logger.warning(
+                f"Dropping {len(disconnected_keys)} WebSocket(s) in category '{category}' "
+                f"with {_OUTBOUND_QUEUE_SIZE} frames pending"
+            )
+            disconnected_websockets = [self._discard(key, category) for key in disconnected_keys]
+            # Update connection count metric after removing slow sockets
             WEBSOCKET_CONNECTIONS.set(self._count_connections())
+            await asyncio.gather(
+                *(
+                    asyncio.wait_for(websocket.close(code=1013), timeout=_SEND_TIMEOUT_SECONDS)
+                    for websocket in disconnected_websockets
+                ),
+                return_exceptions=True
+            )
     
     async def broadcast_all(self, message: Dict[str, Any]):
         """Broadcast a message to all connected clients.
@@ -113,23 +185,34 @@ class WebSocketManager:
         Args:
             message: The message to broadcast
         """
-        for category in list(self.active_connections.keys()):
-            await self.broadcast(message, category)
+        payload = orjson.dumps(message).decode()
+        await asyncio.gather(
+            *(self.broadcast(payload, category) for category in list(self.active_connections))
+        )
     
-    async def handle_connection(self, websocket: WebSocket, category: str):
+    async def handle_connection(self, websocket: WebSocket, category: str, compress: bool = False):
         """Handle a WebSocket connection for a specific category.
         
         Args:
             websocket: The WebSocket connection
             category: The category to subscribe to
+            compress: Send updates as zlib-compressed binary frames; the
+                welcome message then carries ``"encoding": "deflate"``
+        
+        Kafka updates arrive as ``{"type": "batch", "topic_counts": {...},
+        "items": [...]}`` frames, each item being one listing or alert
+        update as announced by ``"update_format": "batch"`` in the welcome
+        message.
         """
-        await self.connect(websocket, category)
+        await self.connect(websocket, category, use_compression=compress)
         
         try:
             # Send welcome message
             await websocket.send_json({
                 "type": "info",
                 "message": f"Connected to {category} listings feed",
+                "encoding": "deflate" if compress else "identity",
+                "update_format": "batch",
                 "timestamp": asyncio.get_event_loop().time()
             })
             
@@ -140,9 +223,9 @@ class WebSocketManager:
                 data = await websocket.receive_text()
                 
                 try:
-                    command = json.loads(data)
+                    command = orjson.loads(data)
                     await self._handle_client_command(websocket, command, category)
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     logger.warning(f"Received invalid JSON: {data}")
                 except Exception as e:
                     logger.error(f"Error handling client command: {str(e)}")
@@ -166,49 +249,118 @@ class WebSocketManager:
         
         if cmd_type == "ping":
             # Respond to ping
-            await websocket.send_json({
-                "type": "pong",
-                "timestamp": asyncio.get_event_loop().time()
-            })
+            await websocket.send_text(f"{_PONG_PREFIX}{asyncio.get_running_loop().time()!r}}}")
         elif cmd_type == "filter":
             # Handle filter requests - could update the category or add specific filters
             new_category = command.get("category")
             if new_category and new_category != category:
+                use_compression = id(websocket) in self._compressed
                 await self.disconnect(websocket, category)
-                await self.connect(websocket, new_category)
+                await self.connect(websocket, new_category, use_compression=use_compression)
                 
                 await websocket.send_json({
                     "type": "info",
                     "message": f"Switched to {new_category} listings feed"
                 })
     
+    def _discard(self, key: int, category: str) -> Optional[WebSocket]:
+        """Unsubscribe a WebSocket from a category and stop its writer task.
+        
+        Args:
+            key: ``id()`` of the WebSocket connection
+            category: The category the connection was subscribed to
+            
+        Returns:
+            The WebSocket, or None if it was not subscribed to the category
+        """
+        connections = self.active_connections.get(category)
+        if connections is None or connections.pop(key, None) is None:
+            return None
+        self._total_connections -= 1
+        
+        # Remove the category if no connections
+        if not connections:
+            del self.active_connections[category]
+        
+        self._compressed.discard(key)
+        writer = self._writers.pop(key, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+        return self._sockets.pop(key, None)
+    
+    async def _writer_loop(self, websocket: WebSocket, queue: asyncio.Queue, category: str, use_compression: bool):
+        """Send queued frames to one WebSocket until it fails or is cancelled.
+        
+        Args:
+            websocket: The WebSocket connection
+            queue: The connection's outbound queue of frames
+            category: The category the connection is subscribed to
+            use_compression: Send the compressed form of each frame as binary
+        """
+        try:
+            while True:
+                payload, compressed = await queue.get()
+                if use_compression:
+                    send = websocket.send_bytes(compressed)
+                else:
+                    send = websocket.send_text(payload)
+                await asyncio.wait_for(send, timeout=_SEND_TIMEOUT_SECONDS)
+        except WebSocketDisconnect:
+            logger.info("WebSocket client disconnected while sending")
+        except asyncio.TimeoutError:
+            logger.warning("Timed out sending message to WebSocket")
+        except Exception as e:
+            logger.error(f"Error sending message to WebSocket: {str(e)}")
+        
+        # The receive loop in handle_connection finishes the disconnect
+        if self._discard(id(websocket), category) is not None:
+            WEBSOCKET_CONNECTIONS.set(self._count_connections())
+    
     async def _start_kafka_consumer(self):
         """Start the Kafka consumer task."""
         if self.kafka_consumer_task is None or self.kafka_consumer_task.done():
             self.running = True
             self.kafka_consumer_task = asyncio.create_task(self._kafka_consumer_loop())
+            self.kafka_consumer_task.add_done_callback(self._kafka_consumer_done)
             logger.info("Started Kafka consumer for WebSocket updates")
     
     async def _stop_kafka_consumer(self):
-        """Stop the Kafka consumer task."""
-        if self.kafka_consumer_task and not self.kafka_consumer_task.done():
-            self.running = False
-            
-            if self.kafka_consumer:
-                await self.kafka_consumer.stop()
-            
-            self.kafka_consumer_task.cancel()
-            try:
-                await self.kafka_consumer_task
-            except asyncio.CancelledError:
-                pass
-            
-            self.kafka_consumer_task = None
-            self.kafka_consumer = None
+        """Stop the Kafka consumer task.
+        
+        The task is cancelled and awaited; the consumer itself is closed by
+        the task on its way out, after any broadcast in progress has been
+        interrupted and any fetch on the worker thread has returned, so
+        closing never overlaps either.
+        """
+        task = self.kafka_consumer_task
+        if task is None:
+            return
+        
+        self.running = False
+        self.kafka_consumer_task = None
+        if not task.done():
+            task.cancel()
+            # Failures were already logged by _kafka_consumer_done
+            await asyncio.gather(task, return_exceptions=True)
             logger.info("Stopped Kafka consumer for WebSocket updates")
     
+    def _kafka_consumer_done(self, task: asyncio.Task):
+        """Log a Kafka consumer task that ended with an error."""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"Kafka consumer error: {str(error)}", exc_info=error)
+            if self.kafka_consumer_task is task:
+                self.running = False
+    
     async def _kafka_consumer_loop(self):
-        """Consume messages from Kafka and broadcast them to WebSocket clients."""
+        """Consume messages from Kafka and broadcast them to WebSocket clients.
+        
+        Runs until ``running`` is cleared or the task is cancelled, and
+        always closes the consumer before returning. Errors propagate to
+        the task and are logged by ``_kafka_consumer_done``.
+        """
         # Topics to consume from
         topics = [
             "marketplace.listings.new", 
@@ -216,57 +368,110 @@ class WebSocketManager:
             "marketplace.alerts.triggered"
         ]
         
+        # Each API worker process holds its own WebSocket clients, so each
+        # needs every update: a group per process instead of one shared group
+        # that would split the partitions between workers
+        self.kafka_consumer = KafkaConsumer(
+            bootstrap_servers="kafka:9092",
+            group_id=f"websocket-manager-{socket.gethostname()}-{os.getpid()}",
+            topics=topics,
+            client_id="api-websocket"
+        )
+        
         try:
-            self.kafka_consumer = KafkaConsumer(
-                bootstrap_servers="kafka:9092",
-                group_id="websocket-manager",
-                topics=topics,
-                client_id="api-websocket"
-            )
-            
             await self.kafka_consumer.start()
             
-            async for message in self.kafka_consumer.consume():
-                if not self.running:
-                    break
+            while self.running:
+                batch = await self.kafka_consumer.consume_batch(
+                    _KAFKA_BATCH_SIZE, _KAFKA_BATCH_TIMEOUT_SECONDS
+                )
                 
-                try:
-                    # Parse the message value
-                    if not message.value():
-                        continue
-                        
-                    value = json.loads(message.value())
-                    
-                    # Determine the category from the message
-                    # For listings, use the category field
-                    # For alerts, use a special "alerts" category
-                    if message.topic() == "marketplace.alerts.triggered":
-                        category = "alerts"
-                    else:
-                        category = value.get("category", "all")
-                    
-                    # Broadcast to specific category and "all" category
-                    websocket_message = {
-                        "type": "listing" if "listing" in message.topic() else "alert",
-                        "data": value,
-                        "topic": message.topic(),
-                        "timestamp": asyncio.get_event_loop().time()
-                    }
-                    
-                    await self.broadcast(websocket_message, category)
-                    
-                    # Also broadcast to "all" if it's not already the category
-                    if category != "all":
-                        await self.broadcast(websocket_message, "all")
-                    
-                except json.JSONDecodeError:
-                    logger.warning(f"Received invalid JSON from Kafka: {message.value()}")
-                except Exception as e:
-                    logger.error(f"Error processing Kafka message for WebSocket: {str(e)}")
+                if batch:
+                    await self._broadcast_kafka_batch(batch)
+        finally:
+            # Shielded so a second cancel cannot abandon the close half way;
+            # stop() waits for a fetch cut short by the cancel to return first
+            consumer, self.kafka_consumer = self.kafka_consumer, None
+            await asyncio.shield(consumer.stop())
+    
+    async def _broadcast_kafka_batch(self, batch: List[Any]):
+        """Broadcast a batch of Kafka records as one frame per category.
+        
+        Each subscribed category gets a single ``batch`` frame with its own
+        updates, and "all" gets every update in the batch, in order. Record
+        values are already JSON, so they are spliced into the frames as-is
+        instead of being decoded and encoded again.
+        
+        Args:
+            batch: The Kafka records
+        """
+        timestamp = orjson.dumps(asyncio.get_event_loop().time())
+        prefixes: Dict[str, bytes] = {}
+        by_category: Dict[str, List[Tuple[str, bytes]]] = defaultdict(list)
+        everything: List[Tuple[str, bytes]] = []
+        
+        for message in batch:
+            update = self._kafka_update(message)
+            if update is None:
+                continue
+            category, topic, value = update
+            
+            # Everything but the data is shared by all updates from a topic
+            prefix = prefixes.get(topic)
+            if prefix is None:
+                prefix = prefixes[topic] = b'{"type":%s,"topic":%s,"timestamp":%s,"data":' % (
+                    b'"listing"' if "listing" in topic else b'"alert"',
+                    orjson.dumps(topic),
+                    timestamp
+                )
+            item = (topic, prefix + value + b"}")
+            
+            everything.append(item)
+            if category != "all" and category in self.active_connections:
+                by_category[category].append(item)
+        
+        if everything and "all" in self.active_connections:
+            by_category["all"] = everything
+        
+        for category, items in by_category.items():
+            await self.broadcast(_batch_frame(items), category)
+    
+    def _kafka_update(self, message) -> Optional[Tuple[str, str, bytes]]:
+        """Route one Kafka record.
         
+        The value is parsed only to validate it and read its category.
+        
+        Args:
+            message: The Kafka record
+            
+        Returns:
+            The category to send the update to, the record's topic and its
+            raw JSON value, or None if the record is empty or not valid JSON
+        """
+        try:
+            # Parse the message value
+            value = message.value()
+            if not value:
+                return None
+                
+            parsed = orjson.loads(value)
+            topic = message.topic()
+            
+            # Determine the category from the message
+            # For listings, use the category field
+            # For alerts, use a special "alerts" category
+            if topic == "marketplace.alerts.triggered":
+                category = "alerts"
+            else:
+                category = parsed.get("category", "all")
+            
+            return category, topic, value
+            
+        except orjson.JSONDecodeError:
+            logger.warning(f"Received invalid JSON from Kafka: {message.value()}")
         except Exception as e:
-            logger.error(f"Kafka consumer error: {str(e)}")
-            self.running = False
+            logger.error(f"Error processing Kafka message for WebSocket: {str(e)}")
+        return None
     
     def _count_connections(self) -> int:
         """Count the total number of active WebSocket connections.
@@ -274,17 +479,23 @@ class WebSocketManager:
         Returns:
             The total number of connections
         """
-        return sum(len(connections) for connections in self.active_connections.values())
+        return self._total_connections
     
     async def close_all(self):
         """Close all WebSocket connections."""
         # First, stop the Kafka consumer
         await self._stop_kafka_consumer()
         
-        # Close all connections
-        all_websockets = []
-        for category in self.active_connections:
-            all_websockets.extend(self.active_connections[category])
+        # Stop the writers and close all connections
+        writers = list(self._writers.values())
+        for writer in writers:
+            writer.cancel()
+        await asyncio.gather(*writers, return_exceptions=True)
+        self._writers.clear()
+        self._compressed.clear()
+        
+        all_websockets = list(self._sockets.values())
+        self._sockets.clear()
         
         for websocket in all_websockets:
             try:
@@ -294,6 +505,7 @@ class WebSocketManager:
         
         # Clear the connections dictionary
         self.active_connections.clear()
+        self._total_connections = 0
         
         # Update metrics
         WEBSOCKET_CONNECTIONS.set(0)
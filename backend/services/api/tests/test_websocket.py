@@ -3,6 +3,7 @@
 import pytest
 import asyncio
 import json
+import zlib
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi import WebSocket, WebSocketDisconnect
@@ -25,6 +26,7 @@ def mock_websocket():
     mock.state = MagicMock()
     mock.accept = AsyncMock()
     mock.send_json = AsyncMock()
+    mock.send_text = AsyncMock()
     mock.receive_text = AsyncMock()
     mock.close = AsyncMock()
     return mock
@@ -37,7 +39,7 @@ def mock_kafka_consumer():
         consumer = AsyncMock()
         consumer.start = AsyncMock()
         consumer.stop = AsyncMock()
-        consumer.consume = AsyncMock()
+        consumer.consume_batch = AsyncMock(return_value=[])
         mock.return_value = consumer
         yield consumer
 
@@ -69,6 +71,7 @@ class TestWebSocketManager:
         """Test connecting a WebSocket."""
         # Reset the singleton for testing
         websocket_manager.active_connections = {}
+        websocket_manager._total_connections = 0
         websocket_manager.running = False
         
         with patch.object(websocket_manager, "_start_kafka_consumer", AsyncMock()) as mock_start:
@@ -77,18 +80,24 @@ class TestWebSocketManager:
             # Check that the WebSocket was accepted
             mock_websocket.accept.assert_called_once()
             
-            # Check that the connection was added
+            # Check that the connection was added with a writer task
             assert "test" in websocket_manager.active_connections
-            assert mock_websocket in websocket_manager.active_connections["test"]
+            assert id(mock_websocket) in websocket_manager.active_connections["test"]
+            assert id(mock_websocket) in websocket_manager._writers
+            assert websocket_manager._count_connections() == 1
             
             # Check that the Kafka consumer was started
             mock_start.assert_called_once()
+            
+            await websocket_manager.disconnect(mock_websocket, "test")
 
     @pytest.mark.asyncio
     async def test_disconnect(self, mock_websocket):
         """Test disconnecting a WebSocket."""
         # Set up a connection
-        websocket_manager.active_connections = {"test": {mock_websocket}}
+        websocket_manager.active_connections = {"test": {id(mock_websocket): asyncio.Queue()}}
+        websocket_manager._sockets = {id(mock_websocket): mock_websocket}
+        websocket_manager._total_connections = 1
         websocket_manager.running = True
         
         with patch.object(websocket_manager, "_stop_kafka_consumer", AsyncMock()) as mock_stop:
@@ -96,6 +105,7 @@ class TestWebSocketManager:
             
             # Check that the connection was removed
             assert "test" not in websocket_manager.active_connections
+            assert websocket_manager._count_connections() == 0
             
             # Check that the Kafka consumer was stopped
             mock_stop.assert_called_once()
@@ -106,37 +116,90 @@ class TestWebSocketManager:
         # Set up connections
         websocket1 = mock_websocket
         websocket2 = AsyncMock(spec=WebSocket)
-        websocket2.send_json = AsyncMock()
+        websocket2.send_text = AsyncMock()
         
-        websocket_manager.active_connections = {"test": {websocket1, websocket2}}
+        queue1, queue2 = asyncio.Queue(), asyncio.Queue()
+        websocket_manager.active_connections = {"test": {id(websocket1): queue1, id(websocket2): queue2}}
         
         # Broadcast a message
         message = {"type": "test", "data": "hello"}
         await websocket_manager.broadcast(message, "test")
         
-        # Check that the message was sent to both WebSockets
-        websocket1.send_json.assert_called_once_with(message)
-        websocket2.send_json.assert_called_once_with(message)
+        # Check that the same encoded frame was queued for both WebSockets
+        frame = queue1.get_nowait()
+        payload, compressed = frame
+        assert json.loads(payload) == message
+        assert compressed is None
+        assert queue2.get_nowait() is frame
+
+    @pytest.mark.asyncio
+    async def test_broadcast_compressed(self, mock_websocket):
+        """Test that a frame is compressed once when a subscriber wants it."""
+        websocket2 = AsyncMock(spec=WebSocket)
+        queue1, queue2 = asyncio.Queue(), asyncio.Queue()
+        websocket_manager.active_connections = {"test": {id(mock_websocket): queue1, id(websocket2): queue2}}
+        websocket_manager._compressed = {id(websocket2)}
+        
+        message = {"type": "test", "data": "hello"}
+        await websocket_manager.broadcast(message, "test")
+        
+        payload, compressed = queue2.get_nowait()
+        assert json.loads(zlib.decompress(compressed)) == message
+        assert queue1.get_nowait() == (payload, compressed)
+        websocket_manager._compressed = set()
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encoded(self, mock_websocket):
+        """Test broadcasting a message that is already encoded."""
+        queue = asyncio.Queue()
+        websocket_manager.active_connections = {"test": {id(mock_websocket): queue}}
+        
+        await websocket_manager.broadcast('{"type":"test"}', "test")
+        
+        assert queue.get_nowait() == ('{"type":"test"}', None)
 
     @pytest.mark.asyncio
-    async def test_broadcast_with_error(self, mock_websocket):
-        """Test broadcasting a message when one client has an error."""
+    async def test_broadcast_with_full_queue(self, mock_websocket):
+        """Test broadcasting a message when one client has fallen behind."""
         # Set up connections
         websocket1 = mock_websocket
         websocket2 = AsyncMock(spec=WebSocket)
-        websocket2.send_json = AsyncMock(side_effect=Exception("Test error"))
+        websocket2.close = AsyncMock()
         
-        websocket_manager.active_connections = {"test": {websocket1, websocket2}}
+        queue1 = asyncio.Queue()
+        queue2 = asyncio.Queue(maxsize=1)
+        queue2.put_nowait(("pending", None))
+        websocket_manager.active_connections = {"test": {id(websocket1): queue1, id(websocket2): queue2}}
+        websocket_manager._sockets = {id(websocket1): websocket1, id(websocket2): websocket2}
+        websocket_manager._total_connections = 2
         
         # Broadcast a message
         message = {"type": "test", "data": "hello"}
         await websocket_manager.broadcast(message, "test")
         
-        # Check that the message was sent to the working WebSocket
-        websocket1.send_json.assert_called_once_with(message)
+        # Check that the message was queued for the working WebSocket
+        assert json.loads(queue1.get_nowait()[0]) == message
+        
+        # Check that the slow WebSocket was removed and closed
+        assert id(websocket2) not in websocket_manager.active_connections["test"]
+        assert websocket_manager._count_connections() == 1
+        websocket2.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_writer_loop_with_error(self, mock_websocket):
+        """Test that a failed send unsubscribes the WebSocket."""
+        mock_websocket.send_text = AsyncMock(side_effect=Exception("Test error"))
+        queue = asyncio.Queue()
+        queue.put_nowait(("frame", None))
+        websocket_manager.active_connections = {"test": {id(mock_websocket): queue}}
+        websocket_manager._sockets = {id(mock_websocket): mock_websocket}
+        websocket_manager._total_connections = 1
+        
+        await websocket_manager._writer_loop(mock_websocket, queue, "test", False)
         
-        # Check that the error WebSocket was removed
-        assert websocket2 not in websocket_manager.active_connections["test"]
+        mock_websocket.send_text.assert_called_once_with("frame")
+        assert "test" not in websocket_manager.active_connections
+        assert websocket_manager._count_connections() == 0
 
     @pytest.mark.asyncio
     async def test_handle_client_command_ping(self, mock_websocket):
@@ -148,10 +211,10 @@ class TestWebSocketManager:
         await websocket_manager._handle_client_command(mock_websocket, command, "test")
         
         # Check that a pong was sent
-        mock_websocket.send_json.assert_called_once()
-        sent_message = mock_websocket.send_json.call_args[0][0]
+        mock_websocket.send_text.assert_called_once()
+        sent_message = json.loads(mock_websocket.send_text.call_args[0][0])
         assert sent_message["type"] == "pong"
-        assert "timestamp" in sent_message
+        assert isinstance(sent_message["timestamp"], float)
 
     @pytest.mark.asyncio
     async def test_handle_client_command_filter(self, mock_websocket):
@@ -167,7 +230,7 @@ class TestWebSocketManager:
                 
                 # Check that disconnect and connect were called
                 mock_disconnect.assert_called_once_with(mock_websocket, "test")
-                mock_connect.assert_called_once_with(mock_websocket, "new_category")
+                mock_connect.assert_called_once_with(mock_websocket, "new_category", use_compression=False)
                 
                 # Check that a confirmation was sent
                 mock_websocket.send_json.assert_called_once()
@@ -180,6 +243,7 @@ class TestWebSocketManager:
         """Test the Kafka consumer loop."""
         # Set up the test
         websocket_manager.running = True
+        websocket_manager.active_connections = {"test_category": {}, "all": {}}
         
         # Create a message
         message = MagicMock()
@@ -190,8 +254,14 @@ class TestWebSocketManager:
             "category": "test_category"
         }).encode()
         
-        # Mock the async iterator for consume
-        mock_kafka_consumer.consume.return_value.__aiter__.return_value = [message]
+        # Return the message in the first batch and nothing afterwards
+        batches = [[message]]
+        
+        async def consume_batch(*args):
+            await asyncio.sleep(0.01)
+            return batches.pop() if batches else []
+        
+        mock_kafka_consumer.consume_batch.side_effect = consume_batch
         
         # Patch the broadcast method
         with patch.object(websocket_manager, "broadcast", AsyncMock()) as mock_broadcast:
@@ -208,22 +278,15 @@ class TestWebSocketManager:
             # Check that the consumer was started
             mock_kafka_consumer.start.assert_called_once()
             
-            # Check that broadcast was called for the category and "all"
+            # Check that one batch frame was broadcast to the category and "all"
             assert mock_broadcast.call_count == 2
-            mock_broadcast.assert_any_call(
-                {
-                    "type": "listing",
-                    "data": {
-                        "id": "123",
-                        "title": "Test Listing",
-                        "category": "test_category"
-                    },
-                    "topic": "marketplace.listings.new",
-                    "timestamp": mock_broadcast.call_args[0][0]["timestamp"]
-                },
-                "test_category"
-            )
-            mock_broadcast.assert_any_call(
+            payload = mock_broadcast.call_args[0][0]
+            mock_broadcast.assert_any_call(payload, "test_category")
+            mock_broadcast.assert_any_call(payload, "all")
+            frame = json.loads(payload)
+            assert frame["type"] == "batch"
+            assert frame["topic_counts"] == {"marketplace.listings.new": 1}
+            assert frame["items"] == [
                 {
                     "type": "listing",
                     "data": {
@@ -232,10 +295,28 @@ class TestWebSocketManager:
                         "category": "test_category"
                     },
                     "topic": "marketplace.listings.new",
-                    "timestamp": mock_broadcast.call_args[0][0]["timestamp"]
-                },
-                "all"
-            )
+                    "timestamp": frame["items"][0]["timestamp"]
+                }
+            ]
+
+    @pytest.mark.asyncio
+    async def test_stop_kafka_consumer(self, mock_kafka_consumer):
+        """Test that stopping the consumer task also closes the consumer."""
+        async def consume_batch(*args):
+            await asyncio.sleep(0.01)
+            return []
+        
+        mock_kafka_consumer.consume_batch.side_effect = consume_batch
+        websocket_manager.kafka_consumer_task = None
+        
+        await websocket_manager._start_kafka_consumer()
+        await asyncio.sleep(0.05)
+        await websocket_manager._stop_kafka_consumer()
+        
+        mock_kafka_consumer.stop.assert_called_once()
+        assert websocket_manager.kafka_consumer is None
+        assert websocket_manager.kafka_consumer_task is None
+        assert websocket_manager.running is False
 
 
 class TestWebSocketRoutes:
@@ -250,7 +331,7 @@ class TestWebSocketRoutes:
             await listings_websocket(mock_websocket, "test")
             
             # Check that handle_connection was called
-            mock_handle.assert_called_once_with(mock_websocket, "test")
+            mock_handle.assert_called_once_with(mock_websocket, "test", compress=False)
 
     @pytest.mark.asyncio
     async def test_secure_listings_websocket(self, mock_websocket, mock_jwt_handler, mock_db_session):
@@ -277,13 +358,13 @@ class TestWebSocketRoutes:
                     assert mock_websocket.state.user == user
                     
                     # Check that handle_connection was called
-                    mock_handle.assert_called_once_with(mock_websocket, "test")
+                    mock_handle.assert_called_once_with(mock_websocket, "test", compress=False)
 
     @pytest.mark.asyncio
     async def test_websocket_status(self):
         """Test the WebSocket status endpoint."""
         # Set up the test
-        websocket_manager.active_connections = {"test": set(), "all": set()}
+        websocket_manager.active_connections = {"test": {}, "all": {}}
         websocket_manager.running = True
         
         with patch.object(websocket_manager, "_count_connections", return_value=5):
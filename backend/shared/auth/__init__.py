@@ -1,4 +1,4 @@
 from shared.auth.jwt import jwt_handler, Token, TokenData
-from shared.auth.auth_service import AuthService
+from shared.auth.auth_service import AuthService, auth_service
 
-__all__ = ["jwt_handler", "Token", "TokenData", "AuthService"] 
\ No newline at end of file
+__all__ = ["jwt_handler", "Token", "TokenData", "AuthService", "auth_service"] 
\ No newline at end of file
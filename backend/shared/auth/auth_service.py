@@ -4,13 +4,13 @@ from typing import Optional, Dict, Any, List, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 import secrets
 import jwt
 import string
 
 from backend.shared.auth.jwt import jwt_handler, Token, TokenData
+from backend.shared.auth.password import pwd_context
 from backend.shared.config.logging_config import get_logger
 from backend.shared.models.user import User
 from backend.shared.config.settings import get_settings
@@ -19,14 +19,18 @@ from backend.shared.config.settings import get_settings
 settings = get_settings()
 logger = get_logger("auth_service")
 
+
 class AuthService:
     """
     Service for handling user authentication and authorization.
     """
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Optional[Session] = None):
+        # Only the user lookup and reset-token methods touch the session;
+        # hashing and token helpers work on the shared ``auth_service``
         self.db = db_session
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # Process-wide context; building one probes the bcrypt backend
+        self.pwd_context = pwd_context
         self.secret_key = settings.SECRET_KEY
         self.algorithm = "HS256"
         self.token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES or 30
@@ -342,4 +346,8 @@ class AuthService:
         user.verification_token_expires = None
         self.db.commit()
         
-        return user.id 
\ No newline at end of file
+        return user.id 
+
+
+# Session-free instance for hashing and token operations
+auth_service = AuthService()
@@ -1,9 +1,13 @@
 from typing import Optional, Annotated, List, Union, Callable, Dict, Any
 from functools import wraps
+import hashlib
 import logging
+import time
 import jwt
 from datetime import datetime, timedelta
 
+from cachetools import TTLCache
+
 from fastapi import Depends, HTTPException, status, Security, Header, Query, WebSocket, Cookie
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from pydantic import ValidationError
@@ -35,6 +39,17 @@ oauth2_scheme = OAuth2PasswordBearer(
 
 jwt_handler = JWTHandler()
 
+# Claims of recently verified WebSocket tokens. Reconnecting clients skip
+# signature verification; the token's own expiry is still checked on every
+# hit, and the user is always read fresh, so deactivation and role changes
+# apply at once in every worker.
+_ws_token_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+
+
+def token_digest(token: str) -> bytes:
+    """Key token caches by a short digest instead of holding raw tokens."""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db_session)
@@ -123,17 +138,27 @@ async def get_current_user_ws(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required"
         )
+    
+    # decode_token builds exp with datetime.fromtimestamp, so compare it as
+    # a POSIX timestamp rather than against a UTC wall-clock datetime
+    cache_key = token_digest(jwt_token)
+    token_data = _ws_token_cache.get(cache_key)
+    if token_data is not None and token_data.exp.timestamp() <= time.time():
+        _ws_token_cache.pop(cache_key, None)
+        token_data = None
+    
+    if token_data is None:
+        try:
+            # Verify and decode the token
+            token_data = jwt_handler.decode_token(jwt_token)
+        except HTTPException:
+            logger.warning(f"Invalid WebSocket token: {jwt_token[:10]}...")
+            await websocket.close(code=1008, reason="Invalid token")
+            raise
+        if token_data.exp is not None:
+            _ws_token_cache[cache_key] = token_data
         
     try:
-        # Verify and decode the token
-        token_data = jwt_handler.verify_token(jwt_token)
-        if token_data is None:
-            await websocket.close(code=1008, reason="Invalid token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-            
         # Get the user from the database
         async with get_db_session() as db:
             user = await get_user_by_id(db, token_data.user_id)
@@ -6,6 +6,7 @@ import logging
 from pydantic import BaseModel
 
 from ..config.settings import get_settings
+from .password import pwd_context
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -153,9 +154,6 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
-    from passlib.context import CryptContext
-    
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     return pwd_context.verify(plain_password, hashed_password)
 
 
@@ -169,7 +167,4 @@ def get_password_hash(password: str) -> str:
     Returns:
         The hashed password
     """
-    from passlib.context import CryptContext
-    
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     return pwd_context.hash(password) 
\ No newline at end of file
@@ -8,8 +8,22 @@ import os
 import sys
 from typing import Any, Dict, Optional
 
+try:
+    import orjson
+except ImportError:  # only the API service installs orjson
+    orjson = None
+
 from .settings import get_settings
 
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED_ATTRS = frozenset((
+    "args", "asctime", "created", "exc_info", "exc_text",
+    "filename", "funcName", "id", "levelname", "levelno",
+    "lineno", "module", "msecs", "message", "msg",
+    "name", "pathname", "process", "processName",
+    "relativeCreated", "stack_info", "thread", "threadName", "taskName",
+))
+
 
 class JSONFormatter(logging.Formatter):
     """
@@ -30,14 +44,13 @@ class JSONFormatter(logging.Formatter):
         
         # Include any custom attributes added to the log record
         for key, value in record.__dict__.items():
-            if key not in ["args", "asctime", "created", "exc_info", "exc_text", 
-                          "filename", "funcName", "id", "levelname", "levelno",
-                          "lineno", "module", "msecs", "message", "msg", 
-                          "name", "pathname", "process", "processName", 
-                          "relativeCreated", "stack_info", "thread", "threadName"]:
+            if key not in _RESERVED_ATTRS:
                 log_record[key] = value
         
-        return json.dumps(log_record)
+        if orjson is not None:
+            # json.dumps accepted int/float/bool dict keys in extras; so does this
+            return orjson.dumps(log_record, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(log_record, default=str)
 
 
 def setup_logging(service_name: str, log_level: Optional[str] = None) -> None:
@@ -2,6 +2,7 @@
 
 import os
 import logging
+import functools
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import yaml
@@ -39,6 +40,8 @@ class DatabaseConfig(BaseModel):
     """Configuration for database."""
     url: str = Field(default="sqlite:///./facebook_marketplace.db")
     echo_sql: bool = Field(default=False)
+    # Per process: every API worker opens its own pools, so the server can
+    # hold workers x (pool_size + max_overflow) connections per engine
     pool_size: int = Field(default=5)
     max_overflow: int = Field(default=10)
     pool_timeout: int = Field(default=30)
@@ -82,6 +85,7 @@ class APIConfig(BaseModel):
     auth_enabled: bool = Field(default=True)
     rate_limit_enabled: bool = Field(default=True)
     rate_limit: int = Field(default=100)  # requests per minute
+    redis_url: Optional[str] = Field(default=None)  # shared rate limit buckets across workers
 
 
 class NotificationsConfig(BaseModel):
@@ -223,9 +227,13 @@ def load_settings(config_path: Optional[str] = None) -> Settings:
 _app_settings: Optional[Settings] = None
 
 
+@functools.lru_cache(maxsize=8)
 def get_settings(service_name: str) -> Settings:
     """
     Get settings for a specific service.
+
+    Results are cached per service name, so this is cheap enough to call
+    from request handlers and FastAPI dependencies.
     
     Args:
         service_name: Name of the service (api, scraper, processor, notifications)
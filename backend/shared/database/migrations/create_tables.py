@@ -16,7 +16,7 @@ from sqlalchemy.schema import CreateTable
 
 from shared.config.settings import get_settings
 from shared.models.base import Base
-from shared.models.marketplace import User, Listing, PriceAlert, AlertHistory
+from shared.models.marketplace import User, Listing, PriceAlert, AlertMatch
 
 # Configure logging
 logging.basicConfig(
@@ -44,7 +44,7 @@ async def create_tables(database_url: str, drop_existing: bool = False):
     )
     
     # Import all models to ensure they are registered with Base
-    models = [User, Listing, PriceAlert, AlertHistory]
+    models = [User, Listing, PriceAlert, AlertMatch]
     
     async with engine.begin() as conn:
         if drop_existing:
@@ -95,7 +95,6 @@ async def create_sample_data(database_url: str):
         # Create sample users
         users = [
             User(
-                id=uuid.uuid4(),
                 username=f"user{i}",
                 email=f"user{i}@example.com",
                 password_hash="$2b$12$EixZaYVK1fsbw1ZfbX3OXePaWxn96p36WQoeG6Lruj3vjPGga31lW",  # "password"
@@ -114,7 +113,6 @@ async def create_sample_data(database_url: str):
         # Create sample listings
         listings = [
             Listing(
-                id=uuid.uuid4(),
                 external_id=f"ext-{uuid.uuid4()}",
                 title=f"Sample Listing {i}",
                 description=f"This is a sample listing {i} with detailed description.",
@@ -131,7 +129,7 @@ async def create_sample_data(database_url: str):
                 is_sold=False,
                 is_deleted=False,
                 source="facebook",
-                metadata={"condition": "new" if i % 2 == 0 else "used"}
+                extra={"condition": "new" if i % 2 == 0 else "used"}
             )
             for i in range(1, 11)
         ]
@@ -182,19 +180,18 @@ async def create_sample_data(database_url: str):
         session.add_all(alerts)
         await session.flush()
         
-        # Create sample alert history
-        alert_histories = [
-            AlertHistory(
+        # Create sample alert matches
+        alert_matches = [
+            AlertMatch(
                 alert_id=alerts[0].id,
-                listing_id=listings[0].id,
-                triggered_at=datetime.utcnow() - timedelta(hours=i),
-                notification_sent=True,
-                notification_time=datetime.utcnow() - timedelta(hours=i, minutes=5)
+                listing_id=listings[i].id,
+                matched_at=datetime.utcnow() - timedelta(hours=i),
+                notified_at=datetime.utcnow() - timedelta(hours=i, minutes=-5)
             )
             for i in range(1, 4)
         ]
         
-        session.add_all(alert_histories)
+        session.add_all(alert_matches)
         
         # Commit all changes
         await session.commit()
@@ -39,16 +39,21 @@ class DatabaseSession:
             self.engine = create_engine(
                 db_url,
                 pool_pre_ping=True,
-                pool_recycle=3600,
-                pool_size=5,
-                max_overflow=10,
+                pool_recycle=self.settings.database.pool_recycle,
+                pool_size=self.settings.database.pool_size,
+                max_overflow=self.settings.database.max_overflow,
+                pool_timeout=self.settings.database.pool_timeout,
                 echo=self.settings.database.echo_sql
             )
             
             # Create session factory
+            # Keep loaded attributes after the session() block commits, so
+            # repository results (and their eager-loaded relationships) stay
+            # readable once the session is closed
             self.session_factory = sessionmaker(
                 autocommit=False,
                 autoflush=False,
+                expire_on_commit=False,
                 bind=self.engine
             )
             
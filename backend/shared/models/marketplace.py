@@ -3,10 +3,12 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Float, Text, DateTime, Boolean,
-    ForeignKey, Enum, JSON, func, Table
+    Column, Integer, BigInteger, SmallInteger, String, Float, Text, DateTime, Boolean,
+    ForeignKey, JSON, func, Table, FetchedValue, Identity, UniqueConstraint, CheckConstraint,
+    table, column
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import relationship, synonym
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.hybrid import hybrid_property
 import enum
@@ -23,7 +25,8 @@ class User(Base):
     
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(BigInteger, Identity(always=False), primary_key=True)
+    public_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4, server_default=func.gen_random_uuid())
     username = Column(String(50), unique=True, nullable=False, index=True)
     email = Column(String(100), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
@@ -43,21 +46,74 @@ class User(Base):
         return f"<User {self.username}>"
 
 
-class ListingStatus(enum.Enum):
-    """Status of a marketplace listing."""
-    NEW = "new"               # Newly scraped, not processed
-    PROCESSED = "processed"   # Processed but not matched
-    MATCHED = "matched"       # Matched with at least one alert
-    ARCHIVED = "archived"     # No longer active on marketplace
-    ERROR = "error"           # Error processing the listing
+class ListingStatus(enum.IntEnum):
+    """Status of a marketplace listing, stored as a SMALLINT."""
+    NEW = 0         # Newly scraped, not processed
+    PROCESSED = 1   # Processed but not matched
+    MATCHED = 2     # Matched with at least one alert
+    ARCHIVED = 3    # No longer active on marketplace
+    ERROR = 4       # Error processing the listing
+
+    @property
+    def label(self) -> str:
+        """Lowercase name used in API payloads."""
+        return self.name.lower()
+
+
+class AlertKind(enum.IntEnum):
+    """Kind of row in the shared ``alerts`` table, stored as a SMALLINT."""
+    SEARCH = 0      # Saved search matched on its query
+    PRICE = 1       # Price alert on a search term and/or category
+
+
+class NotificationMethod(enum.IntEnum):
+    """Delivery channel of an alert, stored as a SMALLINT."""
+    EMAIL = 0
+    SMS = 1
+    PUSH = 2
+
+
+class SmallIntEnum(TypeDecorator):
+    """
+    Store an ``IntEnum`` in a SMALLINT column.
+
+    Values come back as enum members, or as lowercase member names when
+    ``as_name`` is set so callers can keep using plain strings.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class, as_name: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.enum_class = enum_class
+        self.as_name = as_name
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = self.enum_class[value.upper()]
+        return int(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        member = self.enum_class(value)
+        return member.name.lower() if self.as_name else member
 
 
 class Listing(Base):
     """Model for a marketplace listing."""
     __tablename__ = "listings"
+    __table_args__ = (
+        UniqueConstraint("listing_id_fp", "listing_id", name="uq_listings_listing_id"),
+        CheckConstraint("status >= 0 AND status <= 4", name="ck_listing_status"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    listing_id = Column(String(255), unique=True, nullable=False, index=True)  # Original ID from marketplace
+    listing_id = Column(String(255), nullable=False)  # Original ID from marketplace
+    listing_id_fp = Column(BigInteger, FetchedValue(), nullable=False)  # Set by trigger from listing_id
     title = Column(String(512), nullable=False)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=True)
@@ -73,16 +129,16 @@ class Listing(Base):
     
     # Processing info
     search_term = Column(String(255), nullable=True)  # Search term used to find this listing
-    status = Column(Enum(ListingStatus), default=ListingStatus.NEW, nullable=False)
+    status = Column(SmallIntEnum(ListingStatus), default=ListingStatus.NEW, server_default="0", nullable=False)
     processed_at = Column(DateTime, nullable=True)  # When it was processed
     
     # Extracted and enriched data
     keywords = Column(JSON, nullable=True)  # Extracted keywords
-    metadata = Column(JSON, nullable=True)  # Additional metadata
+    extra = Column(JSON, nullable=True)  # Additional metadata
     
     # Relationships
     images = relationship("ListingImage", back_populates="listing", cascade="all, delete-orphan")
-    alerts = relationship("Alert", secondary="listing_alerts", back_populates="listings")
+    alerts = relationship("Alert", secondary="alert_matches", back_populates="listings", viewonly=True)
     
     @hybrid_property
     def image_count(self) -> int:
@@ -105,10 +161,10 @@ class Listing(Base):
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "scraped_at": self.scraped_at.isoformat() if self.scraped_at else None,
             "search_term": self.search_term,
-            "status": self.status.value if self.status else None,
+            "status": self.status.label if self.status is not None else None,
             "processed_at": self.processed_at.isoformat() if self.processed_at else None,
             "keywords": self.keywords,
-            "metadata": self.metadata,
+            "extra": self.extra,
             "images": [img.url for img in self.images] if self.images else [],
             "image_count": self.image_count
         }
@@ -146,10 +202,10 @@ class Listing(Base):
                 status=ListingStatus.NEW
             )
             
-            # Store any additional data as metadata
-            metadata = {k: v for k, v in data.items() if k not in listing.to_dict()}
-            if metadata:
-                listing.metadata = metadata
+            # Store any additional data as extra metadata
+            extra = {k: v for k, v in data.items() if k not in listing.to_dict()}
+            if extra:
+                listing.extra = extra
             
             return listing
             
@@ -160,6 +216,11 @@ class Listing(Base):
             raise
 
 
+# Materialized view of distinct non-empty categories (migration 007). Not
+# part of Base.metadata, so create_all never tries to make it a table.
+listing_categories = table("listing_categories", column("category", String))
+
+
 class ListingImage(Base):
     """Model for a marketplace listing image."""
     __tablename__ = "listing_images"
@@ -189,13 +250,24 @@ class SearchTerm(Base):
 
 
 class Alert(Base):
-    """Model for user alerts (notifications for specific types of listings)."""
+    """Model for user alerts (notifications for specific types of listings).
+
+    Saved searches and price alerts share this table and are told apart by
+    ``kind``; see ``PriceAlert`` for the price alert view of a row.
+    """
     __tablename__ = "alerts"
+    __table_args__ = (
+        CheckConstraint("kind >= 0 AND kind <= 1", name="ck_alert_kind"),
+        CheckConstraint("notification_method >= 0 AND notification_method <= 2", name="ck_alert_notification_method"),
+        CheckConstraint("kind <> 0 OR (name IS NOT NULL AND search_query IS NOT NULL)", name="ck_alert_search_fields"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, nullable=False, index=True)  # Reference to user in auth system
-    name = Column(String(255), nullable=False)
-    search_query = Column(String(512), nullable=False)  # Search query for matching listings
+    user_id = Column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(SmallIntEnum(AlertKind), nullable=False, default=AlertKind.SEARCH, server_default="0")
+    name = Column(String(255), nullable=True)  # Required for saved searches
+    search_query = Column(String(512), nullable=True)  # Search query for matching listings
+    category = Column(String(100), nullable=True)
     min_price = Column(Float, nullable=True)
     max_price = Column(Float, nullable=True)
     location = Column(String(255), nullable=True)
@@ -204,6 +276,8 @@ class Alert(Base):
     keywords = Column(JSON, nullable=True)  # List of keywords to match
     
     # Notification settings
+    notification_method = Column(SmallIntEnum(NotificationMethod, as_name=True), nullable=False, default="email", server_default="0")
+    notification_target = Column(String(255), nullable=True)  # Email address, phone number, etc.
     notification_email = Column(String(255), nullable=True)
     notification_sms = Column(String(50), nullable=True)
     notify_immediately = Column(Boolean, default=True, nullable=False)
@@ -215,38 +289,36 @@ class Alert(Base):
     last_matched_at = Column(DateTime, nullable=True)
     
     # Relationships
-    listings = relationship("Listing", secondary="listing_alerts", back_populates="alerts")
+    listings = relationship("Listing", secondary="alert_matches", back_populates="alerts", viewonly=True)
+
+    __mapper_args__ = {
+        "polymorphic_on": kind,
+        "polymorphic_identity": AlertKind.SEARCH,
+    }
 
 
-# Association table for many-to-many relationship between listings and alerts
-listing_alerts = Table(
-    "listing_alerts",
+# Listings an alert has fired for, of either kind. A row with
+# notified_at IS NULL is a pending notification. The table's fillfactor is
+# storage DDL and is set by migration 002_merge_alert_tables.
+alert_matches = Table(
+    "alert_matches",
     Base.metadata,
     Column("listing_id", Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True),
     Column("alert_id", Integer, ForeignKey("alerts.id", ondelete="CASCADE"), primary_key=True),
     Column("matched_at", DateTime, default=datetime.utcnow, nullable=False),
-    Column("notified", Boolean, default=False, nullable=False),
-    Column("notification_sent_at", DateTime, nullable=True)
+    Column("notified_at", DateTime, nullable=True),
 )
 
 
-class PriceAlert(Base):
+class PriceAlert(Alert):
     """Price alert model for marketplace listings."""
     
-    __tablename__ = "price_alerts"
+    # Single-table inheritance: rows live in ``alerts`` with kind=PRICE
+    __tablename__ = None
+    __mapper_args__ = {"polymorphic_identity": AlertKind.PRICE}
     
-    id = Column(Integer, primary_key=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    search_term = Column(String(255), nullable=True)
-    category = Column(String(100), nullable=True)
-    min_price = Column(Float, nullable=True)
-    max_price = Column(Float, nullable=True)
-    location = Column(String(255), nullable=True)
-    notification_method = Column(Enum("email", "sms", "push", name="notification_methods"), default="email")
-    notification_target = Column(String(255), nullable=False)  # Email address, phone number, etc.
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_triggered = Column(DateTime, nullable=True)
+    search_term = synonym("search_query")
+    last_triggered = synonym("last_matched_at")
     
     # Relationships
     user = relationship("User", back_populates="alerts")
@@ -264,22 +336,15 @@ class PriceAlert(Base):
         return f"<PriceAlert '{self.search_term or self.category}' {price_range}>"
 
 
-class AlertHistory(Base):
-    """History of triggered alerts."""
-    
-    __tablename__ = "alert_history"
+class AlertMatch(Base):
+    """A listing matched by an alert."""
     
-    id = Column(Integer, primary_key=True)
-    alert_id = Column(Integer, ForeignKey("price_alerts.id"), nullable=False)
-    listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id"), nullable=False)
-    triggered_at = Column(DateTime, default=datetime.utcnow)
-    notification_sent = Column(Boolean, default=False)
-    notification_time = Column(DateTime, nullable=True)
+    __table__ = alert_matches
     
     # Relationships
-    alert = relationship("PriceAlert")
+    alert = relationship("Alert")
     listing = relationship("Listing")
     
     def __repr__(self):
-        """String representation of the alert history entry."""
-        return f"<AlertHistory alert_id={self.alert_id} listing_id={self.listing_id}>" 
\ No newline at end of file
+        """String representation of the match."""
+        return f"<AlertMatch alert_id={self.alert_id} listing_id={self.listing_id}>"
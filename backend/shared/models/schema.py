@@ -52,7 +52,7 @@ class ListingSchema(BaseModel):
     last_updated: datetime
     is_sold: bool = False
     is_deleted: bool = False
-    metadata: Optional[Dict[str, Any]] = None
+    extra: Optional[Dict[str, Any]] = None
     source: str = "facebook"
 
 class ListingCreateSchema(BaseModel):
@@ -69,7 +69,7 @@ class ListingCreateSchema(BaseModel):
     image_urls: Optional[List[str]] = None
     listing_url: str
     listed_date: Optional[datetime] = None
-    metadata: Optional[Dict[str, Any]] = None
+    extra: Optional[Dict[str, Any]] = None
     source: str = "facebook"
 
     @validator('price')
@@ -123,20 +123,18 @@ class AlertResponseSchema(PriceAlertSchema):
     """Alert response schema with additional fields."""
     
     id: int
-    user_id: UUID
+    user_id: int
     is_active: bool = True
     created_at: datetime
     last_triggered: Optional[datetime] = None
 
-class AlertHistorySchema(BaseModel):
-    """Alert history schema."""
+class AlertMatchSchema(BaseModel):
+    """Alert match schema."""
     
-    id: int
     alert_id: int
-    listing_id: UUID
-    triggered_at: datetime
-    notification_sent: bool
-    notification_time: Optional[datetime] = None
+    listing_id: int
+    matched_at: datetime
+    notified_at: Optional[datetime] = None
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """
@@ -144,19 +142,23 @@ class PaginatedResponse(BaseModel, Generic[T]):
     
     Contains:
     - List of items of type T
-    - Total count of items
+    - Total count of items (None when paging by cursor)
     - Current page number
     - Items per page (limit)
+    - Opaque cursor for the next page, if there is one
     """
     
     items: List[T]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
+    next_cursor: Optional[str] = None
     
     @property
-    def pages(self) -> int:
+    def pages(self) -> Optional[int]:
         """Calculate total number of pages."""
+        if self.total is None:
+            return None
         return (self.total + self.limit - 1) // self.limit if self.limit > 0 else 0
     
     class Config:
@@ -167,7 +169,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
 class UserSchema(BaseModel):
     """User information schema."""
     
-    id: UUID
+    id: int
     username: str
     email: EmailStr
     first_name: Optional[str] = None
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ARRAY, Text, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, Identity, String, DateTime, Boolean, ARRAY, Text, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -137,7 +137,8 @@ class User(Base):
     
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(BigInteger, Identity(always=False), primary_key=True)
+    public_id = Column(UUID(as_uuid=True), unique=True, nullable=False, default=uuid.uuid4, server_default=func.gen_random_uuid())
     username = Column(String(50), unique=True, nullable=False, index=True)
     email = Column(String(100), unique=True, nullable=False, index=True)
     full_name = Column(String(100), nullable=True)
@@ -245,7 +246,7 @@ class User(Base):
         }
 
     @classmethod
-    async def get_by_id(cls, user_id: uuid.UUID) -> Optional["User"]:
+    async def get_by_id(cls, user_id: int) -> Optional["User"]:
         """Get user by ID (async placeholder)"""
         # This would be implemented with the actual database logic
         # For now, it's a placeholder
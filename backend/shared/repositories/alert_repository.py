@@ -1,11 +1,11 @@
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime
 
 from sqlalchemy import select, update, func, and_, or_
 from sqlalchemy.orm import Session, joinedload
 
 from shared.database.session import get_db_session
-from shared.models.marketplace import Alert, Listing, listing_alerts
+from shared.models.marketplace import Alert, Listing, alert_matches
 from shared.repositories.base import BaseRepository
 from shared.utils.logging_config import get_logger
 
@@ -44,6 +44,77 @@ class AlertRepository(BaseRepository[Alert]):
                 
             return list(session.execute(query).scalars().all())
     
+    def get_page_by_user_id(
+        self,
+        user_id: Union[int, str],
+        active_only: bool = True,
+        skip: int = 0,
+        limit: int = 100,
+        db_session: Optional[Session] = None
+    ) -> Tuple[List[Alert], int]:
+        """
+        Get one page of a user's alerts together with their total count.
+        
+        The total comes from a ``count(*) OVER ()`` column, so a page and
+        its total cost one round-trip.
+        
+        Args:
+            user_id: User ID
+            active_only: Only return active alerts
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            db_session: Optional database session
+            
+        Returns:
+            Tuple of (alerts on the page, total matching alerts)
+        """
+        with db_session or get_db_session() as session:
+            conditions = [Alert.user_id == user_id]
+            if active_only:
+                conditions.append(Alert.is_active == True)
+            
+            query = (
+                select(Alert, func.count().over().label("total"))
+                .where(*conditions)
+                .order_by(Alert.id)
+                .offset(skip)
+                .limit(limit)
+            )
+            rows = session.execute(query).all()
+            if rows:
+                return [row[0] for row in rows], rows[0][1]
+            
+            # Past the last page there is no row to carry the window count
+            total = session.execute(
+                select(func.count()).select_from(Alert).where(*conditions)
+            ).scalar()
+            return [], total or 0
+    
+    def count_by_user_id(
+        self,
+        user_id: Union[int, str],
+        active_only: bool = True,
+        db_session: Optional[Session] = None
+    ) -> int:
+        """
+        Count a user's alerts.
+        
+        Args:
+            user_id: User ID
+            active_only: Only count active alerts
+            db_session: Optional database session
+            
+        Returns:
+            Number of matching alerts
+        """
+        with db_session or get_db_session() as session:
+            query = select(func.count()).select_from(Alert).where(Alert.user_id == user_id)
+            
+            if active_only:
+                query = query.where(Alert.is_active == True)
+                
+            return session.execute(query).scalar() or 0
+    
     def match_listing_to_alerts(
         self,
         listing: Listing,
@@ -128,18 +199,17 @@ class AlertRepository(BaseRepository[Alert]):
                 now = datetime.utcnow()
                 for alert in matching_alerts:
                     # Check if this listing is already associated with this alert
-                    assoc_exists = session.query(listing_alerts).filter_by(
+                    assoc_exists = session.query(alert_matches).filter_by(
                         listing_id=listing.id,
                         alert_id=alert.id
                     ).first() is not None
                     
                     if not assoc_exists:
                         # Create the association
-                        stmt = listing_alerts.insert().values(
+                        stmt = alert_matches.insert().values(
                             listing_id=listing.id,
                             alert_id=alert.id,
-                            matched_at=now,
-                            notified=False
+                            matched_at=now
                         )
                         session.execute(stmt)
                         
@@ -169,9 +239,9 @@ class AlertRepository(BaseRepository[Alert]):
             # Query for alerts with listings that haven't been notified
             query = (
                 select(Alert, Listing)
-                .join(listing_alerts, Alert.id == listing_alerts.c.alert_id)
-                .join(Listing, Listing.id == listing_alerts.c.listing_id)
-                .where(listing_alerts.c.notified == False)
+                .join(alert_matches, Alert.id == alert_matches.c.alert_id)
+                .join(Listing, Listing.id == alert_matches.c.listing_id)
+                .where(alert_matches.c.notified_at.is_(None))
                 .where(Alert.is_active == True)
                 .limit(limit)
             )
@@ -181,12 +251,12 @@ class AlertRepository(BaseRepository[Alert]):
             notifications = []
             for alert, listing in results:
                 # Get the association record
-                assoc = session.query(listing_alerts).filter_by(
+                assoc = session.query(alert_matches).filter_by(
                     alert_id=alert.id,
                     listing_id=listing.id
                 ).first()
                 
-                if assoc and not assoc.notified:
+                if assoc and assoc.notified_at is None:
                     notifications.append({
                         "alert_id": alert.id,
                         "alert": alert,
@@ -219,13 +289,10 @@ class AlertRepository(BaseRepository[Alert]):
         """
         with db_session or get_db_session() as session:
             stmt = (
-                update(listing_alerts)
-                .where(listing_alerts.c.alert_id == alert_id)
-                .where(listing_alerts.c.listing_id == listing_id)
-                .values(
-                    notified=True,
-                    notification_sent_at=datetime.utcnow()
-                )
+                update(alert_matches)
+                .where(alert_matches.c.alert_id == alert_id)
+                .where(alert_matches.c.listing_id == listing_id)
+                .values(notified_at=datetime.utcnow())
             )
             result = session.execute(stmt)
             session.commit()
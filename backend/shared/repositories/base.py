@@ -1,4 +1,4 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 from sqlalchemy import select, update, delete, func
 from sqlalchemy.orm import Session
 
@@ -14,6 +14,10 @@ ModelType = TypeVar("ModelType")
 class BaseRepository(Generic[ModelType]):
     """Base repository with common CRUD operations."""
 
+    # Loader options applied to rows returned by ``update_returning``, so
+    # relationships a caller serializes are loaded before the row is detached
+    returning_options: Tuple[Any, ...] = ()
+
     def __init__(self, model_class: Type[ModelType]):
         """
         Initialize with the model class.
@@ -121,6 +125,72 @@ class BaseRepository(Generic[ModelType]):
             session.refresh(db_obj)
             return db_obj
     
+    def update_returning(
+        self, 
+        id_value: Union[int, str], 
+        obj_data: Dict[str, Any], 
+        db_session: Optional[Session] = None
+    ) -> Optional[ModelType]:
+        """
+        Update a record by ID with a single ``UPDATE ... RETURNING``.
+        
+        Unlike ``update`` this does not load the record first, so a missing
+        record costs the same one round-trip as an existing one.
+        
+        Args:
+            id_value: ID of the record to update
+            obj_data: New column values for the record
+            db_session: Optional database session
+            
+        Returns:
+            Updated record (detached) if found, otherwise None
+        """
+        with db_session or get_db_session() as session:
+            if not obj_data:
+                # Nothing to SET; an empty UPDATE is not valid SQL
+                db_obj = session.get(self.model_class, id_value, options=self.returning_options)
+                if db_obj is not None:
+                    session.expunge(db_obj)
+                return db_obj
+            
+            stmt = (
+                update(self.model_class)
+                .where(self.model_class.id == id_value)
+                .values(**obj_data)
+                .returning(self.model_class)
+                .options(*self.returning_options)
+                .execution_options(synchronize_session=False)
+            )
+            db_obj = session.execute(stmt).scalar_one_or_none()
+            # Detach before committing so the returned row isn't expired
+            # and reloaded on first attribute access
+            if db_obj is not None:
+                session.expunge(db_obj)
+            session.commit()
+            return db_obj
+    
+    def delete_returning(self, id_value: Union[int, str], db_session: Optional[Session] = None) -> bool:
+        """
+        Delete a record by ID with a single ``DELETE ... RETURNING``.
+        
+        Args:
+            id_value: ID of the record to delete
+            db_session: Optional database session
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        with db_session or get_db_session() as session:
+            stmt = (
+                delete(self.model_class)
+                .where(self.model_class.id == id_value)
+                .returning(self.model_class.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted = session.execute(stmt).first() is not None
+            session.commit()
+            return deleted
+    
     def delete(self, id_value: Union[int, str], db_session: Optional[Session] = None) -> bool:
         """
         Delete a record by ID.
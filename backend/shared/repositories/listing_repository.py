@@ -1,24 +1,85 @@
 from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 
-from sqlalchemy import select, update, delete, func, and_, or_, desc
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, insert, update, delete, func, and_, or_, desc, tuple_, text, bindparam, lambda_stmt, cast, Text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from shared.database.session import get_db_session
-from shared.models.marketplace import Listing, ListingStatus, ListingImage
+from shared.models.marketplace import Listing, ListingStatus, ListingImage, listing_categories
 from shared.repositories.base import BaseRepository
 from shared.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Columns served by the JSON read endpoints; mirrors ``ListingResponse``
+_LISTING_COLUMNS = (
+    Listing.id,
+    Listing.listing_id,
+    Listing.title,
+    Listing.description,
+    Listing.price,
+    Listing.price_text,
+    Listing.location,
+    Listing.category,
+    Listing.url,
+    Listing.created_at,
+    Listing.updated_at,
+    Listing.scraped_at,
+    Listing.status,
+    Listing.processed_at,
+    Listing.search_term,
+    Listing.keywords,
+    Listing.extra,
+)
+
+# Built once; lambda_stmt caches the construct, so lookups skip rebuilding
+# the select and its cache key on every call
+_GET_BY_LISTING_ID = lambda_stmt(
+    lambda: select(Listing)
+    .options(selectinload(Listing.images))
+    .where(
+        Listing.listing_id_fp == func.hashtextextended(bindparam("listing_id"), 0),
+        Listing.listing_id == bindparam("listing_id"),
+    )
+)
+
+_IMAGE_COLUMNS = (
+    ListingImage.listing_id,
+    ListingImage.id,
+    ListingImage.url,
+    ListingImage.position,
+    ListingImage.downloaded,
+    ListingImage.local_path,
+    ListingImage.created_at,
+)
+
 
 class ListingRepository(BaseRepository[Listing]):
     """Repository for marketplace listings."""
 
+    returning_options = (selectinload(Listing.images),)
+
     def __init__(self):
         """Initialize the repository with the Listing model."""
         super().__init__(Listing)
     
+    def get_by_id(self, id_value: Union[int, str], db_session: Optional[Session] = None) -> Optional[Listing]:
+        """
+        Get a listing by its ID, with its images loaded.
+        
+        Args:
+            id_value: ID of the listing
+            db_session: Optional database session
+            
+        Returns:
+            Listing if found, otherwise None
+        """
+        with db_session or get_db_session() as session:
+            # A single parent row, so one JOIN beats a second IN query
+            return session.get(Listing, id_value, options=[joinedload(Listing.images)])
+    
     def get_by_listing_id(self, listing_id: str, db_session: Optional[Session] = None) -> Optional[Listing]:
         """
         Get a listing by its external listing ID.
@@ -31,42 +92,61 @@ class ListingRepository(BaseRepository[Listing]):
             Listing if found, otherwise None
         """
         with db_session or get_db_session() as session:
-            query = select(Listing).where(Listing.listing_id == listing_id)
-            return session.execute(query).scalar_one_or_none()
+            return session.execute(_GET_BY_LISTING_ID, {"listing_id": listing_id}).scalar_one_or_none()
     
     def create_with_images(
         self, 
         listing_data: Dict[str, Any], 
         image_urls: List[str], 
         db_session: Optional[Session] = None
-    ) -> Listing:
+    ) -> Optional[Listing]:
         """
         Create a listing with its associated images.
         
+        The listing is written with ``INSERT ... ON CONFLICT DO NOTHING
+        RETURNING`` on its external ID, so an existing listing is detected
+        by the insert itself rather than by a prior lookup, and all images
+        go in with one multi-row INSERT.
+        
         Args:
             listing_data: Listing data
             image_urls: List of image URLs
             db_session: Optional database session
             
         Returns:
-            Created listing
+            Created listing (detached, images loaded), or None if a listing
+            with the same external ID already exists
         """
         with db_session or get_db_session() as session:
-            # Create listing
-            listing = Listing(**listing_data)
-            session.add(listing)
+            stmt = (
+                pg_insert(Listing)
+                .values(**listing_data)
+                .on_conflict_do_nothing(constraint="uq_listings_listing_id")
+                .returning(Listing)
+            )
+            listing = session.execute(stmt).scalar_one_or_none()
+            if listing is None:
+                session.rollback()
+                return None
             
-            # Create images
-            for index, url in enumerate(image_urls):
-                image = ListingImage(
-                    url=url,
-                    position=index,
-                    downloaded=False
-                )
-                listing.images.append(image)
-                
+            images = []
+            if image_urls:
+                # Executemany form: insertmanyvalues still sends one multi-row
+                # INSERT, but the statement compiles once for any image count
+                images = list(session.scalars(
+                    insert(ListingImage).returning(ListingImage),
+                    [
+                        {"listing_id": listing.id, "url": url, "position": index, "downloaded": False}
+                        for index, url in enumerate(image_urls)
+                    ],
+                ))
+                images.sort(key=lambda image: image.position)
+            set_committed_value(listing, "images", images)
+            
+            # Detach before committing so the returned row isn't expired
+            # and reloaded on first attribute access
+            session.expunge(listing)
             session.commit()
-            session.refresh(listing)
             
             logger.info(f"Created listing with ID {listing.id} and {len(image_urls)} images")
             return listing
@@ -127,7 +207,89 @@ class ListingRepository(BaseRepository[Listing]):
             
             return result.rowcount > 0
     
-    def search_listings(
+    def _search_filters(
+        self,
+        search_term: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        location: Optional[str],
+        category: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ) -> List[Any]:
+        """Build the WHERE conditions shared by the listing search queries."""
+        filters = []
+        
+        if search_term:
+            # Each branch is served by a pg_trgm index (migration 006), so the
+            # OR becomes a bitmap OR instead of a sequential scan
+            pattern = f"%{search_term}%"
+            filters.append(or_(
+                Listing.title.ilike(pattern),
+                Listing.description.ilike(pattern),
+                # Extracted keywords, matched against their JSON text
+                cast(Listing.keywords, Text).ilike(pattern),
+            ))
+        
+        if min_price is not None:
+            filters.append(Listing.price >= min_price)
+        
+        if max_price is not None:
+            filters.append(Listing.price <= max_price)
+        
+        if location:
+            filters.append(Listing.location.ilike(f"%{location}%"))
+        
+        if category:
+            filters.append(Listing.category == category)
+        
+        if start_date:
+            filters.append(Listing.scraped_at >= start_date)
+        
+        if end_date:
+            filters.append(Listing.scraped_at <= end_date)
+        
+        # Non-deleted/archived listings only
+        filters.append(Listing.status != ListingStatus.ARCHIVED)
+        
+        return filters
+    
+    def _rows_with_images(self, session: Session, query) -> List[Dict[str, Any]]:
+        """
+        Run a Core listing query and return plain dicts ready for JSON encoding.
+        
+        Images are loaded with one extra ``IN`` query for the whole page and
+        attached per listing, and ``status`` is rendered by its label.
+        
+        Args:
+            session: Database session
+            query: ``select()`` over ``_LISTING_COLUMNS``
+            
+        Returns:
+            List of listing dicts with an ``images`` list each
+        """
+        rows = [dict(row) for row in session.execute(query).mappings()]
+        if not rows:
+            return rows
+        
+        by_id = {}
+        for row in rows:
+            row["status"] = row["status"].label
+            row["images"] = []
+            by_id[row["id"]] = row
+        
+        image_query = (
+            select(*_IMAGE_COLUMNS)
+            .where(ListingImage.listing_id.in_(by_id))
+            .order_by(ListingImage.listing_id, ListingImage.position)
+        )
+        for image in session.execute(image_query).mappings():
+            image = dict(image)
+            by_id[image.pop("listing_id")]["images"].append(image)
+        
+        return rows
+    
+    def search_listings_rows(
         self,
         search_term: Optional[str] = None,
         min_price: Optional[float] = None,
@@ -138,10 +300,18 @@ class ListingRepository(BaseRepository[Listing]):
         end_date: Optional[datetime] = None,
         skip: int = 0,
         limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None,
         db_session: Optional[Session] = None
-    ) -> Tuple[List[Listing], int]:
+    ) -> List[Dict[str, Any]]:
         """
-        Search listings with various filters.
+        Search listings like ``search_listings`` but return plain dicts.
+        
+        Selects columns through Core instead of loading ORM objects, for
+        read paths that serialize the rows straight to JSON. Rows are
+        ordered by ``(scraped_at, id)`` descending; passing ``after`` starts
+        the page right behind that key (keyset pagination) instead of
+        reading and discarding ``skip`` rows. The total is not computed
+        here; see ``count_listings`` and ``estimate_count``.
         
         Args:
             search_term: Optional text to search in title and description
@@ -151,56 +321,132 @@ class ListingRepository(BaseRepository[Listing]):
             category: Optional category filter
             start_date: Optional start date for scraped_at
             end_date: Optional end date for scraped_at
-            skip: Number of records to skip for pagination
+            skip: Number of records to skip for pagination, ignored with ``after``
             limit: Maximum number of records to return
+            after: Optional ``(scraped_at, id)`` of the last row already seen
             db_session: Optional database session
             
         Returns:
-            Tuple of (list of listings, total count)
+            List of listing dicts
         """
         with db_session or get_db_session() as session:
-            # Build filters
-            filters = []
-            
-            if search_term:
-                search_filters = []
-                search_term = f"%{search_term}%"
-                search_filters.append(Listing.title.ilike(search_term))
-                search_filters.append(Listing.description.ilike(search_term))
-                
-                # Also check if we have keywords extracted
-                if search_term.startswith("%") and search_term.endswith("%"):
-                    clean_term = search_term[1:-1].lower()
-                    # This is a simplistic approach - in production you'd use a proper JSON query
-                    search_filters.append(Listing.keywords.cast(str).ilike(f"%{clean_term}%"))
-                
-                filters.append(or_(*search_filters))
-            
-            if min_price is not None:
-                filters.append(Listing.price >= min_price)
-            
-            if max_price is not None:
-                filters.append(Listing.price <= max_price)
+            filters = self._search_filters(
+                search_term, min_price, max_price, location, category, start_date, end_date
+            )
             
-            if location:
-                filters.append(Listing.location.ilike(f"%{location}%"))
+            query = (
+                select(*_LISTING_COLUMNS)
+                .where(and_(*filters))
+                .order_by(desc(Listing.scraped_at), desc(Listing.id))
+                .limit(limit)
+            )
+            if after is not None:
+                query = query.where(tuple_(Listing.scraped_at, Listing.id) < tuple_(*after))
+            elif skip:
+                query = query.offset(skip)
             
-            if category:
-                filters.append(Listing.category == category)
+            return self._rows_with_images(session, query)
+    
+    def count_listings(
+        self,
+        search_term: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        location: Optional[str] = None,
+        category: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        db_session: Optional[Session] = None
+    ) -> int:
+        """
+        Count the listings a search would return.
+        
+        Args:
+            search_term: Optional text to search in title and description
+            min_price: Optional minimum price filter
+            max_price: Optional maximum price filter
+            location: Optional location filter
+            category: Optional category filter
+            start_date: Optional start date for scraped_at
+            end_date: Optional end date for scraped_at
+            db_session: Optional database session
             
-            if start_date:
-                filters.append(Listing.scraped_at >= start_date)
+        Returns:
+            Exact number of matching listings
+        """
+        with db_session or get_db_session() as session:
+            filters = self._search_filters(
+                search_term, min_price, max_price, location, category, start_date, end_date
+            )
+            count_query = (
+                select(func.count())
+                .select_from(Listing)
+                .where(and_(*filters))
+            )
+            return session.execute(count_query).scalar() or 0
+    
+    def estimate_count(self, db_session: Optional[Session] = None) -> int:
+        """
+        Estimate the number of listings from planner statistics.
+        
+        Reads ``pg_class.reltuples`` instead of scanning the table, so it
+        lags until the next (auto)ANALYZE and includes archived rows. Falls
+        back to an exact count when the table has never been analyzed.
+        
+        Args:
+            db_session: Optional database session
             
-            if end_date:
-                filters.append(Listing.scraped_at <= end_date)
+        Returns:
+            Approximate number of listings
+        """
+        with db_session or get_db_session() as session:
+            estimate = session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'listings'::regclass")
+            ).scalar()
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return self.count_listings(db_session=db_session)
+    
+    def search_listings(
+        self,
+        search_term: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        location: Optional[str] = None,
+        category: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 100,
+        db_session: Optional[Session] = None
+    ) -> Tuple[List[Listing], int]:
+        """
+        Search listings with various filters.
+        
+        Args:
+            search_term: Optional text to search in title and description
+            min_price: Optional minimum price filter
+            max_price: Optional maximum price filter
+            location: Optional location filter
+            category: Optional category filter
+            start_date: Optional start date for scraped_at
+            end_date: Optional end date for scraped_at
+            skip: Number of records to skip for pagination
+            limit: Maximum number of records to return
+            db_session: Optional database session
             
-            # Non-deleted/archived listings only
-            filters.append(Listing.status != ListingStatus.ARCHIVED)
+        Returns:
+            Tuple of (list of listings, total count)
+        """
+        with db_session or get_db_session() as session:
+            filters = self._search_filters(
+                search_term, min_price, max_price, location, category, start_date, end_date
+            )
             
             # Build query for results
             query = (
                 select(Listing)
-                .options(joinedload(Listing.images))
+                .options(selectinload(Listing.images))
                 .where(and_(*filters))
                 .order_by(desc(Listing.scraped_at))
                 .offset(skip)
@@ -242,7 +488,7 @@ class ListingRepository(BaseRepository[Listing]):
             
             query = (
                 select(Listing)
-                .options(joinedload(Listing.images))
+                .options(selectinload(Listing.images))
                 .where(Listing.scraped_at >= cutoff_time)
                 .order_by(desc(Listing.scraped_at))
                 .limit(limit)
@@ -250,10 +496,42 @@ class ListingRepository(BaseRepository[Listing]):
             
             return list(session.execute(query).scalars().all())
     
+    def get_recent_listings_rows(
+        self,
+        hours: int = 24,
+        limit: int = 50,
+        db_session: Optional[Session] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get recent listings from the last N hours as plain dicts.
+        
+        Args:
+            hours: Number of hours to look back
+            limit: Maximum number of listings to return
+            db_session: Optional database session
+            
+        Returns:
+            List of recent listing dicts
+        """
+        with db_session or get_db_session() as session:
+            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+            
+            query = (
+                select(*_LISTING_COLUMNS)
+                .where(Listing.scraped_at >= cutoff_time)
+                .order_by(desc(Listing.scraped_at))
+                .limit(limit)
+            )
+            
+            return self._rows_with_images(session, query)
+    
     def get_categories(self, db_session: Optional[Session] = None) -> List[str]:
         """
         Get all unique categories.
         
+        Reads the ``listing_categories`` materialized view, so the result is
+        as of the last ``refresh_categories`` call.
+        
         Args:
             db_session: Optional database session
             
@@ -261,9 +539,22 @@ class ListingRepository(BaseRepository[Listing]):
             List of unique categories
         """
         with db_session or get_db_session() as session:
-            query = select(Listing.category).distinct()
-            results = session.execute(query).scalars().all()
-            return [cat for cat in results if cat]  # Filter out None values
+            query = select(listing_categories.c.category).order_by(listing_categories.c.category)
+            return list(session.execute(query).scalars().all())
+    
+    def refresh_categories(self, db_session: Optional[Session] = None) -> None:
+        """
+        Rebuild the ``listing_categories`` materialized view.
+        
+        Runs concurrently, so readers keep seeing the previous contents
+        until the refresh commits.
+        
+        Args:
+            db_session: Optional database session
+        """
+        with db_session or get_db_session() as session:
+            session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY listing_categories"))
+            session.commit()
 
 
 # Singleton instance
@@ -3,7 +3,7 @@
 import json
 import logging
 import asyncio
-from typing import Dict, List, Any, Optional, Callable, Union
+from typing import Dict, List, Any, Optional, Callable, TypeVar, Union
 from confluent_kafka import Producer, Consumer, KafkaError, KafkaException, TopicPartition
 from confluent_kafka.admin import AdminClient, NewTopic
 import socket
@@ -14,6 +14,8 @@ from shared.config.settings import get_settings
 # Configure logger
 logger = logging.getLogger("kafka")
 
+T = TypeVar("T")
+
 class KafkaClient:
     """
     Kafka client for producing and consuming messages.
@@ -374,6 +376,131 @@ class KafkaClient:
             logger.error(f"Kafka connection check failed: {str(e)}")
             return False
 
+class KafkaConsumer:
+    """
+    Asyncio consumer for a fixed set of topics.
+    
+    Wraps a confluent-kafka ``Consumer`` and fetches records in batches
+    with ``Consumer.consume(num_messages, timeout)`` on a worker thread, so
+    the thread hand-off is paid once per batch rather than once per record.
+    Offsets are auto-committed; this is meant for fan-out readers that do
+    not need at-least-once processing.
+    """
+    
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        group_id: str,
+        topics: List[str],
+        client_id: Optional[str] = None
+    ):
+        """
+        Initialize the consumer configuration.
+        
+        Args:
+            bootstrap_servers: Kafka bootstrap servers
+            group_id: Consumer group ID
+            topics: Topics to subscribe to
+            client_id: Optional client ID, defaults to one derived from the hostname
+        """
+        self.topics = topics
+        self.config = {
+            'bootstrap.servers': bootstrap_servers,
+            'client.id': client_id or f"{socket.gethostname()}-{group_id}",
+            'group.id': group_id,
+            'auto.offset.reset': 'latest',
+            'enable.auto.commit': True,
+            'session.timeout.ms': 30000,     # 30 seconds
+            'heartbeat.interval.ms': 10000,  # 10 seconds
+        }
+        self._consumer: Optional[Consumer] = None
+        # Serializes consume() and close() on the underlying client, which
+        # must not run concurrently on different threads
+        self._lock = asyncio.Lock()
+    
+    @staticmethod
+    async def _in_thread(func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking client call on a worker thread, to completion.
+        
+        Cancelling the caller does not stop the thread, so the call is
+        shielded and, on cancellation, awaited before the error is re-raised.
+        Callers hold ``_lock`` around this; the lock is therefore only
+        released once the client is idle again.
+        
+        Args:
+            func: The client method to call
+            *args: Arguments for ``func``
+            
+        Returns:
+            The result of ``func``
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            while not future.done():
+                try:
+                    await asyncio.wait({future})
+                except asyncio.CancelledError:
+                    pass
+            raise
+    
+    async def start(self) -> None:
+        """Create the underlying consumer and subscribe to the topics."""
+        consumer = Consumer(self.config)
+        await asyncio.to_thread(consumer.subscribe, self.topics)
+        self._consumer = consumer
+    
+    async def stop(self) -> None:
+        """Close the underlying consumer, waiting for any batch in flight."""
+        async with self._lock:
+            if self._consumer is not None:
+                consumer, self._consumer = self._consumer, None
+                await self._in_thread(consumer.close)
+    
+    async def consume_batch(self, num_messages: int = 500, timeout: float = 0.2) -> List[Any]:
+        """
+        Fetch up to ``num_messages`` records.
+        
+        Args:
+            num_messages: Maximum number of records to return
+            timeout: Maximum time to wait for the first record in seconds
+            
+        Returns:
+            The records received, without partition EOF or error events;
+            empty if none arrived within ``timeout`` or the consumer is stopped
+        """
+        async with self._lock:
+            if self._consumer is None:
+                return []
+            messages = await self._in_thread(self._consumer.consume, num_messages, timeout)
+        
+        batch = []
+        for msg in messages:
+            error = msg.error()
+            if error is None:
+                batch.append(msg)
+            elif error.code() != KafkaError._PARTITION_EOF:
+                logger.error(f"Consumer error: {error}")
+        return batch
+    
+    async def consume(self, num_messages: int = 500, timeout: float = 0.2):
+        """
+        Consume records one by one until the consumer is stopped.
+        
+        Args:
+            num_messages: Maximum number of records fetched per batch
+            timeout: Maximum time to wait for each batch in seconds
+            
+        Yields:
+            Consumed records
+        """
+        while self._consumer is not None:
+            for msg in await self.consume_batch(num_messages, timeout):
+                yield msg
+
+
 # Global client cache
 _kafka_clients: Dict[str, KafkaClient] = {}
 
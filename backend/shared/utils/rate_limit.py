@@ -54,6 +54,27 @@ class RateLimiter:
 # In-memory store for rate limiters
 _limiters: Dict[str, Dict[str, RateLimiter]] = {}
 
+# Sweep idle limiters out of the store every N lookups so that one-off
+# clients (scanners, crawlers) don't accumulate forever
+_SWEEP_EVERY = 10000
+_lookups = 0
+
+
+def _sweep_idle_limiters(now: float) -> None:
+    """
+    Drop limiters that have been idle for twice their full refill time.
+    
+    Such a bucket is full again, so recreating it on the client's next
+    request behaves exactly like keeping it.
+    
+    Args:
+        now: Current time as returned by ``time.time()``
+    """
+    for limiters in _limiters.values():
+        for key, limiter in list(limiters.items()):
+            if now - limiter.last_refill > 2 * limiter.max_tokens / limiter.rate:
+                del limiters[key]
+
 
 def get_limiter(
     key: str, 
@@ -73,6 +94,12 @@ def get_limiter(
     Returns:
         RateLimiter instance
     """
+    global _lookups
+    _lookups += 1
+    if _lookups >= _SWEEP_EVERY:
+        _lookups = 0
+        _sweep_idle_limiters(time.time())
+    
     if namespace not in _limiters:
         _limiters[namespace] = {}
     